@@ -0,0 +1,173 @@
+import os
+import io
+import sys
+import json
+import html
+import time
+import base64
+import argparse
+import contextlib
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from SSRFetcher import SSRFetcher
+from SourceAdapters import adapters_for_url, GitHubWikiAdapter, GitLabWikiAdapter, RawTextAdapter
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def make_node_lines(count):
+    lines = []
+    for i in range(count):
+        if i % 2:
+            lines.append(f"trojan://pass{i}@node{i}.example.com:443?sni=node{i}.example.com#node{i}")
+        else:
+            auth = base64.b64encode(f"aes-256-gcm:pass{i}".encode("utf-8")).decode("ascii")
+            lines.append(f"ss://{auth}@node{i}.example.com:8388#node{i}")
+    return lines
+
+def page_chrome(size):
+    """
+    模拟代码托管网站页面的外壳（导航、内联脚本和样式）
+    """
+    block = "<div class=\"nav-item\"><a href=\"/explore\">Explore</a></div>\n"
+    script = "<script>window.__APP_STATE__ = {\"features\": [" + ",".join(["\"flag\""] * 200) + "]};</script>\n"
+    chrome = []
+    while sum(len(part) for part in chrome) < size:
+        chrome.extend([block] * 20 + [script])
+    return "".join(chrome)
+
+def synthetic_fixtures(node_count=100):
+    """
+    生成合成的页面与原始内容对：{适配器名称: (来源URL, 渲染后的HTML, 原始内容)}
+    """
+    lines = make_node_lines(node_count)
+    markdown = "# 免费账号\n\n" + "".join(f"```\n{line}\n```\n\n" for line in lines)
+
+    rendered_markdown = "".join(f"<div class=\"highlight\"><pre><code>{html.escape(line)}</code></pre></div>"
+                                for line in lines)
+    github_html = (f"<html><head>{page_chrome(200 * 1024)}</head><body>{page_chrome(100 * 1024)}"
+                   f"<div class=\"markdown-body\"><h1>免费账号</h1>{rendered_markdown}</div></body></html>")
+
+    page_info = html.escape(json.dumps({"content": markdown, "format": "markdown", "title": "Home"}))
+    gitlab_html = (f"<html><head>{page_chrome(150 * 1024)}</head><body>"
+                   f"<div class=\"js-wiki-page-content\" data-page-info=\"{page_info}\"></div>"
+                   f"{page_chrome(100 * 1024)}</body></html>")
+    gitlab_api = json.dumps({"content": markdown, "format": "markdown", "slug": "Home", "title": "Home"})
+
+    subscription = base64.b64encode("\n".join(lines).encode("utf-8")).decode("ascii")
+
+    return {
+        GitHubWikiAdapter.name: ("https://github.com/owner/repo/wiki/Home", github_html, markdown),
+        GitLabWikiAdapter.name: ("https://gitlab.com/owner/repo/-/wikis/Home", gitlab_html, gitlab_api),
+        RawTextAdapter.name: ("https://raw.githubusercontent.com/owner/repo/main/sub", subscription, subscription),
+    }
+
+def recorded_fixtures():
+    """
+    读取benchmarks/fixtures中录制的页面与原始内容对（由--record生成）
+    """
+    fixtures = {}
+    index_file = os.path.join(FIXTURE_DIR, "index.json")
+    if not os.path.exists(index_file):
+        return fixtures
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    for name, entry in index.items():
+        with open(os.path.join(FIXTURE_DIR, entry["html"]), 'r', encoding='utf-8') as f:
+            page = f.read()
+        with open(os.path.join(FIXTURE_DIR, entry["raw"]), 'r', encoding='utf-8') as f:
+            raw = f.read()
+        fixtures[name] = (entry["url"], page, raw)
+    return fixtures
+
+def record_fixtures(config_file=None):
+    """
+    从配置的来源录制页面HTML和适配器获取的原始内容
+    """
+    fetcher = SSRFetcher()
+    config = fetcher.config_manager.load_configuration(config_file)
+    ssr_source = config.get("ssr_source", {})
+    fetcher.configure(ssr_source)
+    user_agent = ssr_source.get("user_agent")
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    index = {}
+    for i, url in enumerate(ssr_source.get("urls", [])):
+        adapters = adapters_for_url(url)
+        if len(adapters) < 2:
+            continue
+        adapter = adapters[0]
+        try:
+            page = fetcher._get_html_from_http(url, user_agent)
+            raw = fetcher._get_html_from_http(adapter.endpoint(url), user_agent)
+        except Exception as e:
+            print(f"录制 {url} 失败: {str(e)}")
+            continue
+        name = f"{adapter.name}-{i}"
+        for suffix, content in (("html", page), ("raw", raw)):
+            with open(os.path.join(FIXTURE_DIR, f"{name}.{suffix}"), 'w', encoding='utf-8') as f:
+                f.write(content)
+        index[name] = {"url": url, "html": f"{name}.html", "raw": f"{name}.raw"}
+        print(f"已录制 {url}")
+
+    with open(os.path.join(FIXTURE_DIR, "index.json"), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+def generic_parse(fetcher, page):
+    """
+    通用适配器的解析部分（不含下载）：base64订阅先解码，否则解析HTML
+    """
+    decoded = fetcher._decode_base64_content(page)
+    if decoded is not None:
+        nodes = []
+        fetcher._extract_ssr_nodes_from_text(decoded, nodes)
+        if nodes:
+            return fetcher._unique_nodes(nodes)
+    return fetcher._parse_html_nodes(page)
+
+def best_time(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def bench(fixtures, repeat=5):
+    """
+    比较通用适配器（解析渲染后的HTML）与专用适配器（解析原始内容）的数据量和解析耗时
+    """
+    fetcher = SSRFetcher()
+    print(f"{'fixture':<22}{'adapter':<15}{'bytes':>10}{'parse_ms':>10}{'nodes':>8}")
+    for name, (url, page, raw) in fixtures.items():
+        adapter = adapters_for_url(url)[0]
+        generic_time, generic_nodes = best_time(lambda: generic_parse(fetcher, page), repeat)
+        adapter_time, adapter_nodes = best_time(
+            lambda: fetcher._unique_nodes(adapter.extract_nodes(raw, fetcher)), repeat)
+        print(f"{name:<22}{'generic':<15}{len(page.encode('utf-8')):>10}{generic_time * 1000:>10.2f}{len(generic_nodes):>8}")
+        print(f"{'':<22}{adapter.name:<15}{len(raw.encode('utf-8')):>10}{adapter_time * 1000:>10.2f}{len(adapter_nodes):>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="来源适配器基准")
+    parser.add_argument("-n", "--nodes", type=int, default=100, help="合成页面中的节点数量")
+    parser.add_argument("--record", action="store_true", help="从配置的来源录制页面和原始内容到benchmarks/fixtures")
+    parser.add_argument("-c", "--config", help="配置文件路径", default=None)
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.config)
+
+    fixtures = recorded_fixtures()
+    if fixtures:
+        print("使用录制的fixtures")
+    else:
+        print(f"未找到录制的fixtures，使用合成页面（{args.nodes} 个节点）")
+        fixtures = synthetic_fixtures(args.nodes)
+    bench(fixtures)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import http.server
+import functools
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from CapturePolicy import CapturePolicy
+
+PROXY_PROTOCOLS = ['ssr://', 'vmess://', 'vless://', 'ss://', 'hysteria2://']
+
+# 模拟一个前端渲染的Wiki页面加载的资源：(路径, 资源类型, Content-Type, 大小（字节）, 是否包含节点)
+FIXTURES = (
+    [("/index.html", "document", "text/html; charset=utf-8", 300 * 1024, False)]
+    + [(f"/assets/bundle-{i}.js", "script", "application/javascript", 1024 * 1024, False) for i in range(30)]
+    + [(f"/assets/style-{i}.css", "stylesheet", "text/css", 200 * 1024, False) for i in range(10)]
+    + [(f"/img/{i}.png", "image", "image/png", 100 * 1024, False) for i in range(40)]
+    + [(f"/api/meta-{i}.json", "fetch", "application/json", 20 * 1024, False) for i in range(20)]
+    + [("/api/telemetry.json", "fetch", "application/json", 8 * 1024 * 1024, False)]
+    + [("/api/fragment.html", "fetch", "text/html", 2 * 1024 * 1024, False)]
+    + [("/api/wiki/content.json", "fetch", "application/json", 64 * 1024, True)]
+)
+
+def make_payload(size, has_nodes):
+    """
+    生成指定大小的响应体，包含节点时在开头放入若干节点链接
+    """
+    prefix = b""
+    if has_nodes:
+        prefix = "\n".join(f"vmess://node{i}" for i in range(50)).encode("utf-8") + b"\n"
+    return prefix + b"x" * max(size - len(prefix), 0)
+
+class FakeRequest:
+    def __init__(self, url, resource_type, headers):
+        self.url = url
+        self.method = "GET"
+        self.resource_type = resource_type
+        self.headers = headers
+
+class FakeResponse:
+    """
+    模拟Playwright响应对象：每次读取响应体都会复制一份数据（对应浏览器到Python的传输）
+    """
+
+    def __init__(self, url, resource_type, content_type, payload):
+        self.url = url
+        self.status = 200
+        self.headers = {"content-type": content_type, "content-length": str(len(payload)),
+                        "cache-control": "max-age=600", "server": "fixture"}
+        self.request = FakeRequest(url, resource_type, {"user-agent": "bench", "accept": "*/*"})
+        self._payload = payload
+
+    def body(self):
+        return bytes(bytearray(self._payload))
+
+    def text(self):
+        return self.body().decode("utf-8", errors="replace")
+
+def replay_legacy(responses):
+    """
+    原实现：记录所有请求和响应的完整头部，并在回调中读取所有JSON/文本/HTML响应体
+    """
+    captured_requests = []
+    captured_responses = []
+    api_responses_with_proxies = []
+    for response in responses:
+        request = response.request
+        captured_requests.append({'url': request.url, 'method': request.method, 'headers': dict(request.headers)})
+        captured_responses.append({'url': request.url, 'method': request.method,
+                                   'status': response.status, 'headers': dict(response.headers)})
+        content_type = response.headers.get('content-type', '')
+        if any(subtype in content_type for subtype in ['application/json', 'text/plain', 'text/html']):
+            response_body = response.text()
+            if any(proxy_type in response_body for proxy_type in PROXY_PROTOCOLS):
+                api_responses_with_proxies.append({'url': request.url, 'body': response_body})
+    return api_responses_with_proxies, (captured_requests, captured_responses)
+
+def replay_policy(responses, policy):
+    """
+    捕获策略：回调中只检查响应头，页面稳定后按大小上限读取候选响应体
+    """
+    from collections import deque
+    capture_log = deque(maxlen=policy.log_size) if policy.log_size else None
+    candidates = deque(maxlen=policy.max_candidates)
+    for response in responses:
+        request = response.request
+        if capture_log is not None:
+            capture_log.append(f"{response.status} {request.method} {request.url}")
+        headers = response.headers
+        if policy.is_candidate(request.url, headers.get('content-type', ''),
+                               headers.get('content-length'), request.resource_type):
+            candidates.append(response)
+
+    api_responses_with_proxies = []
+    for response in candidates:
+        response_body = policy.read_body(response)
+        if response_body and any(proxy_type in response_body for proxy_type in PROXY_PROTOCOLS):
+            api_responses_with_proxies.append({'url': response.url, 'body': response_body})
+    return api_responses_with_proxies, capture_log
+
+def measure(func, *args):
+    """
+    测量函数的耗时、Python堆内存峰值和返回时仍被持有的内存
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak, retained
+
+def bench_replay():
+    """
+    在模拟的响应序列上比较原实现和捕获策略
+    """
+    responses = [FakeResponse(f"http://127.0.0.1{path}", resource_type, content_type, make_payload(size, has_nodes))
+                 for path, resource_type, content_type, size, has_nodes in FIXTURES]
+    total_bytes = sum(size for _, _, _, size, _ in FIXTURES)
+    print(f"回放 {len(responses)} 个响应，共 {total_bytes / 1024 / 1024:.1f} MB")
+
+    found_legacy = len(replay_legacy(responses)[0])
+    found_policy = len(replay_policy(responses, CapturePolicy())[0])
+    print(f"检测到包含节点的响应: 原实现 {found_legacy} 个，捕获策略 {found_policy} 个")
+
+    print(f"{'mode':<10}{'ms':>10}{'peak_mb':>12}{'retained_mb':>14}")
+    for name, func, args in (("legacy", replay_legacy, (responses,)),
+                             ("policy", replay_policy, (responses, CapturePolicy()))):
+        elapsed, peak, retained = measure(func, *args)
+        print(f"{name:<10}{elapsed * 1000:>10.1f}{peak / 1024 / 1024:>12.1f}{retained / 1024 / 1024:>14.2f}")
+
+def bench_browser():
+    """
+    通过本地fixture服务和真实浏览器比较默认策略与宽松策略（需要安装Chromium）
+    """
+    from SSRFetcher import SSRFetcher
+
+    with tempfile.TemporaryDirectory() as directory:
+        scripts = []
+        for path, resource_type, content_type, size, has_nodes in FIXTURES[1:]:
+            file_path = os.path.join(directory, path.lstrip('/'))
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'wb') as f:
+                f.write(make_payload(size, has_nodes) if resource_type != "script" else b"//" + b"x" * size)
+            if resource_type == "script":
+                scripts.append(f'<script src="{path}"></script>')
+            elif resource_type == "fetch":
+                scripts.append(f'<script>fetch("{path}")</script>')
+            elif resource_type == "image":
+                scripts.append(f'<img src="{path}">')
+            else:
+                scripts.append(f'<link rel="stylesheet" href="{path}">')
+        with open(os.path.join(directory, "index.html"), 'w', encoding='utf-8') as f:
+            f.write("<html><body><p>wiki</p>" + "".join(scripts) + "</body></html>")
+
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+        handler.log_message = lambda *args: None
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/index.html"
+
+        permissive = CapturePolicy(content_types=['application/json', 'text/plain', 'text/html', 'javascript'],
+                                   max_body_size=0, max_candidates=10000, log_size=10000)
+        print(f"{'mode':<12}{'seconds':>10}{'peak_mb':>12}")
+        try:
+            for name, policy in (("permissive", permissive), ("default", CapturePolicy())):
+                fetcher = SSRFetcher()
+                fetcher.capture_policy = policy
+                tracemalloc.start()
+                start = time.perf_counter()
+                fetcher._get_html_from_browser(url, timeout=30)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{name:<12}{elapsed:>10.2f}{peak / 1024 / 1024:>12.1f}")
+        finally:
+            server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Playwright网络捕获策略基准")
+    parser.add_argument("--browser", action="store_true", help="同时使用真实浏览器和本地fixture服务测量（需要安装Chromium）")
+    args = parser.parse_args()
+
+    bench_replay()
+    if args.browser:
+        try:
+            bench_browser()
+        except Exception as e:
+            print(f"浏览器基准失败（是否已执行 playwright install chromium？）: {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import io
+import os
+import sys
+import time
+import json
+import base64
+import argparse
+import random
+import tempfile
+import contextlib
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from ProxyNamer import ProxyNamer
+from SSRConverter import SSRConverter
+from HealthStore import HealthStore, np
+from NodeArtifact import NodeArtifact
+
+SOURCES = [
+    "https://github.com/Alvin9999-newpac/fanqiang/wiki/v2ray%E5%85%8D%E8%B4%B9%E8%B4%A6%E5%8F%B7",
+    "https://github.com/junjun266/FreeProxyGo",
+    "https://raw.githubusercontent.com/hello-world-1989/v2-sub/main/end-gfw-together-af3e13",
+]
+
+COUNTRY_NAMES = ["HK中国香港", "JP日本", "US美国", "SG新加坡", "NL荷兰", "12 - 未知"]
+
+def make_synthetic_nodes(count):
+    """
+    生成合成节点列表，格式与SSRFetcher.get_nodes_from_web的返回值一致
+
+    Args:
+        count (int): 节点数量
+
+    Returns:
+        list: (node_url, source_url) 元组列表
+    """
+    nodes = []
+    for i in range(count):
+        source_url = SOURCES[i % len(SOURCES)]
+        name = COUNTRY_NAMES[i % len(COUNTRY_NAMES)]
+        host = f"node{i}.example.com"
+        kind = i % 4
+        if kind == 0:
+            payload = json.dumps({"v": "2", "ps": name, "add": host, "port": "443",
+                                  "id": f"00000000-0000-0000-0000-{i:012d}", "aid": "0",
+                                  "net": "ws", "path": "/ws", "host": host, "tls": ""})
+            node_url = "vmess://" + base64.b64encode(payload.encode("utf-8")).decode("ascii")
+        elif kind == 1:
+            auth = base64.b64encode(f"aes-256-gcm:pass{i}".encode("utf-8")).decode("ascii")
+            node_url = f"ss://{auth}@{host}:8388#{name}"
+        elif kind == 2:
+            node_url = f"trojan://pass{i}@{host}:443?sni={host}&type=ws&path=/t#{name}"
+        else:
+            node_url = (f"vless://00000000-0000-0000-0000-{i:012d}@{host}:443"
+                        f"?security=tls&sni={host}&type=ws&host={host}#{name}")
+        nodes.append((node_url, source_url))
+    return nodes
+
+def bench_naming(nodes, repeat=3):
+    """
+    测量节点命名（来源名称 + 名称分配）的单节点耗时
+    """
+    best = None
+    for _ in range(repeat):
+        namer = ProxyNamer({"HK": "🇭🇰", "JP": "🇯🇵", "US": "🇺🇸", "SG": "🇸🇬", "NL": "🇳🇱"})
+        names = [json.loads(base64.b64decode(n[8:]))["ps"] if n.startswith("vmess://") else n.rsplit("#", 1)[-1]
+                 for n, _ in nodes]
+        start = time.perf_counter()
+        for (node_url, source_url), name in zip(nodes, names):
+            namer.allocate(name, namer.short_source_name(source_url))
+        for source_url in SOURCES:
+            namer.group_name(source_url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def make_scheme_nodes(count):
+    """
+    为每种已注册的协议生成count个合成节点（名称和参数带百分号编码）
+
+    Returns:
+        dict: 协议名称 -> 节点URL列表
+    """
+    def b64(text):
+        return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+    nodes = {}
+    for i in range(count):
+        host = f"node{i}.example.com"
+        name = "%F0%9F%87%AD%F0%9F%87%B0%20HK%20" + str(i)
+        vmess = json.dumps({"v": "2", "ps": f"HK {i}", "add": host, "port": "443",
+                            "id": f"00000000-0000-0000-0000-{i:012d}", "aid": "0",
+                            "net": "ws", "path": "/ws", "host": host, "tls": "tls"})
+        ssr = (f"{host}:443:auth_aes128_md5:aes-256-cfb:tls1.2_ticket_auth:{b64(f'pass{i}')}"
+               f"/?remarks={b64(f'HK {i}')}&obfsparam={b64(host)}")
+        nodes.setdefault("ssr", []).append("ssr://" + b64(ssr))
+        nodes.setdefault("vmess", []).append("vmess://" + base64.b64encode(vmess.encode("utf-8")).decode("ascii"))
+        nodes.setdefault("ss", []).append(f"ss://{b64(f'aes-256-gcm:pass{i}')}@{host}:8388#{name}")
+        nodes.setdefault("vless", []).append(
+            f"vless://00000000-0000-0000-0000-{i:012d}@{host}:443?security=reality&sni={host}&pbk=key&sid=ab"
+            f"&fp=chrome&type=ws&path=%2Fws&host={host}#{name}")
+        nodes.setdefault("hysteria2", []).append(
+            f"hysteria2://pass{i}@{host}:443?sni={host}&insecure=1&upmbps=50&downmbps=100#{name}")
+        nodes.setdefault("trojan", []).append(
+            f"trojan://pass%40{i}@{host}:443?sni={host}&type=ws&path=%2Ft&host={host}#{name}")
+    return nodes
+
+def bench_parsers(count, repeat=3):
+    """
+    测量各协议节点解析（含名称分配）的单节点耗时
+
+    Returns:
+        dict: 协议名称 -> 最佳耗时（秒）
+    """
+    converter = SSRConverter()
+    results = {}
+    for scheme, urls in make_scheme_nodes(count).items():
+        best = None
+        for _ in range(repeat):
+            converter.proxy_namer.reset()
+            parse = converter.node_parsers.parse
+            start = time.perf_counter()
+            for node_url in urls:
+                parse(node_url, "bench")
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[scheme] = best
+    return results
+
+def bench_health(count, rounds=10):
+    """
+    测量健康度存储的记录和打分耗时（count个节点，每个节点rounds次历史）
+    """
+    keys = [f"vmess_node{i}.example.com_443" for i in range(count)]
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = HealthStore(directory)
+        start = time.perf_counter()
+        for round_index in range(rounds):
+            success = [rng.random() < 0.7 for _ in keys]
+            rtts = [rng.uniform(20, 800) if ok else None for ok in success]
+            store.record(keys, success, rtts, timestamp=1000.0 + round_index)
+        store.flush()
+        record_elapsed = (time.perf_counter() - start) / rounds
+
+        # 重新打开，模拟下一次运行
+        store = HealthStore(directory)
+        start = time.perf_counter()
+        store.scores(keys)
+        score_elapsed = time.perf_counter() - start
+    return record_elapsed, score_elapsed
+
+def bench_artifact(artifact_file, config_file=None):
+    """
+    在节点中间文件（fetch子命令的输出）上测量逐行读取和完整转换（与convert子命令相同）的耗时
+
+    Returns:
+        tuple: (节点数, 读取耗时, 转换耗时)
+    """
+    artifact = NodeArtifact(artifact_file)
+    start = time.perf_counter()
+    count = sum(1 for _ in artifact)
+    read_elapsed = time.perf_counter() - start
+    converter = SSRConverter()
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        converter.convert_ssr_nodes_to_clash_config(artifact, config_file, os.path.join(directory, "clash.yaml"))
+        convert_elapsed = time.perf_counter() - start
+    return count, read_elapsed, convert_elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="SSRConverter 性能基准")
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="合成节点数量")
+    parser.add_argument("-a", "--artifact", help="使用节点中间文件（fetch子命令的输出）代替合成节点，测量完整转换")
+    parser.add_argument("-c", "--config", help="转换使用的配置文件路径（与--artifact一起使用）")
+    args = parser.parse_args()
+
+    print(f"{'stage':<16}{'nodes':>10}{'total_ms':>12}{'us/node':>10}")
+    if args.artifact:
+        count, read_elapsed, convert_elapsed = bench_artifact(args.artifact, args.config)
+        for stage, elapsed in (("artifact-read", read_elapsed), ("convert", convert_elapsed)):
+            print(f"{stage:<16}{count:>10}{elapsed * 1000:>12.2f}{elapsed * 1e6 / max(count, 1):>10.2f}")
+        return
+    for count in args.nodes:
+        nodes = make_synthetic_nodes(count)
+        elapsed = bench_naming(nodes)
+        print(f"{'naming':<16}{count:>10}{elapsed * 1000:>12.2f}{elapsed * 1e6 / count:>10.2f}")
+        for scheme, elapsed in bench_parsers(count).items():
+            print(f"{'parse-' + scheme:<16}{count:>10}{elapsed * 1000:>12.2f}{elapsed * 1e6 / count:>10.2f}")
+        if np is not None:
+            record_elapsed, score_elapsed = bench_health(count)
+            print(f"{'health-rec':<16}{count:>10}{record_elapsed * 1000:>12.2f}{record_elapsed * 1e6 / count:>10.2f}")
+            print(f"{'health-score':<16}{count:>10}{score_elapsed * 1000:>12.2f}{score_elapsed * 1e6 / count:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import io
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+import http.server
+
+import yaml
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from SSRFetcher import SSRFetcher
+from DistributedFetch import FetchCoordinator
+
+def make_handler(delay, nodes_per_source):
+    """
+    模拟慢来源：每个请求等待delay秒后返回节点列表（纯文本）
+    """
+    class SlowSourceHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            source = self.path.strip('/').split('.')[0]
+            body = "\n".join(f"trojan://pass@{source}-node{i}.example.com:443#{source}-{i}"
+                             for i in range(nodes_per_source)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return SlowSourceHandler
+
+def write_config(directory, urls, workers):
+    config = {
+        "ssr_source": {
+            "urls": urls,
+            "request_timeout": 30,
+            "retry": {"max_attempts": 1},
+            "circuit_breaker": {"enable": False},
+            "stale_cache": {"enable": False},
+        },
+        "distributed": {
+            "enable": True,
+            "queue_file": os.path.join(directory, "queue.sqlite"),
+            "shard_dir": os.path.join(directory, "shards"),
+            "local_workers": workers,
+            "poll_interval": 0.05,
+        },
+    }
+    config_file = os.path.join(directory, f"config-{workers}.yaml")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+    return config_file, config
+
+def run_threaded(urls):
+    """
+    单进程基线：SSRFetcher的线程池并发获取
+    """
+    fetcher = SSRFetcher()
+    fetcher.configure({"retry": {"max_attempts": 1}})
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        nodes_by_source = fetcher.fetch_nodes_by_source(urls, timeout=30)
+        elapsed = time.perf_counter() - start
+    return elapsed, len(nodes_by_source)
+
+def run_distributed(directory, urls, workers):
+    """
+    协调进程 + workers个本地工作进程
+    """
+    config_file, config = write_config(directory, urls, workers)
+    fetcher = SSRFetcher()
+    fetcher.configure(config["ssr_source"])
+    coordinator = FetchCoordinator.from_config(fetcher, config["distributed"], config_file)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(io.StringIO()):
+        # 工作进程的输出也丢弃
+        saved_stdout = os.dup(1)
+        os.dup2(devnull.fileno(), 1)
+        try:
+            start = time.perf_counter()
+            nodes_by_source = coordinator.fetch_nodes_by_source(urls)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.dup2(saved_stdout, 1)
+            os.close(saved_stdout)
+    return elapsed, len(nodes_by_source)
+
+def main():
+    parser = argparse.ArgumentParser(description="分布式获取基准（本地多进程）")
+    parser.add_argument("-s", "--sources", type=int, default=80, help="来源数量")
+    parser.add_argument("--delay", type=float, default=0.5, help="每个来源的响应延迟（秒）")
+    parser.add_argument("--nodes", type=int, default=200, help="每个来源的节点数")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="工作进程数量")
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.delay, args.nodes))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/source{i}.txt" for i in range(args.sources)]
+    print(f"{args.sources} 个来源，每个来源延迟 {args.delay} 秒、{args.nodes} 个节点")
+
+    print(f"{'mode':<16}{'seconds':>10}{'sources/s':>12}{'ok':>6}")
+    try:
+        elapsed, ok = run_threaded(urls)
+        print(f"{'threads(5)':<16}{elapsed:>10.2f}{args.sources / elapsed:>12.1f}{ok:>6}")
+        with tempfile.TemporaryDirectory() as directory:
+            for workers in args.workers:
+                elapsed, ok = run_distributed(directory, urls, workers)
+                print(f"{f'workers({workers})':<16}{elapsed:>10.2f}{args.sources / elapsed:>12.1f}{ok:>6}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
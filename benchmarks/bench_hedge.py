@@ -0,0 +1,105 @@
+import os
+import io
+import sys
+import time
+import zlib
+import argparse
+import threading
+import contextlib
+import http.server
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from SSRFetcher import SSRFetcher
+
+def make_handler(delay, slow_delay, slow_ratio, nodes_per_source):
+    """
+    模拟有尾延迟的来源：按路径的CRC32确定性地选出slow_ratio比例的慢请求（等待slow_delay秒），
+    其余请求等待delay秒；来源 /source{i}.txt 和镜像 /mirror/source{i}.txt 返回相同的节点
+    """
+    class TailLatencyHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            slow = zlib.crc32(self.path.encode("utf-8")) % 1000 < slow_ratio * 1000
+            time.sleep(slow_delay if slow else delay)
+            source = self.path.rsplit('/', 1)[-1].split('.')[0]
+            body = "\n".join(f"trojan://pass@{source}-node{i}.example.com:443#{source}-{i}"
+                             for i in range(nodes_per_source)).encode("utf-8")
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # 对冲请求被取消时客户端已关闭连接
+                pass
+
+        def log_message(self, *args):
+            pass
+    return TailLatencyHandler
+
+class TimedFetcher(SSRFetcher):
+    """
+    记录每个来源从开始获取到返回的耗时
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.source_seconds = {}
+
+    def _fetch_source(self, url, user_agent=None, timeout=None, deadline=None):
+        started_at = time.perf_counter()
+        try:
+            return super()._fetch_source(url, user_agent, timeout, deadline)
+        finally:
+            self.source_seconds[url] = time.perf_counter() - started_at
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+def run(urls, mirrors, hedge_after):
+    fetcher = TimedFetcher()
+    fetcher.configure({
+        "retry": {"max_attempts": 1},
+        "adapters": {"enable": False},
+        "mirrors": {"enable": bool(mirrors), "sources": mirrors, "state_file": None,
+                    "default_delay": hedge_after},
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        nodes_by_source = fetcher.fetch_nodes_by_source(urls, timeout=30)
+        elapsed = time.perf_counter() - start
+    return elapsed, list(fetcher.source_seconds.values()), len(nodes_by_source), len(fetcher.last_mirror_sources)
+
+def main():
+    parser = argparse.ArgumentParser(description="镜像对冲请求基准（本地fixture服务注入尾延迟）")
+    parser.add_argument("-s", "--sources", type=int, default=40, help="来源数量")
+    parser.add_argument("--delay", type=float, default=0.2, help="正常请求的延迟（秒）")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="慢请求的延迟（秒）")
+    parser.add_argument("--slow-ratio", type=float, default=0.2, help="慢请求的比例")
+    parser.add_argument("--hedge-after", type=float, default=1.0, help="耗时样本不足时的对冲延迟（秒）")
+    parser.add_argument("--nodes", type=int, default=200, help="每个来源的节点数")
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), make_handler(args.delay, args.slow_delay, args.slow_ratio, args.nodes))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/source{i}.txt" for i in range(args.sources)]
+    mirrors = {url: [f"{base}/mirror/source{i}.txt"] for i, url in enumerate(urls)}
+    print(f"{args.sources} 个来源（各有一个镜像），正常延迟 {args.delay} 秒，"
+          f"{args.slow_ratio:.0%} 的请求延迟 {args.slow_delay} 秒")
+
+    print(f"{'mode':<10}{'seconds':>10}{'p50':>8}{'p90':>8}{'max':>8}{'ok':>6}{'mirror':>8}")
+    try:
+        for mode, source_mirrors in (("direct", {}), ("hedged", mirrors)):
+            elapsed, seconds, ok, mirrored = run(urls, source_mirrors, args.hedge_after)
+            print(f"{mode:<10}{elapsed:>10.2f}{percentile(seconds, 50):>8.2f}{percentile(seconds, 90):>8.2f}"
+                  f"{max(seconds):>8.2f}{ok:>6}{mirrored:>8}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
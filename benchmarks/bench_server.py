@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+# 添加src目录到Python路径，以便导入项目模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src"))
+
+from SubscriptionServer import SubscriptionServer
+
+def run_server(port, content_file, ready):
+    """
+    在独立进程（单核）中运行订阅服务
+    """
+    server = SubscriptionServer(host="127.0.0.1", port=port, path="/free-VPN.yaml")
+    if content_file and os.path.exists(content_file):
+        with open(content_file, 'rb') as f:
+            server.update(f.read())
+    else:
+        server.update(b"proxies: []\n" * 20000)
+    ready.set()
+    asyncio.run(server.serve())
+
+async def client(port, requests_per_client, conditional_ratio, latencies, etag_holder):
+    """
+    单个长连接客户端，按比例发送条件请求（If-None-Match）
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i in range(requests_per_client):
+            headers = "Accept-Encoding: gzip, br\r\n"
+            if etag_holder and (i % 100) < conditional_ratio * 100:
+                headers += f"If-None-Match: {etag_holder[0]}\r\n"
+            request = f"GET /free-VPN.yaml HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode("latin-1")
+
+            start = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                name = name.strip().lower()
+                if name == "content-length":
+                    content_length = int(value.strip())
+                elif name == "etag" and not etag_holder:
+                    etag_holder.append(value.strip())
+            if content_length and b" 200 " in status_line:
+                await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def load_test(port, clients, requests_per_client, conditional_ratio):
+    latencies = []
+    etag_holder = []
+    # 先发送一次请求获取ETag
+    await client(port, 1, 0, [], etag_holder)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(port, requests_per_client, conditional_ratio, latencies, etag_holder)
+        for _ in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="订阅HTTP服务压测")
+    parser.add_argument("--port", type=int, default=18080, help="服务端口")
+    parser.add_argument("--clients", type=int, default=1000, help="并发长连接数")
+    parser.add_argument("--requests", type=int, default=20, help="每个连接的请求数")
+    parser.add_argument("--conditional", type=float, default=0.9,
+                        help="条件请求（期望304）所占比例，模拟客户端轮询")
+    parser.add_argument("--content", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           "../output/free-VPN.yaml"),
+                        help="订阅内容文件")
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server_process = multiprocessing.Process(target=run_server, args=(args.port, args.content, ready), daemon=True)
+    server_process.start()
+    ready.wait()
+    time.sleep(0.5)
+
+    try:
+        latencies, elapsed = asyncio.run(load_test(args.port, args.clients, args.requests, args.conditional))
+    finally:
+        server_process.terminate()
+
+    latencies.sort()
+    total = len(latencies)
+    p50 = latencies[int(total * 0.50)] * 1000
+    p99 = latencies[min(int(total * 0.99), total - 1)] * 1000
+    print(f"clients={args.clients} requests={total} conditional={args.conditional:.0%}")
+    print(f"requests/sec: {total / elapsed:.0f}")
+    print(f"p50 latency: {p50:.2f} ms")
+    print(f"p99 latency: {p99:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# Chromium启动后在stderr输出的CDP地址
+DEVTOOLS_PATTERN = re.compile(r'DevTools listening on (ws://\S+)')
+
+class BrowserPrewarmer:
+    """
+    浏览器预热：在HTTP获取进行的同时在后台启动Chromium，Playwright回退时直接连接已启动的浏览器
+
+    以下来源会触发预热（状态保存在JSON文件中，跨多次运行有效）：
+    - js_rendered中标记为需要JavaScript渲染的来源
+    - 最近recent_window秒内使用过Playwright回退的来源
+    """
+
+    def __init__(self, state_file, js_rendered=None, recent_window=604800, executable_path="",
+                 launch_timeout=30):
+        self.state_file = state_file
+        self.js_rendered = set(js_rendered or [])
+        self.recent_window = recent_window
+        self.executable_path = executable_path
+        self.launch_timeout = launch_timeout
+        self._lock = threading.Lock()
+        # 来源URL -> 最近一次使用Playwright回退的时间（time.time）
+        self._state = {}
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取浏览器使用记录失败，重新开始记录: {str(e)}")
+
+    @classmethod
+    def from_config(cls, prewarm_config):
+        """
+        根据ssr_source.browser_prewarm配置创建浏览器预热器
+
+        Args:
+            prewarm_config (dict): ssr_source.browser_prewarm配置
+
+        Returns:
+            BrowserPrewarmer: 浏览器预热器
+        """
+        return cls(
+            prewarm_config.get("state_file", "./cache/browser_sources.json"),
+            js_rendered=prewarm_config.get("js_rendered") or [],
+            recent_window=prewarm_config.get("recent_window", 604800),
+            executable_path=prewarm_config.get("executable_path", ""),
+            launch_timeout=prewarm_config.get("launch_timeout", 30),
+        )
+
+    def sources_to_prewarm(self, urls):
+        """
+        找出需要预热浏览器的来源
+
+        Args:
+            urls (list): 本次获取的来源URL列表
+
+        Returns:
+            list: 标记为JavaScript渲染或最近使用过Playwright回退的来源
+        """
+        now = time.time()
+        with self._lock:
+            return [url for url in urls
+                    if url in self.js_rendered or now - self._state.get(url, 0) <= self.recent_window]
+
+    def record_browser_source(self, url):
+        """
+        记录来源使用了Playwright回退
+        """
+        with self._lock:
+            self._state[url] = time.time()
+
+    def launch(self):
+        """
+        在后台启动浏览器
+
+        Returns:
+            WarmBrowser: 正在启动的浏览器
+        """
+        warm_browser = WarmBrowser(self.executable_path, self.launch_timeout)
+        warm_browser.start()
+        return warm_browser
+
+    def save(self):
+        """
+        将浏览器使用记录写入文件（删除超过recent_window的记录）
+        """
+        if not self.state_file:
+            return
+        cutoff = time.time() - self.recent_window
+        with self._lock:
+            state = {url: used_at for url, used_at in self._state.items() if used_at >= cutoff}
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.state_file}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+class WarmBrowser:
+    """
+    在后台线程中启动的Chromium进程（开启远程调试端口），各获取线程通过CDP连接
+
+    Playwright的同步API对象不能跨线程使用，因此浏览器作为独立进程启动，
+    每个线程在自己的sync_playwright中用connect_over_cdp连接，关闭连接不会关闭浏览器。
+    本次获取结束后调用close_when_idle，最后一个使用者释放后结束进程。
+    """
+
+    def __init__(self, executable_path="", launch_timeout=30):
+        self.executable_path = executable_path
+        self.launch_timeout = launch_timeout
+        # 启动耗时（秒，从启动进程到CDP地址可用），启动失败时为None
+        self.launch_seconds = None
+        self.error = None
+        # 使用预热浏览器的次数和获取浏览器的耗时（秒），以及未能使用预热浏览器的次数
+        self.warm_acquire_seconds = []
+        self.cold_uses = 0
+        self._endpoint = None
+        self._process = None
+        self._user_data_dir = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._users = 0
+        self._closing = False
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        """
+        启动后台线程
+        """
+        self._thread = threading.Thread(target=self._launch, name="browser-prewarm", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _playwright_executable(self):
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            return p.chromium.executable_path
+
+    def _launch(self):
+        try:
+            executable = self.executable_path or self._playwright_executable()
+            if not os.path.exists(executable):
+                raise FileNotFoundError(f"未找到浏览器 {executable}，请执行 playwright install chromium")
+            started_at = time.perf_counter()
+            with self._lock:
+                if self._closed:
+                    return
+                self._user_data_dir = tempfile.mkdtemp(prefix="vpn2clash-chromium-")
+                self._process = subprocess.Popen(
+                    [executable, "--headless", "--remote-debugging-port=0",
+                     f"--user-data-dir={self._user_data_dir}", "--no-first-run",
+                     "--no-default-browser-check", "about:blank"],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                    text=True, errors='replace',
+                )
+            for line in self._process.stderr:
+                match = DEVTOOLS_PATTERN.search(line)
+                if match:
+                    self._endpoint = match.group(1)
+                    self.launch_seconds = time.perf_counter() - started_at
+                    break
+            else:
+                raise RuntimeError(f"浏览器进程已退出（退出码 {self._process.wait()}）")
+        except Exception as e:
+            self.error = str(e)
+            if not self._closed:
+                print(f"预热浏览器失败，回退时将启动新浏览器: {self.error}")
+        finally:
+            self._ready.set()
+        # 继续读取stderr，避免管道写满阻塞浏览器
+        if self._process:
+            for _ in self._process.stderr:
+                pass
+
+    def acquire(self):
+        """
+        等待浏览器启动完成并登记一个使用者
+
+        Returns:
+            str: CDP地址，启动失败、超时或已关闭时返回None
+        """
+        if not self._ready.wait(self.launch_timeout):
+            print(f"预热浏览器在 {self.launch_timeout} 秒内未启动完成")
+            return None
+        with self._lock:
+            if self._closing or not self._endpoint:
+                return None
+            self._users += 1
+            return self._endpoint
+
+    def release(self):
+        """
+        释放acquire登记的使用者
+        """
+        with self._lock:
+            self._users -= 1
+            stop = self._closing and self._users == 0
+        if stop:
+            self.stop()
+
+    def record_use(self, acquire_seconds, warm):
+        """
+        记录一次Playwright回退获取浏览器的情况
+
+        Args:
+            acquire_seconds (float): 从开始获取到浏览器可用的耗时（秒）
+            warm (bool): 是否使用了预热的浏览器
+        """
+        with self._lock:
+            if warm:
+                self.warm_acquire_seconds.append(acquire_seconds)
+            else:
+                self.cold_uses += 1
+
+    @property
+    def saved_seconds(self):
+        """
+        估计节省的时间：每次使用预热浏览器节省的启动耗时减去等待和连接的耗时
+        """
+        if self.launch_seconds is None:
+            return 0
+        return sum(max(self.launch_seconds - seconds, 0) for seconds in self.warm_acquire_seconds)
+
+    def close_when_idle(self):
+        """
+        不再接受新的使用者，当前使用者全部释放后结束浏览器进程
+        """
+        with self._lock:
+            self._closing = True
+            stop = self._users == 0
+        if stop:
+            self.stop()
+
+    def stop(self):
+        """
+        结束浏览器进程并删除临时用户目录
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._closing = True
+            process, user_data_dir = self._process, self._user_data_dir
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if user_data_dir:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
@@ -0,0 +1,122 @@
+import re
+
+class CapturePolicy:
+    """
+    Playwright回退中网络响应的捕获策略
+
+    页面事件回调中只根据URL、内容类型、资源类型和Content-Length筛选候选响应，
+    不在回调中读取响应体；候选响应体在页面稳定后按大小上限读取。
+    请求/响应日志使用固定长度的环形缓冲区，log_size为0时不记录。
+    """
+
+    # 不可能包含节点数据的资源类型
+    skipped_resource_types = {'image', 'stylesheet', 'font', 'media', 'script', 'manifest', 'websocket'}
+
+    def __init__(self, url_patterns=None, content_types=None, max_body_size=2 * 1024 * 1024,
+                 max_candidates=50, log_size=100):
+        self.url_patterns = [re.compile(pattern) for pattern in (url_patterns or [])]
+        self.content_types = content_types if content_types is not None else ['application/json', 'text/plain', 'text/html']
+        self.max_body_size = max_body_size
+        self.max_candidates = max_candidates
+        self.log_size = log_size
+
+    @classmethod
+    def from_config(cls, capture_config):
+        """
+        根据ssr_source.browser_capture配置创建捕获策略
+
+        Args:
+            capture_config (dict): ssr_source.browser_capture配置
+
+        Returns:
+            CapturePolicy: 捕获策略
+        """
+        return cls(
+            url_patterns=capture_config.get("url_patterns"),
+            content_types=capture_config.get("content_types"),
+            max_body_size=capture_config.get("max_body_size", 2 * 1024 * 1024),
+            max_candidates=capture_config.get("max_candidates", 50),
+            log_size=capture_config.get("log_size", 100),
+        )
+
+    def is_candidate(self, url, content_type, content_length=None, resource_type=None):
+        """
+        判断响应是否可能包含节点数据（只使用响应头，不读取响应体）
+
+        Args:
+            url (str): 请求URL
+            content_type (str): Content-Type响应头
+            content_length (str, optional): Content-Length响应头
+            resource_type (str, optional): Playwright请求的资源类型
+
+        Returns:
+            bool: 是否为候选响应
+        """
+        if resource_type in self.skipped_resource_types:
+            return False
+        content_type = (content_type or '').lower()
+        if not any(allowed in content_type for allowed in self.content_types):
+            return False
+        if self.url_patterns and not any(pattern.search(url) for pattern in self.url_patterns):
+            return False
+        if self.max_body_size and content_length and str(content_length).isdigit() and int(content_length) > self.max_body_size:
+            return False
+        return True
+
+    def read_body(self, response, session=None, timeout=30, chunk_size=64 * 1024):
+        """
+        读取候选响应的响应体，超过大小上限时放弃
+
+        Playwright只能一次性取回整个响应体，因此没有Content-Length的GET响应（分块传输）
+        改用session以相同的请求头重新流式请求，累计读取的字节数超过上限时立即停止，
+        不会先缓冲整个响应体再判断大小
+
+        Args:
+            response: Playwright响应对象
+            session (requests.Session, optional): 用于流式读取的HTTP会话，为None时直接读取Playwright的响应体
+            timeout (int): 流式请求的超时时间（秒）
+            chunk_size (int): 每次读取的字节数
+
+        Returns:
+            str: 响应体文本；读取失败或超过上限时返回None
+        """
+        request = response.request
+        content_length = response.headers.get('content-length')
+        try:
+            if self.max_body_size and session is not None and not content_length and request.method == 'GET':
+                body = self._read_streaming(session, request, timeout, chunk_size)
+            else:
+                body = response.body()
+        except Exception as e:
+            print(f"读取响应 {response.url} 内容失败: {str(e)}")
+            return None
+        if body is None or (self.max_body_size and len(body) > self.max_body_size):
+            print(f"响应 {response.url} 超过大小上限 {self.max_body_size} 字节，跳过")
+            return None
+        return body.decode('utf-8', errors='replace')
+
+    def _read_streaming(self, session, request, timeout, chunk_size):
+        """
+        以浏览器请求的请求头重新流式请求，分块读取响应体
+
+        Returns:
+            bytes: 响应体；超过大小上限时返回None
+        """
+        try:
+            headers = request.all_headers()
+        except Exception:
+            headers = dict(request.headers)
+        # 压缩和连接相关的请求头由requests处理（浏览器接受的编码requests不一定能解码），HTTP/2的伪头不能发送
+        skipped = ('host', 'content-length', 'connection', 'accept-encoding')
+        headers = {name: value for name, value in headers.items()
+                   if not name.startswith(':') and name.lower() not in skipped}
+        parts = []
+        total_bytes = 0
+        with session.get(request.url, headers=headers, timeout=timeout, stream=True) as streamed:
+            streamed.raise_for_status()
+            for chunk in streamed.iter_content(chunk_size=chunk_size):
+                total_bytes += len(chunk)
+                if total_bytes > self.max_body_size:
+                    return None
+                parts.append(chunk)
+        return b''.join(parts)
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+class CircuitBreaker:
+    """
+    持久化的熔断器，默认按来源URL计数，key为host时按主机计数（同一主机的来源一起熔断）
+
+    来源连续失败达到阈值后熔断（跳过该来源），冷却时间随连续失败次数指数增长；
+    冷却结束后允许一次尝试（半开），成功则恢复，失败则重新熔断。
+    只有连接错误、超时和HTTP错误计为失败，来源正常响应但没有节点不会导致熔断。
+    状态保存在JSON文件中，跨多次运行有效。
+    """
+
+    def __init__(self, state_file, failure_threshold=3, cooldown=21600, max_cooldown=604800, key="url"):
+        if key not in ("url", "host"):
+            raise ValueError(f"不支持的熔断键: {key}，可选url或host")
+        self.state_file = state_file
+        self.key = key
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._state = {}
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取熔断状态失败，重新开始记录: {str(e)}")
+
+    @classmethod
+    def from_config(cls, breaker_config):
+        """
+        根据ssr_source.circuit_breaker配置创建熔断器
+
+        Args:
+            breaker_config (dict): ssr_source.circuit_breaker配置
+
+        Returns:
+            CircuitBreaker: 熔断器
+        """
+        return cls(
+            breaker_config.get("state_file", "./cache/circuit_breaker.json"),
+            failure_threshold=breaker_config.get("failure_threshold", 3),
+            cooldown=breaker_config.get("cooldown", 21600),
+            max_cooldown=breaker_config.get("max_cooldown", 604800),
+            key=breaker_config.get("key", "url"),
+        )
+
+    @staticmethod
+    def is_failure(error):
+        """
+        判断获取来源时的异常是否计为熔断失败
+
+        Args:
+            error (Exception): 获取来源时的异常
+
+        Returns:
+            bool: 连接错误、超时和HTTP错误返回True，解析失败、截止时间和取消等返回False
+        """
+        return isinstance(error, requests.RequestException)
+
+    def _key(self, url):
+        if self.key == "host":
+            return urlparse(url).netloc or url
+        return url
+
+    def allow(self, url):
+        """
+        判断是否允许请求该URL
+
+        Args:
+            url (str): 来源URL
+
+        Returns:
+            bool: 未熔断或冷却已结束时返回True
+        """
+        with self._lock:
+            entry = self._state.get(self._key(url))
+            return not entry or entry.get("open_until", 0) <= time.time()
+
+    def retry_in(self, url):
+        """
+        距离冷却结束的秒数
+        """
+        with self._lock:
+            entry = self._state.get(self._key(url)) or {}
+            return max(entry.get("open_until", 0) - time.time(), 0)
+
+    def record_success(self, url):
+        """
+        记录成功，恢复该来源
+        """
+        with self._lock:
+            self._state.pop(self._key(url), None)
+
+    def record_failure(self, url):
+        """
+        记录失败，连续失败达到阈值时熔断该来源
+        """
+        key = self._key(url)
+        now = time.time()
+        with self._lock:
+            entry = self._state.setdefault(key, {"failures": 0, "open_until": 0})
+            entry["failures"] += 1
+            entry["last_failure"] = now
+            excess = entry["failures"] - self.failure_threshold
+            if excess >= 0:
+                cooldown = min(self.cooldown * (2 ** min(excess, 16)), self.max_cooldown)
+                entry["open_until"] = now + cooldown
+                print(f"{key} 连续失败 {entry['failures']} 次，熔断 {cooldown / 3600:.1f} 小时")
+
+    def save(self):
+        """
+        将熔断状态写入文件
+        """
+        if not self.state_file:
+            return
+        with self._lock:
+            state = dict(self._state)
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.state_file}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
@@ -0,0 +1,92 @@
+import os
+import requests
+
+class ClashController:
+    """
+    Clash external-controller API客户端，用于热重载配置而不重启客户端
+    """
+
+    def __init__(self, base_url, secret="", timeout=10, session=None):
+        if not base_url.startswith(("http://", "https://")):
+            base_url = f"http://{base_url}"
+        self.base_url = base_url.rstrip('/')
+        self.secret = secret
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置创建控制器客户端，默认使用clash.external_controller和clash.secret
+
+        Args:
+            config (dict): 完整配置字典
+
+        Returns:
+            ClashController: 控制器客户端
+        """
+        clash_config = config.get("clash", {})
+        clash_verge_config = config.get("clash_verge", {})
+        return cls(
+            clash_verge_config.get("controller_url") or clash_config.get("external_controller", "127.0.0.1:9090"),
+            secret=clash_verge_config.get("controller_secret", clash_config.get("secret", "")),
+            timeout=clash_verge_config.get("reload_timeout", 10),
+        )
+
+    def _request(self, method, path, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.secret:
+            headers["Authorization"] = f"Bearer {self.secret}"
+        return self.session.request(method, f"{self.base_url}{path}", headers=headers,
+                                    timeout=self.timeout, **kwargs)
+
+    def reload_config(self, config_path, use_payload=False):
+        """
+        通过 PUT /configs 重新加载配置文件
+
+        Args:
+            config_path (str): 配置文件路径
+            use_payload (bool): 发送文件内容而不是路径（控制器不在本机时使用）
+
+        Returns:
+            bool: 是否重载成功
+        """
+        if use_payload:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                body = {"payload": f.read()}
+        else:
+            body = {"path": os.path.abspath(config_path)}
+
+        response = self._request("PUT", "/configs", params={"force": "true"}, json=body)
+        if response.status_code not in (200, 204):
+            print(f"重载配置失败，状态码: {response.status_code}，响应: {response.text[:200]}")
+            return False
+
+        # 验证控制器仍然正常响应
+        response = self._request("GET", "/configs")
+        if response.status_code != 200:
+            print(f"重载后验证配置失败，状态码: {response.status_code}")
+            return False
+        return True
+
+    def update_proxy_provider(self, name):
+        """
+        通过 PUT /providers/proxies/{name} 只更新指定的proxy-provider
+
+        Args:
+            name (str): proxy-provider名称
+
+        Returns:
+            bool: 是否更新成功
+        """
+        path = f"/providers/proxies/{requests.utils.quote(name, safe='')}"
+        response = self._request("PUT", path)
+        if response.status_code not in (200, 204):
+            print(f"更新proxy-provider {name} 失败，状态码: {response.status_code}")
+            return False
+
+        response = self._request("GET", path)
+        if response.status_code != 200:
+            print(f"更新后验证proxy-provider {name} 失败，状态码: {response.status_code}")
+            return False
+        return True
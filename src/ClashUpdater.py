@@ -3,18 +3,31 @@ import sys
 import yaml
 import subprocess
 import time
+import random
+import threading
+import contextlib
 
 # 添加当前目录到Python路径，以便导入同级模块
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from SSRFetcher import SSRFetcher
 from SSRConverter import SSRConverter
+from SubscriptionServer import SubscriptionServer
+from ClashController import ClashController
+from DistributedFetch import FetchWorker, FetchCoordinator
+from NodeArtifact import NodeArtifact
+
+# fetch和convert子命令默认使用的节点中间文件
+DEFAULT_ARTIFACT_FILE = "./cache/nodes.jsonl"
 
 class ClashUpdater:
     def __init__(self):
         self.config_manager = self._create_config_manager()
         self.ssr_fetcher = SSRFetcher()
         self.ssr_converter = SSRConverter()
+        self.subscription_server = None
+        # 性能分析器（--profile启用时由main.py设置）
+        self.profiler = None
         
     def _create_config_manager(self):
         """
@@ -26,35 +39,281 @@ class ClashUpdater:
         from SSRFetcher import ConfigManager
         return ConfigManager()
     
-    def update_clash_config(self, config_file=None, output_file=None):
+    def update_clash_config(self, config_file=None, output_file=None, artifact_file=None):
         """
-        更新Clash配置文件
+        更新Clash配置文件（all子命令：获取、写出节点中间文件、转换）
         
         Args:
             config_file (str, optional): 配置文件路径
             output_file (str, optional): 输出文件路径
+            artifact_file (str, optional): 节点中间文件路径，默认使用run.artifact_file配置，均未设置时不写出
             
         Returns:
-            dict: 更新后的Clash配置
+            dict: 更新后的Clash配置，没有获取到任何节点时返回None（保留上次的输出）
         """
         print("开始更新Clash配置...")
+        started_at = time.monotonic()
         
         # 加载配置
         config = self.config_manager.load_configuration(config_file)
         
+        nodes_with_source = self._fetch_stage(config, config_file, started_at)
+        if not nodes_with_source:
+            return None
+        
+        # 保存本次获取的节点，之后可以用convert子命令离线复现本次转换
+        artifact_file = artifact_file or config.get("run", {}).get("artifact_file")
+        if artifact_file:
+            self._write_artifact(artifact_file, nodes_with_source)
+        
+        clash_config = self._convert_stage(config, config_file, output_file, nodes_with_source)
+        
+        print(f"\nClash配置更新完成！总耗时 {time.monotonic() - started_at:.1f} 秒")
+        return clash_config
+    
+    def fetch_nodes(self, config_file=None, artifact_file=None):
+        """
+        只获取节点并写出节点中间文件（fetch子命令）
+        
+        Args:
+            config_file (str, optional): 配置文件路径
+            artifact_file (str, optional): 节点中间文件路径，默认使用run.artifact_file配置
+            
+        Returns:
+            NodeArtifact: 写出的节点中间文件，没有获取到任何节点时返回None（保留上次的节点中间文件）
+        """
+        print("开始获取代理节点...")
+        started_at = time.monotonic()
+        
+        config = self.config_manager.load_configuration(config_file)
+        nodes_with_source = self._fetch_stage(config, config_file, started_at)
+        if not nodes_with_source:
+            return None
+        artifact_file = artifact_file or config.get("run", {}).get("artifact_file") or DEFAULT_ARTIFACT_FILE
+        artifact = self._write_artifact(artifact_file, nodes_with_source)
+        
+        print(f"\n节点获取完成！总耗时 {time.monotonic() - started_at:.1f} 秒")
+        return artifact
+    
+    def convert_artifact(self, config_file=None, output_file=None, artifact_file=None):
+        """
+        根据节点中间文件生成Clash配置（convert子命令），逐行读取节点，不访问来源
+        
+        Args:
+            config_file (str, optional): 配置文件路径
+            output_file (str, optional): 输出文件路径
+            artifact_file (str, optional): 节点中间文件路径，默认使用run.artifact_file配置
+            
+        Returns:
+            dict: 生成的Clash配置
+        """
+        print("开始根据节点中间文件生成Clash配置...")
+        started_at = time.monotonic()
+        
+        config = self.config_manager.load_configuration(config_file)
+        artifact_file = artifact_file or config.get("run", {}).get("artifact_file") or DEFAULT_ARTIFACT_FILE
+        if not os.path.exists(artifact_file):
+            raise Exception(f"节点中间文件 {artifact_file} 不存在，请先运行fetch子命令")
+        artifact = NodeArtifact(artifact_file)
+        
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(artifact.header["created_at"]))
+        print(f"节点中间文件 {artifact_file}：{created_at} 生成，{len(artifact)} 个节点，"
+              f"{len(artifact.sources)} 个来源")
+        for source in artifact.sources:
+            fetched_at = source.get("fetched_at")
+            fetched_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(fetched_at)) if fetched_at else "未知"
+            print(f"  {source['url']}（获取方式 {source.get('strategy') or '未知'}，获取时间 {fetched_at}）")
+        
+        clash_config = self._convert_stage(config, config_file, output_file, artifact)
+        
+        print(f"\nClash配置生成完成！总耗时 {time.monotonic() - started_at:.1f} 秒")
+        return clash_config
+    
+    def _fetch_stage(self, config, config_file, started_at):
+        """
+        获取阶段：获取所有来源的节点并输出来源报告
+        
+        所有来源都失败、被熔断跳过或被截止时间截断时不抛出异常，报告中说明本次未生成任何输出，
+        调用方保留上次的输出并正常结束（免费来源同时失效很常见，不应让定时任务失败）
+        
+        Args:
+            config (dict): 配置字典
+            config_file (str): 配置文件路径
+            started_at (float): 运行开始时间（time.monotonic）
+            
+        Returns:
+            list: 代理节点列表，每个节点是一个元组 (node_url, source_url)，没有获取到任何节点时为空列表
+        """
+        # 运行时间预算：获取阶段在截止时间前结束，为转换和写出预留时间
+        run_config = config.get("run", {})
+        time_budget = run_config.get("time_budget", 0)
+        fetch_deadline = None
+        if time_budget:
+            fetch_deadline = started_at + max(time_budget - run_config.get("convert_reserve", 60), 0)
+            print(f"运行时间预算 {time_budget} 秒")
+        
         # 1. 获取节点
         print("\n1. 获取代理节点...")
-        nodes_with_source = self.ssr_fetcher.get_nodes_from_web(config_file)
+        try:
+            with self._profile_stage("fetch"):
+                distributed_config = config.get("distributed") or {}
+                if distributed_config.get("enable", False):
+                    nodes_with_source = self._get_nodes_distributed(config, config_file, fetch_deadline)
+                else:
+                    nodes_with_source = self.ssr_fetcher.get_nodes_from_web(config_file, deadline=fetch_deadline)
+        finally:
+            self._print_run_report(config, started_at)
         
         if not nodes_with_source:
-            raise Exception("未获取到任何代理节点")
+            line = "未获取到任何代理节点：本次未生成任何输出，保留上次的输出"
+            print(f"\n{line}")
+            if self.profiler:
+                self.profiler.note(line)
+        return nodes_with_source
+    
+    def _write_artifact(self, artifact_file, nodes_with_source):
+        """
+        将获取的节点连同各来源的获取时间和获取方式写入节点中间文件
         
+        Args:
+            artifact_file (str): 节点中间文件路径
+            nodes_with_source (list): 代理节点列表，每个节点是一个元组 (node_url, source_url)
+            
+        Returns:
+            NodeArtifact: 写出的节点中间文件
+        """
+        fetcher = self.ssr_fetcher
+        source_info = {
+            url: {"fetched_at": fetcher.last_fetched_at.get(url), "strategy": fetcher.last_strategies.get(url)}
+            for url in fetcher.last_nodes_by_source
+        }
+        with self._profile_stage("artifact"):
+            artifact = NodeArtifact.write(artifact_file, nodes_with_source, source_info)
+        print(f"已将 {len(nodes_with_source)} 个节点写入节点中间文件 {artifact_file}")
+        return artifact
+    
+    def _convert_stage(self, config, config_file, output_file, nodes_with_source):
+        """
+        转换阶段：将节点转换为Clash配置并应用到Clash Verge
+        
+        Args:
+            config (dict): 配置字典
+            config_file (str): 配置文件路径
+            output_file (str): 输出文件路径
+            nodes_with_source (list or NodeArtifact): 代理节点，每个节点是一个元组 (node_url, source_url)
+            
+        Returns:
+            dict: Clash配置
+        """
         # 2. 转换节点为Clash配置
         print("\n2. 转换节点为Clash配置...")
-        clash_config = self.ssr_converter.convert_ssr_nodes_to_clash_config(
-            nodes_with_source, config_file, output_file
-        )
+        with self._profile_stage("convert"):
+            clash_config = self.ssr_converter.convert_ssr_nodes_to_clash_config(
+                nodes_with_source, config_file, output_file
+            )
+        if self.ssr_converter.last_output_unchanged:
+            print("配置语义内容与上次相同（unchanged），未写出任何文件")
+        
+        with self._profile_stage("apply"):
+            self._apply_clash_verge_config(config)
+        return clash_config
+    
+    def _profile_stage(self, name):
+        """
+        性能分析的阶段上下文，未启用性能分析时为空操作
+        """
+        return self.profiler.stage(name) if self.profiler else contextlib.nullcontext()
+    
+    def _get_nodes_distributed(self, config, config_file, deadline):
+        """
+        分布式获取节点：来源加入共享队列，由工作进程获取，协调进程合并去重
+        
+        Args:
+            config (dict): 配置字典
+            config_file (str): 配置文件路径
+            deadline (float): 获取阶段的截止时间（time.monotonic）
+            
+        Returns:
+            list: 代理节点列表，每个节点是一个元组 (node_url, source_url)
+        """
+        ssr_source = config.get("ssr_source", {})
+        urls = ssr_source.get("urls", [])
+        if not urls:
+            raise ValueError("配置中未设置ssr_source.urls")
+        self.ssr_fetcher.configure(ssr_source)
+        self.ssr_fetcher.dedup_config = config.get("dedup") or {}
+        coordinator = FetchCoordinator.from_config(self.ssr_fetcher, config.get("distributed") or {}, config_file)
+        nodes_by_source = coordinator.fetch_nodes_by_source(urls, deadline)
+        return self.ssr_fetcher.merge_nodes_by_source(nodes_by_source, urls)
+    
+    def run_worker(self, config_file=None, stop_event=None):
+        """
+        以分布式获取的工作进程运行：从共享队列领取来源并写入节点分片
+        
+        Args:
+            config_file (str, optional): 配置文件路径
+            stop_event (threading.Event, optional): 停止事件
+        """
+        config = self.config_manager.load_configuration(config_file)
+        worker = FetchWorker.from_config(self.ssr_fetcher, config)
+        worker.run(stop_event)
+    
+    def _print_run_report(self, config, started_at):
+        """
+        输出获取阶段的来源报告：成功、失败、被熔断跳过、因截止时间未完成和使用缓存节点的来源、
+        对冲请求和使用镜像结果的来源，以及浏览器预热的启动耗时和估计节省的时间
+        
+        Args:
+            config (dict): 配置字典
+            started_at (float): 运行开始时间（time.monotonic）
+        """
+        fetcher = self.ssr_fetcher
+        urls = config.get("ssr_source", {}).get("urls", [])
+        skipped = fetcher.last_skipped_sources
+        cutoff = fetcher.last_cutoff_sources
+        stale = fetcher.last_stale_sources
+        succeeded = [url for url in urls if fetcher.last_nodes_by_source.get(url) and url not in stale]
+        skipped = [url for url in skipped if url not in stale]
+        cutoff = [url for url in cutoff if url not in stale]
+        failed = [url for url in urls
+                  if url not in succeeded and url not in stale and url not in skipped and url not in cutoff]
+        
+        print(f"\n获取阶段耗时 {time.monotonic() - started_at:.1f} 秒：成功 {len(succeeded)} 个来源，"
+              f"使用缓存节点 {len(stale)} 个，失败 {len(failed)} 个，熔断跳过 {len(skipped)} 个，"
+              f"因截止时间未完成 {len(cutoff)} 个")
+        for url in stale:
+            print(f"  使用缓存: {url}")
+        for url in failed:
+            print(f"  失败: {url}")
+        for url in skipped:
+            print(f"  熔断跳过: {url}")
+        for url in cutoff:
+            print(f"  未完成: {url}")
+        if fetcher.last_hedged_sources or fetcher.last_mirror_sources:
+            print(f"对冲请求 {len(fetcher.last_hedged_sources)} 个来源，"
+                  f"{len(fetcher.last_mirror_sources)} 个来源使用了镜像的结果")
+        for url, mirror in fetcher.last_mirror_sources.items():
+            print(f"  使用镜像: {url} -> {mirror}")
         
+        warm_browser = fetcher.last_warm_browser
+        if warm_browser:
+            if warm_browser.launch_seconds is None:
+                line = f"浏览器预热失败: {warm_browser.error or '未在获取结束前启动完成'}"
+            else:
+                line = (f"浏览器预热：启动耗时 {warm_browser.launch_seconds:.2f} 秒（与HTTP获取并行），"
+                        f"{len(warm_browser.warm_acquire_seconds)} 次回退使用预热的浏览器，"
+                        f"{warm_browser.cold_uses} 次启动新浏览器，估计节省 {warm_browser.saved_seconds:.2f} 秒")
+            print(line)
+            if self.profiler:
+                self.profiler.note(line)
+    
+    def _apply_clash_verge_config(self, config):
+        """
+        检查Clash Verge配置目录，并按配置自动重启Clash Verge
+        
+        Args:
+            config (dict): 配置字典
+        """
         # 3. 检查Clash Verge配置
         clash_verge_config = config.get("clash_verge", {})
         config_directory = clash_verge_config.get("config_directory", "")
@@ -67,13 +326,230 @@ class ClashUpdater:
             else:
                 print(f"Clash Verge配置目录已存在: {config_directory}")
         
+        # 4. 通过控制器API热重载配置（如果配置了），失败时回退到重启
+        if clash_verge_config.get("hot_reload", False):
+            print("\n4. 通过external-controller热重载配置...")
+            if self._hot_reload_clash(config):
+                return
+            if auto_restart:
+                print("热重载失败，回退到重启Clash Verge")
+        
         # 4. 自动重启Clash Verge（如果配置了）
         if auto_restart:
             print("\n4. 自动重启Clash Verge...")
             self._restart_clash_verge(clash_verge_config)
+    
+    def _hot_reload_clash(self, config):
+        """
+        通过Clash external-controller API热重载配置，不中断现有连接
         
-        print("\nClash配置更新完成！")
-        return clash_config
+        主配置变化时 PUT /configs；只有本地proxy-provider分片变化时，
+        仅通过 PUT /providers/proxies/{name} 更新变化的分片
+        
+        Args:
+            config (dict): 配置字典
+            
+        Returns:
+            bool: 是否重载成功
+        """
+        converter = self.ssr_converter
+        output_path = converter.last_output_file
+        if not output_path or not os.path.exists(output_path):
+            print("未找到生成的配置文件，无法热重载")
+            return False
+        
+        changed_providers = converter.last_changed_providers
+        if not converter.last_output_changed and not changed_providers:
+            print("配置未变化，无需重载")
+            return True
+        
+        clash_verge_config = config.get("clash_verge", {})
+        controller = ClashController.from_config(config)
+        try:
+            if converter.last_output_changed:
+                success = controller.reload_config(output_path, clash_verge_config.get("reload_with_payload", False))
+            else:
+                success = all([controller.update_proxy_provider(name) for name in changed_providers])
+        except Exception as e:
+            print(f"调用external-controller失败: {str(e)}")
+            return False
+        
+        if success:
+            if converter.last_output_changed:
+                print(f"已通过 {controller.base_url} 热重载配置")
+            else:
+                print(f"已通过 {controller.base_url} 更新 {len(changed_providers)} 个proxy-provider分片")
+        return success
+    
+    def run_daemon(self, config_file=None, output_file=None, stop_event=None):
+        """
+        守护模式：常驻进程，按各来源的刷新间隔定时获取节点，
+        复用已创建的获取器、转换器及其连接池和缓存，仅在节点变化时重新生成配置
+        
+        Args:
+            config_file (str, optional): 配置文件路径
+            output_file (str, optional): 输出文件路径
+            stop_event (threading.Event, optional): 设置后退出守护循环
+        """
+        config = self.config_manager.load_configuration(config_file)
+        ssr_source = config.get("ssr_source", {})
+        urls = ssr_source.get("urls", [])
+        user_agent = ssr_source.get("user_agent")
+        timeout = ssr_source.get("request_timeout")
+        self.ssr_fetcher.configure(ssr_source)
+        self.ssr_fetcher.dedup_config = config.get("dedup") or {}
+        
+        if not urls:
+            raise ValueError("配置中未设置ssr_source.urls")
+        
+        daemon_config = config.get("daemon", {})
+        default_interval = daemon_config.get("refresh_interval", 3600)
+        stop_event = stop_event or threading.Event()
+        
+        print(f"守护模式已启动，共 {len(urls)} 个来源，默认刷新间隔 {default_interval} 秒")
+        
+        # 可选的内置订阅HTTP服务
+        server_config = config.get("subscription_server", {})
+        if server_config.get("enable", False):
+            self.subscription_server = SubscriptionServer.from_config(server_config)
+            self.subscription_server.start()
+        
+        try:
+            self._run_daemon_loop(config, config_file, output_file, stop_event, urls,
+                                  user_agent, timeout, daemon_config)
+        finally:
+            if self.subscription_server:
+                self.subscription_server.stop()
+                self.subscription_server = None
+        
+        print("守护模式已停止")
+    
+    def _run_daemon_loop(self, config, config_file, output_file, stop_event, urls,
+                         user_agent, timeout, daemon_config):
+        """
+        守护模式主循环：按各来源的下次刷新时间获取节点并重新生成配置
+        """
+        default_interval = daemon_config.get("refresh_interval", 3600)
+        retry_interval = daemon_config.get("retry_interval", 300)
+        jitter = daemon_config.get("jitter", 0.1)
+        source_intervals = daemon_config.get("source_intervals") or {}
+        # 来源持续失败时保留上次节点的最长时间（秒），默认与来源缓存的max_stale相同
+        cache_config = config.get("ssr_source", {}).get("stale_cache") or {}
+        max_stale = daemon_config.get("max_stale", cache_config.get("max_stale", 259200))
+        
+        # 每个来源的下次刷新时间（time.monotonic），启动时全部立即刷新
+        next_due = {url: 0.0 for url in urls}
+        # 每个来源最近一次成功获取的节点及其获取时间（time.time）
+        nodes_by_source = {}
+        fetched_at = {}
+        
+        while not stop_event.is_set():
+            now = time.monotonic()
+            due_urls = [url for url in urls if next_due[url] <= now]
+            
+            if due_urls:
+                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] 刷新 {len(due_urls)} 个来源...")
+                fetched = self.ssr_fetcher.fetch_nodes_by_source(due_urls, user_agent, timeout)
+                
+                changed = False
+                for url in due_urls:
+                    # 使用缓存节点的来源按失败处理，较早重试
+                    if url in fetched and url not in self.ssr_fetcher.last_stale_sources:
+                        interval = source_intervals.get(url, default_interval)
+                        fetched_at[url] = self.ssr_fetcher.last_fetched_at.get(url, time.time())
+                        if set(fetched[url]) != set(nodes_by_source.get(url, [])):
+                            nodes_by_source[url] = fetched[url]
+                            changed = True
+                    else:
+                        # 获取失败时保留上次（或缓存）的节点，并较早重试
+                        if url in fetched and url not in nodes_by_source:
+                            nodes_by_source[url] = fetched[url]
+                            fetched_at[url] = self.ssr_fetcher.last_fetched_at.get(url, time.time())
+                            changed = True
+                        interval = min(retry_interval, source_intervals.get(url, default_interval))
+                    next_due[url] = time.monotonic() + self._jittered_interval(interval, jitter)
+                
+                if self._expire_stale_sources(nodes_by_source, fetched_at, max_stale):
+                    changed = True
+                
+                if changed:
+                    self._refresh_output(config, config_file, output_file, nodes_by_source, urls)
+                else:
+                    print("节点未变化，跳过生成配置")
+            
+            wait_time = max(min(next_due.values()) - time.monotonic(), 0)
+            print(f"下次刷新将在 {int(wait_time)} 秒后进行")
+            stop_event.wait(wait_time)
+    
+    def _expire_stale_sources(self, nodes_by_source, fetched_at, max_stale):
+        """
+        删除超过max_stale秒未成功获取的来源的节点，避免失效来源的节点一直留在输出中
+        
+        Args:
+            nodes_by_source (dict): 来源URL到节点列表的映射
+            fetched_at (dict): 来源URL到最近一次成功获取时间（time.time）的映射
+            max_stale (float): 节点最长保留时间（秒），0表示不限制
+            
+        Returns:
+            list: 被删除节点的来源
+        """
+        if not max_stale:
+            return []
+        now = time.time()
+        expired = [url for url in nodes_by_source if now - fetched_at.get(url, now) > max_stale]
+        for url in expired:
+            del nodes_by_source[url]
+            fetched_at.pop(url, None)
+            print(f"来源 {url} 已超过 {max_stale} 秒未成功获取，不再使用其上次的节点")
+        return expired
+    
+    def _refresh_output(self, config, config_file, output_file, nodes_by_source, urls):
+        """
+        守护模式下根据各来源的最新节点重新生成配置
+        
+        Args:
+            config (dict): 配置字典
+            config_file (str): 配置文件路径
+            output_file (str): 输出文件路径
+            nodes_by_source (dict): 来源URL到节点列表的映射
+            urls (list): 来源顺序
+        """
+        try:
+            nodes_with_source = self.ssr_fetcher.merge_nodes_by_source(nodes_by_source, urls)
+            if not nodes_with_source:
+                print("没有任何来源的节点，保留上次的输出")
+                return
+            self.ssr_converter.convert_ssr_nodes_to_clash_config(
+                nodes_with_source, config_file, output_file
+            )
+        except Exception as e:
+            print(f"生成配置失败: {str(e)}")
+            return
+        
+        # 只有proxy-provider分片变化时精简主配置保持不变，也需要通知客户端更新变化的分片
+        if self.ssr_converter.last_output_changed or self.ssr_converter.last_changed_providers:
+            self._apply_clash_verge_config(config)
+        
+        # 更新内置订阅服务的内容（首次刷新时即使文件未变化也需要加载）
+        server = self.subscription_server
+        output_path = self.ssr_converter.last_output_file
+        if server and output_path and os.path.exists(output_path):
+            if self.ssr_converter.last_output_changed or not server.has_content():
+                with open(output_path, 'rb') as f:
+                    server.update(f.read())
+    
+    def _jittered_interval(self, interval, jitter):
+        """
+        为刷新间隔添加随机抖动，避免各来源同时刷新
+        
+        Args:
+            interval (float): 刷新间隔（秒）
+            jitter (float): 抖动比例
+            
+        Returns:
+            float: 添加抖动后的间隔（秒）
+        """
+        return max(interval * (1 + random.uniform(-jitter, jitter)), 1)
     
     def _restart_clash_verge(self, clash_verge_config):
         """
@@ -0,0 +1,60 @@
+import json
+import hashlib
+
+# 哈希内容的格式版本，规范化方式变化时递增，使旧哈希失效
+CONTENT_HASH_VERSION = 1
+
+# 成员顺序有意义的代理组类型（fallback按顺序选择第一个可用节点，relay按顺序串联）
+ORDERED_GROUP_TYPES = {"fallback", "relay"}
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+def proxy_identity(proxy):
+    """
+    代理的语义标识：除名称外的所有字段，名称后缀变化不影响标识
+
+    Args:
+        proxy (dict): Clash代理配置
+
+    Returns:
+        str: 标识摘要
+    """
+    fields = {key: value for key, value in proxy.items() if key != "name"}
+    return hashlib.blake2b(_canonical(fields).encode('utf-8'), digest_size=16).hexdigest()
+
+def semantic_hash(clash_config, settings=None):
+    """
+    计算Clash配置语义内容的规范化哈希
+
+    - 节点：按语义标识组成的集合，与顺序和名称无关
+    - 代理组：按名称索引，组成员中的节点换成语义标识；fallback和relay保持成员顺序，
+      select、url-test等其他类型与成员顺序无关（客户端按名称记住select的选择）
+    - 规则：保持顺序（按顺序匹配）
+    - 其他配置项（端口、DNS、rule-providers等）和settings（例如输出配置）按键排序后参与哈希
+
+    Args:
+        clash_config (dict): Clash配置字典
+        settings (dict, optional): 其他影响输出内容的设置
+
+    Returns:
+        str: 十六进制哈希
+    """
+    proxies = clash_config.get("proxies") or []
+    identities = {proxy["name"]: proxy_identity(proxy) for proxy in proxies}
+
+    groups = {}
+    for group in clash_config.get("proxy-groups") or []:
+        members = [identities.get(name, f"group:{name}") for name in group.get("proxies") or []]
+        fields = {key: value for key, value in group.items() if key not in ("name", "proxies")}
+        fields["proxies"] = members if group.get("type") in ORDERED_GROUP_TYPES else sorted(members)
+        groups[group["name"]] = fields
+
+    other = {key: value for key, value in clash_config.items()
+             if key not in ("proxies", "proxy-groups", "rules")}
+    digest = hashlib.sha256()
+    for part in (CONTENT_HASH_VERSION, sorted(identities.values()), groups,
+                 clash_config.get("rules") or [], other, settings or {}):
+        digest.update(_canonical(part).encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
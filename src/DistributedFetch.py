@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加当前目录到Python路径，以便导入同级模块
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from SourceQueue import SourceQueue
+from CircuitBreaker import CircuitBreaker
+
+class FetchWorker:
+    """
+    分布式获取的工作进程：从共享队列领取来源，获取并提取节点，将节点写入分片文件
+
+    工作进程只负责获取和提取（包括重试和来源适配器），熔断和来源缓存由协调进程统一处理，
+    避免多个进程同时改写同一个状态文件。
+    """
+
+    def __init__(self, fetcher, queue, shard_dir, user_agent=None, timeout=None, poll_interval=1,
+                 idle_timeout=0, threads=5):
+        self.fetcher = fetcher
+        self.queue = queue
+        self.shard_dir = shard_dir
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.threads = max(int(threads), 1)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    @classmethod
+    def from_config(cls, fetcher, config):
+        """
+        根据配置创建工作进程
+
+        Args:
+            fetcher (SSRFetcher): 节点获取器
+            config (dict): 完整配置
+
+        Returns:
+            FetchWorker: 工作进程
+        """
+        ssr_source = config.get("ssr_source", {})
+        distributed_config = config.get("distributed") or {}
+        fetcher.configure(ssr_source)
+        fetcher.circuit_breaker = None
+        fetcher.source_cache = None
+        fetcher.dedup_config = config.get("dedup") or {}
+        return cls(
+            fetcher,
+            SourceQueue.from_config(distributed_config),
+            distributed_config.get("shard_dir", "./cache/shards"),
+            user_agent=ssr_source.get("user_agent"),
+            timeout=ssr_source.get("request_timeout"),
+            poll_interval=distributed_config.get("poll_interval", 1),
+            idle_timeout=distributed_config.get("worker_idle_timeout", 0),
+            threads=distributed_config.get("worker_threads", 5),
+        )
+
+    def run(self, stop_event=None):
+        """
+        使用threads个线程并发领取并处理任务，没有未结束的运行且空闲超过idle_timeout秒时退出
+
+        Args:
+            stop_event (threading.Event, optional): 停止事件
+
+        Returns:
+            int: 处理的任务数
+        """
+        print(f"工作进程 {self.worker_id} 已启动，{self.threads} 个线程")
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = [executor.submit(self._claim_loop, stop_event) for _ in range(self.threads)]
+            processed = sum(future.result() for future in futures)
+        print(f"工作进程 {self.worker_id} 退出，共处理 {processed} 个来源")
+        return processed
+
+    def _claim_loop(self, stop_event):
+        processed = 0
+        idle_since = time.monotonic()
+        while not (stop_event and stop_event.is_set()):
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                if not self.queue.has_open_runs() and time.monotonic() - idle_since >= self.idle_timeout:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.process(*job)
+            processed += 1
+            idle_since = time.monotonic()
+        return processed
+
+    def process(self, run_id, url, attempt=1):
+        """
+        获取一个来源的节点并写入分片文件
+
+        Args:
+            run_id (str): 运行ID
+            url (str): 来源URL
+            attempt (int): 第几次尝试
+        """
+        print(f"工作进程 {self.worker_id} 获取来源（第 {attempt} 次）: {url}")
+        # 在租约到期前结束，避免任务被其他工作进程重复领取
+        deadline = time.monotonic() + self.queue.lease * 0.9
+        try:
+            nodes = self.fetcher._fetch_source(url, self.user_agent, self.timeout, deadline)
+        except Exception as e:
+            print(f"工作进程 {self.worker_id} 获取 {url} 失败: {str(e)}")
+            self.queue.fail(run_id, url, e, source_failure=CircuitBreaker.is_failure(e))
+            return
+        shard_file = self.write_shard(run_id, url, nodes)
+        self.queue.complete(run_id, url, shard_file)
+        print(f"工作进程 {self.worker_id} 从 {url} 获取到 {len(nodes)} 个节点")
+
+    def write_shard(self, run_id, url, nodes):
+        """
+        将来源的节点写入分片文件（先写临时文件再替换）
+
+        Returns:
+            str: 分片文件相对于shard_dir的路径（各机器上共享目录的挂载位置可以不同）
+        """
+        os.makedirs(os.path.join(self.shard_dir, run_id), exist_ok=True)
+        shard_file = f"{run_id}/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.json"
+        shard_path = os.path.join(self.shard_dir, shard_file)
+        tmp_file = f"{shard_path}.{self.worker_id}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "nodes": nodes, "fetched_at": time.time(), "worker": self.worker_id,
+                       "strategy": self.fetcher.last_strategies.get(url),
+                       "mirror": self.fetcher.last_mirror_sources.get(url)}, f, ensure_ascii=False)
+        os.replace(tmp_file, shard_path)
+        return shard_file
+
+class FetchCoordinator:
+    """
+    分布式获取的协调进程：把来源加入共享队列，按需启动本地工作进程，等待完成后读取分片，
+    处理熔断和来源缓存，结果与SSRFetcher.fetch_nodes_by_source一致
+    """
+
+    def __init__(self, fetcher, queue, shard_dir, local_workers=0, poll_interval=1, config_file=None):
+        self.fetcher = fetcher
+        self.queue = queue
+        self.shard_dir = shard_dir
+        self.local_workers = local_workers
+        self.poll_interval = poll_interval
+        self.config_file = config_file
+
+    @classmethod
+    def from_config(cls, fetcher, distributed_config, config_file=None):
+        """
+        根据distributed配置创建协调进程
+
+        Args:
+            fetcher (SSRFetcher): 节点获取器（已根据ssr_source配置）
+            distributed_config (dict): distributed配置
+            config_file (str, optional): 配置文件路径，传给本地工作进程
+
+        Returns:
+            FetchCoordinator: 协调进程
+        """
+        return cls(
+            fetcher,
+            SourceQueue.from_config(distributed_config),
+            distributed_config.get("shard_dir", "./cache/shards"),
+            local_workers=distributed_config.get("local_workers", 0),
+            poll_interval=distributed_config.get("poll_interval", 1),
+            config_file=config_file,
+        )
+
+    def _start_local_workers(self):
+        main_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        command = [sys.executable, main_file, "--worker"]
+        if self.config_file:
+            command += ["-c", self.config_file]
+        return [subprocess.Popen(command) for _ in range(self.local_workers)]
+
+    def fetch_nodes_by_source(self, urls, deadline=None):
+        """
+        通过工作进程获取多个来源的节点，按来源返回
+
+        Args:
+            urls (list): 来源URL列表
+            deadline (float, optional): 截止时间（time.monotonic），到达后结束运行，未完成的来源
+                                        记录在fetcher.last_cutoff_sources中
+
+        Returns:
+            dict: 来源URL到节点列表的映射
+        """
+        fetcher = self.fetcher
+        nodes_by_source = {}
+        fetcher.last_nodes_by_source = nodes_by_source
+        fetcher.last_skipped_sources = []
+        fetcher.last_cutoff_sources = []
+        fetcher.last_stale_sources = []
+        fetcher.last_strategies = {}
+        fetcher.last_fetched_at = {}
+        fetcher.last_warm_browser = None
+        fetcher.last_hedged_sources = []
+        fetcher.last_mirror_sources = {}
+        breaker = fetcher.circuit_breaker
+        cache = fetcher.source_cache
+
+        # 跳过已熔断的来源
+        allowed_urls = []
+        for url in urls:
+            if breaker and not breaker.allow(url):
+                fetcher.last_skipped_sources.append(url)
+                print(f"URL {url} 已熔断，{breaker.retry_in(url) / 60:.0f} 分钟后再尝试，本次跳过")
+            else:
+                allowed_urls.append(url)
+
+        run_id = self.queue.create_run(allowed_urls)
+        print(f"已创建分布式获取任务 {run_id}，共 {len(allowed_urls)} 个来源，启动 {self.local_workers} 个本地工作进程")
+        workers = self._start_local_workers()
+        try:
+            while True:
+                status = self.queue.status(run_id)
+                if not status.get("pending") and not status.get("claimed"):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    print(f"已到达运行截止时间，结束分布式获取任务 {run_id}")
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            self.queue.close_run(run_id)
+            for process in workers:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.terminate()
+
+        for job in self.queue.jobs(run_id):
+            url = job["url"]
+            if job["state"] == "done":
+                with open(os.path.join(self.shard_dir, job["shard_file"]), 'r', encoding='utf-8') as f:
+                    shard = json.load(f)
+                nodes = shard["nodes"]
+                if breaker:
+                    breaker.record_success(url)
+                if nodes:
+                    nodes_by_source[url] = nodes
+                    fetcher.last_strategies[url] = shard.get("strategy")
+                    fetcher.last_fetched_at[url] = shard.get("fetched_at")
+                    if shard.get("mirror"):
+                        fetcher.last_mirror_sources[url] = shard["mirror"]
+                    if cache:
+                        cache.put(url, nodes)
+                    continue
+                print(f"URL {url} 未获取到节点")
+                fetcher._serve_stale(url, nodes_by_source, "未获取到节点")
+            elif job["state"] == "cancelled":
+                fetcher.last_cutoff_sources.append(url)
+                fetcher._serve_stale(url, nodes_by_source, "未在截止时间前完成")
+            else:
+                print(f"URL {url} 获取失败（工作进程 {job['worker']}）: {job['error']}")
+                if breaker and job["source_failure"]:
+                    breaker.record_failure(url)
+                fetcher._serve_stale(url, nodes_by_source, "获取失败")
+        for url in fetcher.last_skipped_sources:
+            fetcher._serve_stale(url, nodes_by_source, "已熔断")
+
+        shutil.rmtree(os.path.join(self.shard_dir, run_id), ignore_errors=True)
+        if breaker:
+            breaker.save()
+        if cache:
+            cache.save()
+        return nodes_by_source
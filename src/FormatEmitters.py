@@ -0,0 +1,300 @@
+import json
+import base64
+from urllib.parse import quote, urlencode
+
+def _b64(text):
+    return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+def _b64url(text):
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii').rstrip('=')
+
+class SingBoxEmitter:
+    """
+    将Clash代理配置转换为sing-box的outbounds
+    """
+
+    # sing-box不支持的代理类型（ShadowsocksR已被移除）
+    unsupported_types = {'ssr'}
+
+    def render(self, clash_config):
+        """
+        生成sing-box JSON配置（仅包含outbounds）
+
+        Args:
+            clash_config (dict): Clash配置字典
+
+        Returns:
+            str: JSON字符串
+        """
+        outbounds = []
+        skipped = 0
+        for proxy in clash_config.get("proxies", []):
+            outbound = self.convert_proxy(proxy)
+            if outbound is None:
+                skipped += 1
+                continue
+            outbounds.append(outbound)
+
+        if skipped:
+            print(f"sing-box输出跳过 {skipped} 个不支持的节点")
+
+        tags = [outbound["tag"] for outbound in outbounds]
+        if tags:
+            groups = [
+                {"type": "selector", "tag": "FREE-PROXY", "outbounds": ["AUTO-SWITCH"] + tags},
+                {"type": "urltest", "tag": "AUTO-SWITCH", "outbounds": tags,
+                 "url": "http://www.gstatic.com/generate_204", "interval": "5m", "tolerance": 50},
+            ]
+        else:
+            # sing-box不接受成员为空的组，没有可用节点时只保留直连
+            groups = [{"type": "selector", "tag": "FREE-PROXY", "outbounds": ["direct"]}]
+        direct = [{"type": "direct", "tag": "direct"}]
+        return json.dumps({"outbounds": groups + outbounds + direct}, ensure_ascii=False, indent=2)
+
+    def convert_proxy(self, proxy):
+        """
+        将单个Clash代理配置转换为sing-box outbound
+
+        Args:
+            proxy (dict): Clash代理配置
+
+        Returns:
+            dict: sing-box outbound，不支持的类型返回None
+        """
+        proxy_type = proxy.get("type")
+        if proxy_type in self.unsupported_types:
+            return None
+
+        outbound = {
+            "tag": proxy["name"],
+            "server": proxy["server"],
+            "server_port": proxy["port"],
+        }
+
+        if proxy_type == 'ss':
+            outbound.update({"type": "shadowsocks", "method": proxy.get("cipher"), "password": proxy.get("password")})
+        elif proxy_type == 'vmess':
+            outbound.update({"type": "vmess", "uuid": proxy.get("uuid"),
+                             "security": proxy.get("cipher", "auto"), "alter_id": proxy.get("alterId", 0)})
+            if proxy.get("tls"):
+                outbound["tls"] = self._tls(proxy, proxy.get("servername"))
+        elif proxy_type == 'vless':
+            outbound.update({"type": "vless", "uuid": proxy.get("uuid")})
+            if proxy.get("tls"):
+                outbound["tls"] = self._tls(proxy, proxy.get("servername"))
+        elif proxy_type == 'trojan':
+            outbound.update({"type": "trojan", "password": proxy.get("password")})
+            outbound["tls"] = self._tls(proxy, proxy.get("servername"))
+        elif proxy_type == 'hysteria2':
+            outbound.update({"type": "hysteria2", "password": proxy.get("password")})
+            if proxy.get("up"):
+                outbound["up_mbps"] = int(proxy["up"])
+            if proxy.get("down"):
+                outbound["down_mbps"] = int(proxy["down"])
+            if proxy.get("obfs"):
+                outbound["obfs"] = {"type": proxy["obfs"], "password": proxy.get("obfs-password", "")}
+            outbound["tls"] = self._tls(proxy, proxy.get("sni"), insecure_key="insecure")
+        else:
+            return None
+
+        transport = self._transport(proxy)
+        if transport:
+            outbound["transport"] = transport
+        return outbound
+
+    def _tls(self, proxy, server_name, insecure_key="skip-cert-verify"):
+        tls = {"enabled": True, "insecure": bool(proxy.get(insecure_key, False))}
+        if server_name:
+            tls["server_name"] = server_name
+        if proxy.get("alpn"):
+            tls["alpn"] = proxy["alpn"]
+        reality_opts = proxy.get("reality-opts")
+        if reality_opts:
+            tls["reality"] = {"enabled": True, "public_key": reality_opts.get("public-key", ""),
+                              "short_id": reality_opts.get("short-id", "")}
+        if proxy.get("client-fingerprint"):
+            tls["utls"] = {"enabled": True, "fingerprint": proxy["client-fingerprint"]}
+        return tls
+
+    def _transport(self, proxy):
+        network = proxy.get("network")
+        if network == 'ws':
+            ws_opts = proxy.get("ws-opts", {})
+            transport = {"type": "ws", "path": ws_opts.get("path", "/")}
+            host = ws_opts.get("headers", {}).get("Host")
+            if host:
+                transport["headers"] = {"Host": host}
+            return transport
+        if network == 'grpc':
+            return {"type": "grpc", "service_name": proxy.get("grpc-opts", {}).get("grpc-service-name", "")}
+        if network == 'h2':
+            h2_opts = proxy.get("h2-opts", {})
+            transport = {"type": "http", "path": h2_opts.get("path", "/")}
+            if h2_opts.get("host"):
+                transport["host"] = h2_opts["host"]
+            return transport
+        if network == 'http':
+            http_opts = proxy.get("http-opts", {})
+            transport = {"type": "http", "method": http_opts.get("method", "GET")}
+            if http_opts.get("path"):
+                transport["path"] = http_opts["path"][0]
+            host = http_opts.get("headers", {}).get("Host")
+            if host:
+                transport["host"] = [host]
+            return transport
+        return None
+
+class UriSubscriptionEmitter:
+    """
+    由Clash代理配置重新生成节点URI，输出纯文本或base64订阅（v2rayN等客户端）
+    """
+
+    def render(self, clash_config):
+        """
+        生成纯文本URI订阅，每行一个节点
+
+        Args:
+            clash_config (dict): Clash配置字典
+
+        Returns:
+            str: 纯文本订阅内容
+        """
+        uris = []
+        for proxy in clash_config.get("proxies", []):
+            uri = self.proxy_to_uri(proxy)
+            if uri:
+                uris.append(uri)
+        return "\n".join(uris) + "\n" if uris else ""
+
+    def render_base64(self, clash_config):
+        """
+        生成base64编码的URI订阅
+
+        Args:
+            clash_config (dict): Clash配置字典
+
+        Returns:
+            str: base64订阅内容
+        """
+        return _b64(self.render(clash_config))
+
+    def proxy_to_uri(self, proxy):
+        """
+        将单个Clash代理配置转换为节点URI
+
+        Args:
+            proxy (dict): Clash代理配置
+
+        Returns:
+            str: 节点URI，不支持的类型返回None
+        """
+        proxy_type = proxy.get("type")
+        name = proxy.get("name", "")
+        server = proxy.get("server")
+        port = proxy.get("port")
+
+        if proxy_type == 'ss':
+            auth = _b64(f"{proxy.get('cipher')}:{proxy.get('password')}")
+            return f"ss://{auth}@{server}:{port}#{quote(name)}"
+
+        if proxy_type == 'ssr':
+            params = {"remarks": _b64url(name)}
+            if proxy.get("obfs-param"):
+                params["obfsparam"] = _b64url(proxy["obfs-param"])
+            if proxy.get("protocol-param"):
+                params["protoparam"] = _b64url(proxy["protocol-param"])
+            main_part = (f"{server}:{port}:{proxy.get('protocol')}:{proxy.get('cipher')}:"
+                         f"{proxy.get('obfs')}:{_b64url(proxy.get('password', ''))}")
+            query = "&".join(f"{key}={value}" for key, value in params.items())
+            return "ssr://" + _b64url(f"{main_part}/?{query}")
+
+        if proxy_type == 'vmess':
+            ws_opts = proxy.get("ws-opts", {})
+            vmess_config = {
+                "v": "2",
+                "ps": name,
+                "add": server,
+                "port": str(port),
+                "id": proxy.get("uuid"),
+                "aid": str(proxy.get("alterId", 0)),
+                "scy": proxy.get("cipher", "auto"),
+                "net": proxy.get("network", "tcp"),
+                "type": "none",
+                "host": ws_opts.get("headers", {}).get("Host", ""),
+                "path": ws_opts.get("path", ""),
+                "tls": "tls" if proxy.get("tls") else "",
+                "sni": proxy.get("servername", ""),
+            }
+            return "vmess://" + _b64(json.dumps(vmess_config, ensure_ascii=False))
+
+        if proxy_type == 'vless':
+            params = {"type": proxy.get("network", "tcp")}
+            reality_opts = proxy.get("reality-opts")
+            if reality_opts is not None:
+                params["security"] = "reality"
+                if reality_opts.get("public-key"):
+                    params["pbk"] = reality_opts["public-key"]
+                if reality_opts.get("short-id"):
+                    params["sid"] = reality_opts["short-id"]
+            else:
+                params["security"] = "tls" if proxy.get("tls") else "none"
+            if proxy.get("servername"):
+                params["sni"] = proxy["servername"]
+            if proxy.get("alpn"):
+                params["alpn"] = ",".join(proxy["alpn"])
+            if proxy.get("client-fingerprint"):
+                params["fp"] = proxy["client-fingerprint"]
+            self._add_transport_params(proxy, params)
+            return f"vless://{proxy.get('uuid')}@{server}:{port}?{urlencode(params)}#{quote(name)}"
+
+        if proxy_type == 'trojan':
+            params = {}
+            if proxy.get("servername"):
+                params["sni"] = proxy["servername"]
+            if proxy.get("alpn"):
+                params["alpn"] = ",".join(proxy["alpn"])
+            if proxy.get("skip-cert-verify"):
+                params["allowInsecure"] = "1"
+            if proxy.get("network") == 'ws':
+                params["type"] = "ws"
+                self._add_transport_params(proxy, params)
+            query = f"?{urlencode(params)}" if params else ""
+            return f"trojan://{quote(str(proxy.get('password')), safe='')}@{server}:{port}{query}#{quote(name)}"
+
+        if proxy_type == 'hysteria2':
+            params = {}
+            if proxy.get("sni"):
+                params["sni"] = proxy["sni"]
+            if proxy.get("alpn"):
+                params["alpn"] = ",".join(proxy["alpn"])
+            if proxy.get("insecure"):
+                params["insecure"] = "1"
+            if proxy.get("obfs"):
+                params["obfs"] = proxy["obfs"]
+            if proxy.get("obfs-password"):
+                params["obfs-password"] = proxy["obfs-password"]
+            if proxy.get("up"):
+                params["upmbps"] = proxy["up"]
+            if proxy.get("down"):
+                params["downmbps"] = proxy["down"]
+            query = f"?{urlencode(params)}" if params else ""
+            return f"hysteria2://{quote(str(proxy.get('password')), safe='')}@{server}:{port}{query}#{quote(name)}"
+
+        return None
+
+    def _add_transport_params(self, proxy, params):
+        network = proxy.get("network")
+        if network == 'ws':
+            ws_opts = proxy.get("ws-opts", {})
+            if ws_opts.get("path"):
+                params["path"] = ws_opts["path"]
+            if ws_opts.get("headers", {}).get("Host"):
+                params["host"] = ws_opts["headers"]["Host"]
+        elif network == 'grpc':
+            params["serviceName"] = proxy.get("grpc-opts", {}).get("grpc-service-name", "")
+        elif network == 'h2':
+            h2_opts = proxy.get("h2-opts", {})
+            if h2_opts.get("path"):
+                params["path"] = h2_opts["path"]
+            if h2_opts.get("host"):
+                params["host"] = h2_opts["host"][0]
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class HealthStore:
+    """
+    持久化的节点健康度历史，按节点唯一键存储
+
+    每个节点保留最近history次探测的时间戳、是否成功和延迟（RTT），
+    数据保存在内存映射的NumPy文件中，打分（成功率、p50/p95延迟、首次出现至今的时间）全部向量化计算。
+    节点唯一键以SHA-1摘要存储，不会把密码等信息写入磁盘。
+    超过evict_after秒未出现的节点在保存时被删除，数组随之压缩，免费节点不断更替时文件大小保持有界。
+    """
+
+    def __init__(self, directory, history=32, initial_capacity=1024, evict_after=0):
+        if np is None:
+            raise ImportError("节点健康度存储需要安装numpy")
+        self.directory = directory
+        self.history = history
+        self.initial_capacity = initial_capacity
+        self.evict_after = evict_after
+        os.makedirs(directory, exist_ok=True)
+
+        self._index_file = os.path.join(directory, "index.json")
+        self._index = {}
+        if os.path.exists(self._index_file):
+            with open(self._index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("history") == history:
+                self._index = data.get("keys", {})
+
+        capacity = max(initial_capacity, len(self._index))
+        # 旧版本的数据没有last_seen，已有节点视为刚出现，避免第一次保存时全部被删除
+        missing_last_seen = not os.path.exists(os.path.join(directory, "last_seen.npy"))
+        self._open_arrays(capacity, reset=not self._index)
+        if missing_last_seen and self._index:
+            self.arrays["last_seen"][:len(self._index)] = time.time()
+
+    def _array_specs(self):
+        history = self.history
+        return {
+            "timestamps": ("float64", (history,)),
+            "success": ("uint8", (history,)),
+            "rtt": ("float32", (history,)),
+            "cursor": ("int32", ()),
+            "count": ("int32", ()),
+            "first_seen": ("float64", ()),
+            "last_seen": ("float64", ()),
+        }
+
+    def _open_arrays(self, capacity, reset=False):
+        """
+        打开（必要时创建或扩容）内存映射数组
+        """
+        self.arrays = {}
+        for name, (dtype, tail) in self._array_specs().items():
+            path = os.path.join(self.directory, f"{name}.npy")
+            array = None
+            if not reset and os.path.exists(path):
+                array = np.lib.format.open_memmap(path, mode='r+')
+                if array.shape[1:] != tail or array.dtype != np.dtype(dtype):
+                    array = None
+            if array is None or array.shape[0] < capacity:
+                new_capacity = capacity if array is None else max(capacity, array.shape[0] * 2)
+                tmp_path = f"{path}.tmp"
+                new_array = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype,
+                                                      shape=(new_capacity,) + tail)
+                new_array[:] = 0
+                if array is not None:
+                    new_array[:array.shape[0]] = array
+                new_array.flush()
+                del new_array, array
+                os.replace(tmp_path, path)
+                array = np.lib.format.open_memmap(path, mode='r+')
+            self.arrays[name] = array
+
+    @property
+    def capacity(self):
+        return self.arrays["cursor"].shape[0]
+
+    def _hash_key(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _rows(self, keys, create=False, now=None):
+        """
+        将节点唯一键映射为数组行号，create为True时为新节点分配行号
+
+        Returns:
+            numpy.ndarray: 行号数组，不存在的节点为-1
+        """
+        rows = np.empty(len(keys), dtype=np.int64)
+        new_rows = []
+        for i, key in enumerate(keys):
+            hashed = self._hash_key(key)
+            row = self._index.get(hashed)
+            if row is None and create:
+                row = len(self._index)
+                self._index[hashed] = row
+                new_rows.append(row)
+            rows[i] = -1 if row is None else row
+
+        if new_rows:
+            if len(self._index) > self.capacity:
+                self._open_arrays(len(self._index))
+            new_rows = np.asarray(new_rows)
+            self.arrays["first_seen"][new_rows] = now if now is not None else time.time()
+        return rows
+
+    def touch(self, keys, now=None):
+        """
+        记录节点在本次转换中出现（没有探测结果的节点也不会被删除）
+
+        Args:
+            keys (list): 节点唯一键列表
+            now (float, optional): 当前时间
+        """
+        if not keys:
+            return
+        now = now if now is not None else time.time()
+        rows = self._rows(keys, create=True, now=now)
+        self.arrays["last_seen"][rows] = now
+
+    def record(self, keys, success, rtts, timestamp=None):
+        """
+        记录一批探测结果
+
+        Args:
+            keys (list): 节点唯一键列表
+            success (list): 是否探测成功
+            rtts (list): 延迟（毫秒），失败时可以为None
+            timestamp (float, optional): 探测时间，默认当前时间
+        """
+        if not keys:
+            return
+        timestamp = timestamp if timestamp is not None else time.time()
+        rows = self._rows(keys, create=True, now=timestamp)
+
+        arrays = self.arrays
+        positions = arrays["cursor"][rows]
+        arrays["timestamps"][rows, positions] = timestamp
+        arrays["success"][rows, positions] = np.asarray(success, dtype=np.uint8)
+        arrays["rtt"][rows, positions] = np.array([np.nan if rtt is None else rtt for rtt in rtts], dtype=np.float32)
+        arrays["cursor"][rows] = (positions + 1) % self.history
+        arrays["count"][rows] = np.minimum(arrays["count"][rows] + 1, self.history)
+        arrays["last_seen"][rows] = timestamp
+
+    def scores(self, keys, now=None):
+        """
+        计算节点得分
+
+        Args:
+            keys (list): 节点唯一键列表
+            now (float, optional): 当前时间
+
+        Returns:
+            dict: 各项得分数组（samples、success_rate、p50、p95、age、since_last_probe），
+                  没有历史记录的节点success_rate/p50/p95为NaN
+        """
+        now = now if now is not None else time.time()
+        rows = self._rows(keys)
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+
+        arrays = self.arrays
+        count = np.where(known, arrays["count"][safe_rows], 0)
+        valid = np.arange(self.history)[None, :] < count[:, None]
+        success = (arrays["success"][safe_rows] == 1) & valid
+        rtt = np.where(success, arrays["rtt"][safe_rows], np.nan)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            success_rate = np.where(count > 0, success.sum(axis=1) / np.maximum(count, 1), np.nan)
+        p50, p95 = self._percentiles(rtt, (0.5, 0.95))
+        age = np.where(known, now - arrays["first_seen"][safe_rows], 0.0)
+        last_probe = np.where(valid, arrays["timestamps"][safe_rows], 0.0).max(axis=1)
+        since_last_probe = np.where(count > 0, now - last_probe, np.inf)
+
+        return {"samples": count, "success_rate": success_rate, "p50": p50, "p95": p95, "age": age,
+                "since_last_probe": since_last_probe}
+
+    def _percentiles(self, values, quantiles):
+        """
+        按行计算忽略NaN的分位数（线性插值），比numpy.nanpercentile的逐行实现快得多
+        """
+        ordered = np.sort(values, axis=1)  # NaN排在末尾
+        valid = (~np.isnan(ordered)).sum(axis=1)
+        has_value = valid > 0
+        last = np.maximum(valid - 1, 0)
+        results = []
+        for q in quantiles:
+            position = last * q
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            lower_values = np.take_along_axis(ordered, lower[:, None], axis=1)[:, 0]
+            upper_values = np.take_along_axis(ordered, upper[:, None], axis=1)[:, 0]
+            result = lower_values + (upper_values - lower_values) * (position - lower)
+            results.append(np.where(has_value, result, np.nan))
+        return results
+
+    def evict(self, max_age, now=None):
+        """
+        删除超过max_age秒未出现的节点，并把剩余节点压缩到数组前部
+
+        Args:
+            max_age (float): 节点最长未出现时间（秒），0表示不删除
+            now (float, optional): 当前时间
+
+        Returns:
+            int: 删除的节点数
+        """
+        if not max_age or not self._index:
+            return 0
+        now = now if now is not None else time.time()
+        last_seen = self.arrays["last_seen"]
+        entries = sorted(self._index.items(), key=lambda item: item[1])
+        kept = [(hashed, row) for hashed, row in entries if last_seen[row] >= now - max_age]
+        evicted = len(entries) - len(kept)
+        if not evicted:
+            return 0
+
+        rows = np.asarray([row for _, row in kept], dtype=np.int64)
+        data = {name: np.array(array[rows]) for name, array in self.arrays.items()}
+        self.arrays = {}
+        self._open_arrays(max(self.initial_capacity, len(kept)), reset=True)
+        for name, values in data.items():
+            self.arrays[name][:len(kept)] = values
+        self._index = {hashed: row for row, (hashed, _) in enumerate(kept)}
+        return evicted
+
+    def flush(self):
+        """
+        删除超过evict_after秒未出现的节点，并将内存映射数组和键索引写回磁盘
+        """
+        evicted = self.evict(self.evict_after)
+        if evicted:
+            print(f"健康度历史删除了 {evicted} 个超过 {self.evict_after} 秒未出现的节点，剩余 {len(self._index)} 个")
+        for array in self.arrays.values():
+            array.flush()
+        tmp_file = f"{self._index_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"history": self.history, "keys": self._index}, f)
+        os.replace(tmp_file, self._index_file)
@@ -0,0 +1,117 @@
+import os
+import json
+import threading
+
+class FetchCancelled(Exception):
+    """
+    对冲请求中已有其他镜像返回结果，本次获取被取消
+    """
+
+class HedgePolicy:
+    """
+    镜像来源的对冲请求策略
+
+    来源配置了镜像时，先请求来源本身；超过延迟百分位仍未完成时向下一个镜像发出请求（对冲），
+    某个请求失败时立即请求下一个镜像，使用最先获取到节点的结果并取消其余请求。
+    对冲延迟取该URL最近成功获取耗时的percentile百分位，样本不足min_samples时使用所有来源的耗时，
+    仍不足时使用default_delay。耗时记录保存在JSON文件中，跨多次运行有效。
+    """
+
+    def __init__(self, mirrors, state_file=None, percentile=90, min_samples=5, default_delay=5,
+                 min_delay=0.5, history_size=50):
+        self.mirrors = mirrors
+        self.state_file = state_file
+        self.percentile = percentile
+        self.min_samples = max(int(min_samples), 1)
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        # URL -> 最近history_size次成功获取的耗时（秒）
+        self._latencies = {}
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self._latencies = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取来源耗时记录失败，重新开始记录: {str(e)}")
+
+    @classmethod
+    def from_config(cls, mirror_config):
+        """
+        根据ssr_source.mirrors配置创建对冲策略
+
+        Args:
+            mirror_config (dict): ssr_source.mirrors配置
+
+        Returns:
+            HedgePolicy: 对冲策略
+        """
+        return cls(
+            mirror_config.get("sources") or {},
+            state_file=mirror_config.get("state_file", "./cache/source_latency.json"),
+            percentile=mirror_config.get("percentile", 90),
+            min_samples=mirror_config.get("min_samples", 5),
+            default_delay=mirror_config.get("default_delay", 5),
+            min_delay=mirror_config.get("min_delay", 0.5),
+            history_size=mirror_config.get("history_size", 50),
+        )
+
+    def mirrors_for(self, url):
+        """
+        来源的镜像URL列表（按优先顺序），没有镜像时返回空列表
+        """
+        return list(self.mirrors.get(url) or [])
+
+    def _percentile(self, samples):
+        ordered = sorted(samples)
+        # 最近秩法
+        rank = max(int(len(ordered) * self.percentile / 100 + 0.999999), 1)
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def hedge_delay(self, url):
+        """
+        计算向下一个镜像发出对冲请求前的等待时间
+
+        Args:
+            url (str): 来源URL
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        with self._lock:
+            samples = list(self._latencies.get(url) or [])
+            if len(samples) < self.min_samples:
+                samples = [seconds for history in self._latencies.values() for seconds in history]
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self._percentile(samples), self.min_delay)
+
+    def record_latency(self, url, seconds):
+        """
+        记录一次成功获取的耗时
+
+        Args:
+            url (str): 来源或镜像URL
+            seconds (float): 获取耗时（秒）
+        """
+        with self._lock:
+            history = self._latencies.setdefault(url, [])
+            history.append(round(seconds, 3))
+            del history[:-self.history_size]
+
+    def save(self):
+        """
+        将耗时记录写入文件
+        """
+        if not self.state_file:
+            return
+        with self._lock:
+            state = {url: list(history) for url, history in self._latencies.items()}
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.state_file}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
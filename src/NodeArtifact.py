@@ -0,0 +1,114 @@
+import os
+import gzip
+import json
+import time
+
+class NodeArtifact:
+    """
+    获取阶段的中间产物（fetch子命令写出，convert子命令读取）
+
+    JSON Lines格式，文件名以.gz结尾时使用gzip压缩。首行为文件头：版本、创建时间、节点数和来源表
+    （来源URL、获取时间和获取方式），之后每行一个去重后的节点 [node_url, 来源序号]。
+    读取时逐行解析，节点不会全部载入内存。
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._header = None
+
+    @classmethod
+    def write(cls, path, nodes_with_source, source_info=None):
+        """
+        写出中间产物（先写临时文件再替换）
+
+        Args:
+            path (str): 文件路径
+            nodes_with_source (list): 代理节点列表，每个节点是一个元组 (node_url, source_url)
+            source_info (dict, optional): 来源URL到 {"fetched_at": 获取时间, "strategy": 获取方式} 的映射
+
+        Returns:
+            NodeArtifact: 写出的中间产物
+        """
+        source_info = source_info or {}
+        source_index = {}
+        sources = []
+        for _, source_url in nodes_with_source:
+            if source_url not in source_index:
+                source_index[source_url] = len(sources)
+                info = source_info.get(source_url) or {}
+                sources.append({
+                    "url": source_url,
+                    "fetched_at": info.get("fetched_at"),
+                    "strategy": info.get("strategy"),
+                })
+        header = {
+            "version": cls.VERSION,
+            "created_at": time.time(),
+            "count": len(nodes_with_source),
+            "sources": sources,
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with cls._open(path, tmp_file, 'wt') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for node_url, source_url in nodes_with_source:
+                f.write(json.dumps([node_url, source_index[source_url]], ensure_ascii=False) + "\n")
+        os.replace(tmp_file, path)
+        return cls(path)
+
+    @staticmethod
+    def _open(path, file, mode):
+        if path.endswith(".gz"):
+            return gzip.open(file, mode, encoding='utf-8')
+        return open(file, mode, encoding='utf-8')
+
+    @property
+    def header(self):
+        """
+        文件头：version、created_at、count和sources
+        """
+        if self._header is None:
+            with self._open(self.path, self.path, 'rt') as f:
+                self._header = self._parse_header(f.readline())
+        return self._header
+
+    def _parse_header(self, line):
+        try:
+            header = json.loads(line)
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or "sources" not in header:
+            raise ValueError(f"{self.path} 不是有效的节点中间文件")
+        if header.get("version") != self.VERSION:
+            raise ValueError(f"不支持的节点中间文件版本: {header.get('version')}")
+        return header
+
+    @property
+    def sources(self):
+        """
+        来源表：按首次出现顺序排列的 {"url", "fetched_at", "strategy"} 列表
+        """
+        return self.header["sources"]
+
+    def __len__(self):
+        return self.header["count"]
+
+    def __iter__(self):
+        """
+        逐行读取节点
+
+        Yields:
+            tuple: (node_url, source_url)
+        """
+        with self._open(self.path, self.path, 'rt') as f:
+            self._header = self._parse_header(f.readline())
+            source_urls = [source["url"] for source in self._header["sources"]]
+            for line in f:
+                if line.strip():
+                    node_url, index = json.loads(line)
+                    yield node_url, source_urls[index]
@@ -0,0 +1,147 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+from array import array
+
+class NodeDeduplicator:
+    """
+    内存去重：保存所有已出现的键，适合节点数量较少的情况
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, key):
+        """
+        记录一个键
+
+        Args:
+            key (str): 节点URL或节点唯一键
+
+        Returns:
+            bool: 键第一次出现时返回True，重复时返回False
+        """
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def close(self):
+        self._seen = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class BloomFilter:
+    """
+    布隆过滤器：按预期数量和误判率确定大小，内存占用固定
+
+    采用单字分块布隆过滤器：每个键的所有位都落在同一个64位字中，
+    一次取字、一次比较即可完成检查，比逐位访问位数组快得多，误判率略高于标准布隆过滤器
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(int(capacity), 1)
+        # 分块带来的误判率上升用多分配约1/4的位来补偿
+        bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2) * 1.25), 64)
+        # 每个位置用6位摘要，64位摘要最多提供10个位置
+        self.hash_count = min(max(int(round(bits / capacity * math.log(2))), 1), 10)
+        self.words = array('Q', bytes(8 * ((bits + 63) // 64)))
+
+    def check_and_add(self, digest):
+        """
+        检查摘要是否可能已存在，并将其加入过滤器
+
+        Args:
+            digest (bytes): 16字节摘要
+
+        Returns:
+            bool: 可能已存在时返回True（可能误判），一定不存在时返回False
+        """
+        value = int.from_bytes(digest, 'little')
+        index = (value & 0xFFFFFFFFFFFFFFFF) % len(self.words)
+        bits = value >> 64
+        mask = 0
+        for _ in range(self.hash_count):
+            mask |= 1 << (bits & 63)
+            bits >>= 6
+        word = self.words[index]
+        if word & mask == mask:
+            return True
+        self.words[index] = word | mask
+        return False
+
+class DiskDeduplicator(NodeDeduplicator):
+    """
+    有界内存去重：布隆过滤器判定一定不存在的键直接记为新键，
+    可能已存在的键再到磁盘上的SQLite精确存储中确认
+
+    键以128位BLAKE2b摘要存储，内存只占用布隆过滤器和一批待写入的摘要，与节点总数无关；
+    节点数超过预期数量时误判率上升，只会增加磁盘查询，不影响结果的正确性。
+    """
+
+    def __init__(self, capacity, error_rate=0.01, directory=None, batch_size=10000):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.batch_size = batch_size
+        self._pending = set()
+        fd, self._db_file = tempfile.mkstemp(prefix="dedup-", suffix=".sqlite", dir=directory)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_file, check_same_thread=False)
+        # 临时的去重存储，不需要日志和同步写入
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        if self.bloom.check_and_add(digest):
+            # 可能重复：先查待写入的批次，再查磁盘
+            if digest in self._pending:
+                return False
+            if self._db.execute("SELECT 1 FROM seen WHERE digest = ?", (digest,)).fetchone():
+                return False
+        self._pending.add(digest)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        return True
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany("INSERT OR IGNORE INTO seen (digest) VALUES (?)",
+                                 ((digest,) for digest in self._pending))
+            self._pending = set()
+
+    def close(self):
+        if self._db is None:
+            return
+        self._db.close()
+        self._db = None
+        self._pending = set()
+        try:
+            os.remove(self._db_file)
+        except OSError:
+            pass
+
+def create_deduplicator(dedup_config=None, expected_count=0):
+    """
+    根据dedup配置和预期的键数量选择去重实现
+
+    Args:
+        dedup_config (dict, optional): dedup配置（threshold、error_rate、directory）
+        expected_count (int): 预期的键数量（包括重复的键）
+
+    Returns:
+        NodeDeduplicator: 数量未超过threshold时使用内存去重，否则使用布隆过滤器和磁盘存储
+    """
+    dedup_config = dedup_config or {}
+    threshold = dedup_config.get("threshold", 500000)
+    if not threshold or expected_count <= threshold:
+        return NodeDeduplicator()
+    print(f"节点数量 {expected_count} 超过去重阈值 {threshold}，使用布隆过滤器和磁盘存储去重")
+    return DiskDeduplicator(expected_count, error_rate=dedup_config.get("error_rate", 0.01),
+                            directory=dedup_config.get("directory") or None)
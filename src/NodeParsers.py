@@ -0,0 +1,144 @@
+import base64
+from urllib.parse import unquote
+
+_URLSAFE_TABLE = str.maketrans('-_', '+/')
+
+def decode_base64(data):
+    """
+    宽容的base64解码：忽略空白，兼容URL安全字符、百分号编码和缺失的填充
+
+    Args:
+        data (str): base64文本
+
+    Returns:
+        str: 解码后的UTF-8文本
+
+    Raises:
+        ValueError: 不是有效的base64或解码结果不是UTF-8
+    """
+    if '%' in data:
+        data = unquote(data)
+    text = ''.join(data.split()).translate(_URLSAFE_TABLE).rstrip('=')
+    text += '=' * (-len(text) % 4)
+    return base64.b64decode(text, validate=True).decode('utf-8')
+
+class UriParts:
+    """
+    节点URI的组成部分：scheme://userinfo@host:port/path?params#fragment
+    除scheme外均已百分号解码，缺失的部分为空字符串（port为None）
+    """
+
+    __slots__ = ('scheme', 'userinfo', 'host', 'port', 'path', 'params', 'fragment')
+
+    def __init__(self, scheme, userinfo, host, port, path, params, fragment):
+        self.scheme = scheme
+        self.userinfo = userinfo
+        self.host = host
+        self.port = port
+        self.path = path
+        self.params = params
+        self.fragment = fragment
+
+    def require_port(self):
+        """
+        返回端口号，缺少端口时抛出ValueError
+        """
+        if self.port is None:
+            raise ValueError(f"{self.scheme.upper()} URL格式错误，服务器部分缺少端口")
+        return self.port
+
+def split_uri(uri):
+    """
+    将节点URI拆分为各组成部分
+
+    先从末尾取出片段，再取出查询参数，因此片段出现在参数之后也能正确识别；
+    只使用partition切分，不构造中间列表
+
+    Args:
+        uri (str): 节点URI
+
+    Returns:
+        UriParts: URI各组成部分
+
+    Raises:
+        ValueError: URI格式错误（缺少scheme或端口不是数字）
+    """
+    scheme, sep, rest = uri.partition('://')
+    if not sep:
+        raise ValueError(f"URL格式错误，缺少协议前缀: {uri[:20]}...")
+    rest, _, fragment = rest.partition('#')
+    rest, _, query = rest.partition('?')
+    userinfo, _, hostpart = rest.rpartition('@')
+    hostport, slash, path = hostpart.partition('/')
+
+    if hostport.startswith('['):
+        # IPv6地址：[::1]:443
+        host, _, port = hostport[1:].partition(']')
+        port = port[1:]
+    else:
+        host, colon, port = hostport.rpartition(':')
+        if not colon:
+            host, port = port, ''
+    if port and not port.isdigit():
+        raise ValueError(f"端口格式错误: {port}")
+
+    params = {}
+    if query:
+        for pair in query.split('&'):
+            key, _, value = pair.partition('=')
+            if key:
+                params[unquote(key)] = unquote(value)
+
+    return UriParts(
+        scheme.lower(),
+        unquote(userinfo) if '%' in userinfo else userinfo,
+        host,
+        int(port) if port else None,
+        unquote(slash + path) if slash else '',
+        params,
+        unquote(fragment) if fragment else '',
+    )
+
+class NodeParserRegistry:
+    """
+    按scheme分发节点解析函数，新协议只需注册解析函数，无需修改转换流程
+    """
+
+    def __init__(self):
+        self._parsers = {}
+
+    def register(self, scheme, parser):
+        """
+        注册解析函数
+
+        Args:
+            scheme (str): 协议名称（不含://），如vless
+            parser (callable): 解析函数，签名为parser(node_url, source_name)，返回Clash代理配置
+        """
+        self._parsers[scheme.lower()] = parser
+
+    def schemes(self):
+        """
+        已注册的协议名称列表
+        """
+        return list(self._parsers)
+
+    def parse(self, node_url, source_name=""):
+        """
+        根据scheme选择解析函数解析节点
+
+        Args:
+            node_url (str): 节点URL
+            source_name (str): 来源名称
+
+        Returns:
+            dict: Clash代理配置
+
+        Raises:
+            ValueError: 不支持的节点类型
+        """
+        end = node_url.find('://')
+        parser = self._parsers.get(node_url[:end].lower()) if end > 0 else None
+        if parser is None:
+            raise ValueError(f"不支持的节点类型: {node_url[:20]}...")
+        return parser(node_url, source_name)
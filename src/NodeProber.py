@@ -0,0 +1,42 @@
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class NodeProber:
+    """
+    节点连通性探测：对节点的服务器端口发起TCP连接并测量建连延迟
+
+    基于UDP的协议（hysteria2）无法通过TCP探测，结果为None（不记录）。
+    """
+
+    # 无法通过TCP连接探测的代理类型
+    udp_only_types = {'hysteria2'}
+
+    def __init__(self, timeout=3, max_workers=64):
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    def probe(self, proxies):
+        """
+        并发探测节点
+
+        Args:
+            proxies (list): Clash代理配置列表
+
+        Returns:
+            list: 每个节点的探测结果 (是否成功, 延迟毫秒)，无法探测的节点为None
+        """
+        if not proxies:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(proxies))) as executor:
+            return list(executor.map(self._probe_one, proxies))
+
+    def _probe_one(self, proxy):
+        if proxy.get("type") in self.udp_only_types:
+            return None
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((proxy["server"], int(proxy["port"])), timeout=self.timeout):
+                return True, (time.perf_counter() - start) * 1000
+        except (OSError, ValueError):
+            return False, None
@@ -0,0 +1,158 @@
+import re
+
+# 预编译的命名相关正则表达式，避免每个节点重复编译
+GITHUB_REPO_PATTERN = re.compile(r'^https?://github\.com/([^/]+)/([^/]+)')
+WIKI_SUFFIX_PATTERN = re.compile(r'/wiki.*$')
+SCHEME_PATTERN = re.compile(r'^https?://')
+PATH_PATTERN = re.compile(r'/.*$')
+PORT_PATTERN = re.compile(r':\d+$')
+INVALID_CHARS_PATTERN = re.compile(r'[^\u4e00-\u9fa5a-zA-Z0-9.-_]')
+# 匹配类似 "NL荷兰"、"HK中国香港" 等格式的国家代码
+COUNTRY_CODE_PATTERN = re.compile(r'^(\w{2})([\u4e00-\u9fa5]+)')
+LEADING_ID_PATTERN = re.compile(r'^\d+\s*-\s*')
+
+class ProxyNamer:
+    """
+    节点命名组件：负责来源分组名称和节点名称的生成
+
+    来源名称按URL缓存，节点名称计数器按每次转换重置，
+    因此同一进程中多次转换不会延续上一次的数字后缀。
+    """
+
+    def __init__(self, country_flag_map=None, max_group_name_length=30, max_proxy_name_length=50):
+        self.country_flag_map = country_flag_map or {}
+        self.max_group_name_length = max_group_name_length
+        self.max_proxy_name_length = max_proxy_name_length
+        # 来源URL -> (分组名称, 简短来源名称)
+        self._source_cache = {}
+        # 用于跟踪已使用的节点名称，确保唯一性（每次转换重置）
+        self.name_counter = {}
+
+    def reset(self):
+        """
+        开始新一轮转换，清空节点名称计数器（来源名称缓存保留）
+        """
+        self.name_counter = {}
+
+    def group_name(self, source_url):
+        """
+        获取来源URL对应的Clash分组名称
+
+        Args:
+            source_url (str): 来源URL
+
+        Returns:
+            str: 分组名称
+        """
+        return self._source_names(source_url)[0]
+
+    def short_source_name(self, source_url):
+        """
+        获取来源URL对应的简短来源名称（用于节点名称后缀）
+
+        Args:
+            source_url (str): 来源URL
+
+        Returns:
+            str: 简短来源名称
+        """
+        return self._source_names(source_url)[1]
+
+    def _source_names(self, source_url):
+        names = self._source_cache.get(source_url)
+        if names is None:
+            group_name = self.clean_source_url(source_url)
+            # 简化来源名称，只保留最后部分
+            short_name = group_name
+            if '-' in short_name:
+                short_name = short_name.split('-')[-1].strip()
+            # 对于GitHub来源，只保留仓库名称的最后一部分
+            if '/' in short_name:
+                short_name = short_name.split('/')[-1].strip()
+            names = (group_name, short_name)
+            self._source_cache[source_url] = names
+        return names
+
+    def clean_source_url(self, source_url):
+        """
+        清理来源URL，使其适合作为Clash配置中的分组名称
+
+        Args:
+            source_url (str): 来源URL
+
+        Returns:
+            str: 清理后的分组名称
+        """
+        # 特殊处理GitHub链接
+        github_match = GITHUB_REPO_PATTERN.match(source_url)
+        if github_match:
+            username = github_match.group(1)
+            repo_name = github_match.group(2)
+            # 移除可能的wiki路径
+            repo_name = WIKI_SUFFIX_PATTERN.sub('', repo_name)
+            # 只保留仓库名称的最后一部分（如果包含/）
+            repo_name = repo_name.split('/')[-1]
+            return f"Github - {username}/{repo_name}"
+
+        # 移除协议部分、路径部分和端口号
+        group_name = SCHEME_PATTERN.sub('', source_url)
+        group_name = PATH_PATTERN.sub('', group_name)
+        group_name = PORT_PATTERN.sub('', group_name)
+
+        # 移除特殊字符，保留中文、英文、数字和部分标点
+        group_name = INVALID_CHARS_PATTERN.sub('', group_name)
+
+        # 限制长度
+        if len(group_name) > self.max_group_name_length:
+            group_name = group_name[:self.max_group_name_length]
+
+        # 如果处理后为空，使用默认名称
+        if not group_name:
+            group_name = "未知来源"
+
+        return group_name
+
+    def allocate(self, base_name, source_name=""):
+        """
+        处理代理节点名称，实现以下功能：
+        1. 将国家代码（如 NL、HK）替换为国旗图标
+        2. 清理名称中的冗余信息
+        3. 确保名称唯一性（添加数字后缀）
+        4. 添加来源信息（如 - fanqiang、- FreeProxyGo）
+
+        Args:
+            base_name (str): 原始节点名称
+            source_name (str): 来源名称
+
+        Returns:
+            str: 处理后的节点名称
+        """
+        processed_name = base_name
+
+        # 1. 替换国家代码为国旗图标
+        match = COUNTRY_CODE_PATTERN.match(processed_name)
+        if match:
+            country_code = match.group(1).upper()
+            flag = self.country_flag_map.get(country_code)
+            if flag:
+                processed_name = f"{flag}{match.group(2)}"
+
+        # 2. 移除开头的数字ID和连字符
+        processed_name = LEADING_ID_PATTERN.sub('', processed_name)
+
+        # 3. 添加来源信息
+        if source_name:
+            processed_name = f"{processed_name} - {source_name}"
+
+        # 4. 确保名称唯一性
+        if processed_name in self.name_counter:
+            self.name_counter[processed_name] += 1
+            processed_name = f"{processed_name}{self.name_counter[processed_name]}"
+        else:
+            self.name_counter[processed_name] = 0
+
+        # 限制名称长度
+        if len(processed_name) > self.max_proxy_name_length:
+            processed_name = processed_name[:self.max_proxy_name_length]
+
+        return processed_name
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import re
+import yaml
+
+class ProxyProviderBuilder:
+    """
+    将节点拆分为多个proxy-provider分片文件，主配置中只保留分片引用
+
+    分片方式：
+    - source：按来源分片（每个来源一个分片，对应来源分组）
+    - hash：按节点唯一键的哈希分桶，节点在多次运行之间保持在同一分片
+    分片以type: http发布（生成的配置会被分发给其他机器上的客户端，本机的文件路径对它们无效），
+    因此必须设置base_url。分片使用固定文件名，节点变化时精简主配置保持不变，客户端不需要重新加载
+    DNS和规则，只按interval或通过控制器API（PUT /providers/proxies/{name}）更新内容变化的分片。
+    每个分片附带内容的SHA-256哈希（同样的节点集合得到同样的哈希），调用方据此判断哪些分片发生了变化。
+    """
+
+    def __init__(self, shard_by="source", buckets=8, base_url="", interval=3600,
+                 path_prefix="./proxy_providers", health_check=None):
+        if shard_by not in ("source", "hash"):
+            raise ValueError(f"不支持的分片方式: {shard_by}")
+        self.shard_by = shard_by
+        if not base_url:
+            raise ValueError("节点分片需要设置base_url（客户端下载分片文件的URL前缀）")
+        self.buckets = max(int(buckets), 1)
+        self.base_url = base_url.rstrip('/')
+        self.interval = interval
+        self.path_prefix = path_prefix.rstrip('/')
+        self.health_check = health_check or {}
+
+    @classmethod
+    def from_config(cls, provider_config):
+        """
+        根据output.proxy_providers配置创建实例
+
+        Args:
+            provider_config (dict): proxy_providers配置
+
+        Returns:
+            ProxyProviderBuilder: 实例
+        """
+        return cls(
+            shard_by=provider_config.get("shard_by", "source"),
+            buckets=provider_config.get("buckets", 8),
+            base_url=provider_config.get("base_url", ""),
+            interval=provider_config.get("interval", 3600),
+            path_prefix=provider_config.get("path_prefix", "./proxy_providers"),
+            health_check=provider_config.get("health_check"),
+        )
+
+    def build(self, proxies, proxy_sources, source_names, key_func, providers_dir):
+        """
+        生成分片
+
+        Args:
+            proxies (list): Clash代理配置列表
+            proxy_sources (dict): 节点名称到来源URL的映射
+            source_names (dict): 来源URL到简短来源名称的映射
+            key_func (callable): 生成节点唯一键的函数
+            providers_dir (str): 分片文件的本地输出目录
+
+        Returns:
+            tuple: (proxy-providers字典, {分片名称: (文件路径, 文件内容, 内容哈希)}, {来源URL: 分片名称})
+        """
+        shards = {}
+        source_shards = {}
+        used_names = set()
+
+        for proxy in proxies:
+            if self.shard_by == "source":
+                source_url = proxy_sources.get(proxy["name"], "")
+                shard_name = source_shards.get(source_url)
+                if shard_name is None:
+                    shard_name = self._unique_name(source_names.get(source_url, "source"), used_names)
+                    source_shards[source_url] = shard_name
+            else:
+                digest = hashlib.md5(key_func(proxy).encode('utf-8')).hexdigest()
+                shard_name = f"shard-{int(digest, 16) % self.buckets:02d}"
+            shards.setdefault(shard_name, []).append(proxy)
+
+        providers = {}
+        files = {}
+        # 哈希分片按名称排序，保证输出顺序稳定
+        shard_names = sorted(shards) if self.shard_by == "hash" else list(shards)
+        for shard_name in shard_names:
+            shard_proxies = shards[shard_name]
+            content = yaml.dump({"proxies": shard_proxies}, allow_unicode=True, default_flow_style=False)
+            file_name = f"{shard_name}.yaml"
+            local_path = os.path.join(providers_dir, file_name)
+
+            provider = {
+                "type": "http",
+                "url": f"{self.base_url}/{file_name}",
+                "path": f"{self.path_prefix}/{file_name}",
+                "interval": self.interval,
+            }
+            provider["health-check"] = {
+                "enable": self.health_check.get("enable", True),
+                "url": self.health_check.get("url", "http://www.gstatic.com/generate_204"),
+                "interval": self.health_check.get("interval", 300),
+            }
+            providers[shard_name] = provider
+            files[shard_name] = (local_path, content, hashlib.sha256(content.encode('utf-8')).hexdigest())
+
+        return providers, files, source_shards
+
+    def _unique_name(self, name, used_names):
+        base = re.sub(r'[^\w.-]', '_', name) or "source"
+        unique = base
+        index = 2
+        while unique in used_names:
+            unique = f"{base}-{index}"
+            index += 1
+        used_names.add(unique)
+        return unique
+
+    def stale_files(self, providers_dir, current_files):
+        """
+        查找分片目录中不再被引用的旧文件
+
+        Args:
+            providers_dir (str): 分片目录
+            current_files (iterable): 当前生成的文件路径
+
+        Returns:
+            list: 旧文件路径列表
+        """
+        if not os.path.isdir(providers_dir):
+            return []
+        current = {os.path.abspath(path) for path in current_files}
+        return [
+            os.path.join(providers_dir, file_name)
+            for file_name in os.listdir(providers_dir)
+            if file_name.endswith('.yaml') and os.path.abspath(os.path.join(providers_dir, file_name)) not in current
+        ]
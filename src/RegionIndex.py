@@ -0,0 +1,129 @@
+import re
+import ipaddress
+
+# 国旗图标（两个区域指示符）
+FLAG_PATTERN = re.compile(r'[\U0001F1E6-\U0001F1FF]{2}')
+# 名称开头的两字母国家代码，例如 "HK 01"、"[JP]东京"、"US_02"
+LEADING_CODE_PATTERN = re.compile(r'^[\s\[\(【]*([A-Z]{2})(?![A-Za-z])')
+# 与国家代码不同的国家顶级域名
+TLD_ALIASES = {"gb": "UK"}
+
+class RegionIndex:
+    """
+    节点地区索引：按节点名称中的国旗、开头的国家代码或服务器域名的国家顶级域名识别地区，
+    并生成按地区的url-test组和地区选择组
+
+    只识别country_flag_map中的地区，未识别的节点以及节点数少于min_nodes的地区归入“其他”组。
+    """
+
+    def __init__(self, country_flag_map, min_nodes=2, selector_name="REGION", other_name="OTHER",
+                 url="http://www.gstatic.com/generate_204", interval=300, tolerance=50):
+        self.country_flag_map = country_flag_map
+        self.flag_codes = {flag: code for code, flag in country_flag_map.items()}
+        self.min_nodes = min_nodes
+        self.selector_name = selector_name
+        self.other_name = other_name
+        self.url = url
+        self.interval = interval
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_config(cls, country_flag_map, region_config):
+        """
+        根据region_groups配置创建地区索引
+
+        Args:
+            country_flag_map (dict): 国家代码到国旗图标的映射
+            region_config (dict): region_groups配置
+
+        Returns:
+            RegionIndex: 地区索引
+        """
+        return cls(
+            country_flag_map,
+            min_nodes=region_config.get("min_nodes", 2),
+            selector_name=region_config.get("selector_name", "REGION"),
+            other_name=region_config.get("other_name", "OTHER"),
+            url=region_config.get("url", "http://www.gstatic.com/generate_204"),
+            interval=region_config.get("interval", 300),
+            tolerance=region_config.get("tolerance", 50),
+        )
+
+    def detect(self, name, server=""):
+        """
+        识别节点所在地区
+
+        Args:
+            name (str): 节点名称（国家代码已替换为国旗图标）
+            server (str): 服务器地址
+
+        Returns:
+            str: 国家代码，无法识别时返回None
+        """
+        for flag in FLAG_PATTERN.findall(name):
+            code = self.flag_codes.get(flag)
+            if code:
+                return code
+        match = LEADING_CODE_PATTERN.match(name)
+        if match and match.group(1) in self.country_flag_map:
+            return match.group(1)
+        return self._detect_tld(server)
+
+    def _detect_tld(self, server):
+        if not server or '.' not in server:
+            return None
+        try:
+            ipaddress.ip_address(server.strip('[]'))
+            return None
+        except ValueError:
+            pass
+        tld = server.rstrip('.').rsplit('.', 1)[-1].lower()
+        code = TLD_ALIASES.get(tld, tld.upper())
+        return code if len(tld) == 2 and code in self.country_flag_map else None
+
+    def group_name(self, code):
+        """
+        地区组名称，例如 "🇭🇰 HK"
+        """
+        if code is None:
+            return self.other_name
+        return f"{self.country_flag_map[code]} {code}"
+
+    def build_groups(self, proxy_names, proxy_regions):
+        """
+        按地区生成url-test组和地区选择组
+
+        Args:
+            proxy_names (list): 节点名称列表（按优先顺序）
+            proxy_regions (dict): 节点名称到国家代码的映射
+
+        Returns:
+            list: 地区选择组和各地区的url-test组（按节点数从多到少，“其他”组在最后）；
+                  没有任何可识别的地区时返回空列表
+        """
+        by_region = {}
+        for name in proxy_names:
+            by_region.setdefault(proxy_regions.get(name), []).append(name)
+        others = by_region.pop(None, [])
+        regions = []
+        for code, names in by_region.items():
+            if len(names) >= self.min_nodes:
+                regions.append((code, names))
+            else:
+                others.extend(names)
+        if not regions:
+            return []
+        regions.sort(key=lambda item: (-len(item[1]), item[0]))
+        if others:
+            regions.append((None, others))
+
+        groups = [{
+            "name": self.group_name(code),
+            "type": "url-test",
+            "url": self.url,
+            "interval": self.interval,
+            "tolerance": self.tolerance,
+            "proxies": names,
+        } for code, names in regions]
+        selector = {"name": self.selector_name, "type": "select", "proxies": [group["name"] for group in groups]}
+        return [selector] + groups
@@ -0,0 +1,97 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+class RetryPolicy:
+    """
+    获取节点时的重试策略
+
+    - 指数退避 + 全抖动（full jitter），避免多个来源同时重试
+    - 按错误类型决定是否重试：404等客户端错误不重试，429/5xx、超时和连接错误重试
+    - 支持响应中的Retry-After头，等待时间超过上限时直接放弃
+    """
+
+    # 可以重试的HTTP状态码
+    retryable_status_codes = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, max_attempts=3, base_delay=5, max_delay=60, max_retry_after=120):
+        self.max_attempts = max(int(max_attempts), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def from_config(cls, retry_config):
+        """
+        根据ssr_source.retry配置创建重试策略
+
+        Args:
+            retry_config (dict): ssr_source.retry配置
+
+        Returns:
+            RetryPolicy: 重试策略
+        """
+        return cls(
+            max_attempts=retry_config.get("max_attempts", 3),
+            base_delay=retry_config.get("base_delay", 5),
+            max_delay=retry_config.get("max_delay", 60),
+            max_retry_after=retry_config.get("max_retry_after", 120),
+        )
+
+    def is_retryable(self, error):
+        """
+        判断错误是否值得重试
+
+        Args:
+            error (Exception): 本次尝试的异常
+
+        Returns:
+            bool: 是否重试
+        """
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in self.retryable_status_codes
+        return True
+
+    def next_delay(self, attempt, error):
+        """
+        计算下一次重试前的等待时间
+
+        Args:
+            attempt (int): 已完成的尝试序号（从0开始）
+            error (Exception): 本次尝试的异常
+
+        Returns:
+            float: 等待秒数；不应再重试时返回None
+        """
+        if attempt + 1 >= self.max_attempts or not self.is_retryable(error):
+            return None
+
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                print(f"Retry-After要求等待 {retry_after:.0f} 秒，超过上限 {self.max_retry_after} 秒，放弃重试")
+                return None
+            return retry_after
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _retry_after(self, error):
+        """
+        解析响应中的Retry-After头（秒数或HTTP日期）
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,241 @@
+import random
+
+class RuleCompiler:
+    """
+    Clash规则编译器：在保持首个匹配语义的前提下精简规则列表
+
+    1. 删除被前面规则完全覆盖（遮蔽）的规则，包括重复规则和MATCH之后的规则
+    2. 当后面存在同一目标策略的父级DOMAIN-SUFFIX（或MATCH），且中间没有可能匹配的其他策略规则时，
+       删除前面的子域名规则
+    域名覆盖关系通过反转标签的后缀树判断；可选地在生成的域名语料上验证编译前后的匹配结果一致。
+    """
+
+    def __init__(self, verify=True, seed=0):
+        self.verify = verify
+        self.seed = seed
+        self.last_report = None
+
+    @classmethod
+    def from_config(cls, compiler_config):
+        """
+        根据rule_compiler配置创建实例
+
+        Args:
+            compiler_config (dict): rule_compiler配置
+
+        Returns:
+            RuleCompiler: 实例
+        """
+        return cls(verify=compiler_config.get("verify", True), seed=compiler_config.get("seed", 0))
+
+    def compile(self, rules):
+        """
+        编译规则列表
+
+        Args:
+            rules (list): 原始规则列表
+
+        Returns:
+            list: 精简后的规则列表；验证失败时返回原始规则列表
+        """
+        parsed = [self._parse_rule(rule) for rule in rules]
+        kept = self._remove_shadowed(parsed)
+        kept = self._merge_into_parents(kept)
+        compiled = [rule["raw"] for rule in kept]
+
+        report = {"before": len(rules), "after": len(compiled), "verified": None}
+        if self.verify:
+            mismatches = self.verify_equivalence(rules, compiled)
+            report["verified"] = not mismatches
+            if mismatches:
+                print(f"规则编译验证失败（{len(mismatches)} 个域名匹配结果不一致，例如 {mismatches[0]}），使用原始规则")
+                self.last_report = report
+                return list(rules)
+
+        self.last_report = report
+        print(f"规则编译完成: {report['before']} -> {report['after']} 条"
+              + ("（已在域名语料上验证语义一致）" if report["verified"] else ""))
+        return compiled
+
+    def _parse_rule(self, rule):
+        raw = str(rule).strip()
+        parts = [part.strip() for part in raw.split(',')]
+        rule_type = parts[0].upper()
+        if rule_type == 'MATCH':
+            return {"raw": raw, "type": rule_type, "value": "", "target": parts[1] if len(parts) > 1 else "",
+                    "key": (rule_type,)}
+        value = parts[1] if len(parts) > 1 else ""
+        if rule_type in ('DOMAIN', 'DOMAIN-SUFFIX', 'DOMAIN-KEYWORD'):
+            value = value.lower().strip('.')
+        target = parts[2] if len(parts) > 2 else ""
+        return {"raw": raw, "type": rule_type, "value": value, "target": target,
+                "key": (rule_type, value) + tuple(parts[3:])}
+
+    def _remove_shadowed(self, parsed):
+        """
+        删除被前面规则完全覆盖的规则
+        """
+        kept = []
+        seen_keys = set()
+        suffix_trie = {}
+        exact_domains = set()
+        keywords = []
+
+        for rule in parsed:
+            rule_type = rule["type"]
+            value = rule["value"]
+
+            if rule["key"] in seen_keys:
+                continue
+
+            if rule_type in ('DOMAIN', 'DOMAIN-SUFFIX'):
+                if self._covered_by_suffix(suffix_trie, value):
+                    continue
+                if rule_type == 'DOMAIN' and value in exact_domains:
+                    continue
+                if any(keyword in value for keyword in keywords):
+                    continue
+
+            kept.append(rule)
+            seen_keys.add(rule["key"])
+
+            if rule_type == 'DOMAIN-SUFFIX':
+                self._insert_suffix(suffix_trie, value)
+            elif rule_type == 'DOMAIN':
+                exact_domains.add(value)
+            elif rule_type == 'DOMAIN-KEYWORD':
+                keywords.append(value)
+            elif rule_type == 'MATCH':
+                # MATCH之后的规则永远不会被匹配
+                break
+
+        return kept
+
+    def _merge_into_parents(self, kept):
+        """
+        删除可以由后面同一策略的父级DOMAIN-SUFFIX或MATCH代替的子域名规则
+        """
+        removed = [False] * len(kept)
+        for i in range(len(kept) - 1, -1, -1):
+            rule = kept[i]
+            if rule["type"] not in ('DOMAIN', 'DOMAIN-SUFFIX'):
+                continue
+            for j in range(i + 1, len(kept)):
+                if removed[j]:
+                    continue
+                later = kept[j]
+                if later["target"] == rule["target"] and (
+                        later["type"] == 'MATCH'
+                        or (later["type"] == 'DOMAIN-SUFFIX' and self._is_under(rule["value"], later["value"]))):
+                    removed[i] = True
+                    break
+                if later["target"] == rule["target"]:
+                    continue
+                if later["type"] in ('DOMAIN', 'DOMAIN-SUFFIX') and not self._overlaps(rule, later):
+                    continue
+                # 中间存在可能匹配同一域名的其他策略规则（含IP类规则），不能合并
+                break
+        return [rule for rule, is_removed in zip(kept, removed) if not is_removed]
+
+    def _insert_suffix(self, trie, domain):
+        node = trie
+        for label in reversed(domain.split('.')):
+            node = node.setdefault(label, {})
+        node[None] = True
+
+    def _covered_by_suffix(self, trie, domain):
+        node = trie
+        for label in reversed(domain.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+    def _is_under(self, domain, suffix):
+        return domain == suffix or domain.endswith('.' + suffix)
+
+    def _overlaps(self, rule, other):
+        """
+        判断两个DOMAIN/DOMAIN-SUFFIX规则的匹配范围是否有交集
+        """
+        a, b = rule["value"], other["value"]
+        if rule["type"] == 'DOMAIN' and other["type"] == 'DOMAIN':
+            return a == b
+        if rule["type"] == 'DOMAIN':
+            return self._is_under(a, b)
+        if other["type"] == 'DOMAIN':
+            return self._is_under(b, a)
+        return self._is_under(a, b) or self._is_under(b, a)
+
+    def generate_corpus(self, rules, random_count=200):
+        """
+        根据规则生成用于验证的域名语料
+
+        Args:
+            rules (list): 规则列表
+            random_count (int): 随机域名数量
+
+        Returns:
+            list: 域名列表
+        """
+        rng = random.Random(self.seed)
+        corpus = set()
+        for rule in (self._parse_rule(rule) for rule in rules):
+            value = rule["value"]
+            if rule["type"] in ('DOMAIN', 'DOMAIN-SUFFIX'):
+                labels = value.split('.')
+                corpus.update({value, f"www.{value}", f"a.b.{value}", f"x{value}", f"{value}.x"})
+                for k in range(1, len(labels)):
+                    parent = '.'.join(labels[k:])
+                    corpus.update({parent, f"zz{rng.randint(0, 99)}.{parent}"})
+            elif rule["type"] == 'DOMAIN-KEYWORD':
+                corpus.update({f"{value}.com", f"a{value}b.net"})
+        for _ in range(random_count):
+            label = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+            corpus.add(f"{label}.{rng.choice(['com', 'net', 'org', 'cn', 'io'])}")
+        return sorted(corpus)
+
+    def verify_equivalence(self, original, compiled, worlds=8):
+        """
+        在生成的域名语料上比较编译前后的匹配结果
+
+        非域名规则（IP-CIDR、GEOIP等）的匹配结果无法由域名确定，
+        因此在多个随机“世界”中为其随机指定是否匹配，要求每个世界中结果都一致。
+
+        Args:
+            original (list): 原始规则列表
+            compiled (list): 编译后的规则列表
+            worlds (int): 随机世界数量
+
+        Returns:
+            list: 结果不一致的域名列表
+        """
+        original_parsed = [self._parse_rule(rule) for rule in original]
+        compiled_parsed = [self._parse_rule(rule) for rule in compiled]
+        mismatches = []
+        for domain in self.generate_corpus(original):
+            for world in range(worlds):
+                if self._evaluate(original_parsed, domain, world) != self._evaluate(compiled_parsed, domain, world):
+                    mismatches.append(domain)
+                    break
+        return mismatches
+
+    def _evaluate(self, parsed, domain, world):
+        for rule in parsed:
+            rule_type = rule["type"]
+            if rule_type == 'DOMAIN':
+                matched = domain == rule["value"]
+            elif rule_type == 'DOMAIN-SUFFIX':
+                matched = self._is_under(domain, rule["value"])
+            elif rule_type == 'DOMAIN-KEYWORD':
+                matched = rule["value"] in domain
+            elif rule_type == 'MATCH':
+                matched = True
+            else:
+                # 同一世界中相同的非域名规则对同一域名的结果相同
+                matched = hash((self.seed, world, domain, rule["key"])) % 10 < 3
+            if matched:
+                return rule["target"]
+        return None
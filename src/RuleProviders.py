@@ -0,0 +1,136 @@
+import hashlib
+import os
+import yaml
+
+class RuleProviderBuilder:
+    """
+    将内联规则拆分为独立的rule-provider文件，主配置中只保留RULE-SET引用
+
+    连续且目标策略相同的规则合并为一个规则集，保持原有的匹配顺序；
+    每个规则集文件名包含内容哈希，规则不变时文件和引用都保持不变。
+    规则集以type: http发布（生成的配置会被分发给其他机器上的客户端，本机的文件路径对它们无效），
+    因此必须设置base_url。
+    """
+
+    # 可以放入classical规则集的规则类型，其余（GEOIP、MATCH等）保留在主配置中
+    externalizable_types = {
+        'DOMAIN', 'DOMAIN-SUFFIX', 'DOMAIN-KEYWORD', 'IP-CIDR', 'IP-CIDR6',
+        'SRC-IP-CIDR', 'DST-PORT', 'SRC-PORT', 'PROCESS-NAME',
+    }
+
+    def __init__(self, base_url="", interval=86400, path_prefix="./ruleset", min_rules=2):
+        if not base_url:
+            raise ValueError("规则集需要设置base_url（客户端下载规则集文件的URL前缀）")
+        self.base_url = base_url.rstrip('/')
+        self.interval = interval
+        self.path_prefix = path_prefix.rstrip('/')
+        self.min_rules = min_rules
+
+    @classmethod
+    def from_config(cls, provider_config):
+        """
+        根据output.rule_providers配置创建实例
+
+        Args:
+            provider_config (dict): rule_providers配置
+
+        Returns:
+            RuleProviderBuilder: 实例
+        """
+        return cls(
+            base_url=provider_config.get("base_url", ""),
+            interval=provider_config.get("interval", 86400),
+            path_prefix=provider_config.get("path_prefix", "./ruleset"),
+            min_rules=provider_config.get("min_rules", 2),
+        )
+
+    def build(self, rules, rules_dir):
+        """
+        拆分规则列表
+
+        Args:
+            rules (list): 原始规则列表
+            rules_dir (str): 规则集文件的本地输出目录
+
+        Returns:
+            tuple: (新的规则列表, rule-providers字典, {文件路径: 文件内容})
+        """
+        new_rules = []
+        providers = {}
+        files = {}
+        counters = {}
+
+        for policy, run in self._split_runs(rules):
+            if policy is None or len(run) < self.min_rules:
+                new_rules.extend(rule for rule, _ in run)
+                continue
+
+            counters[policy] = counters.get(policy, 0) + 1
+            name = f"{policy.lower()}-{counters[policy]}"
+            content = yaml.dump({"payload": [payload for _, payload in run]},
+                                allow_unicode=True, default_flow_style=False)
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+            file_name = f"{name}-{digest}.yaml"
+            local_path = os.path.join(rules_dir, file_name)
+
+            providers[name] = {
+                "type": "http",
+                "behavior": "classical",
+                "url": f"{self.base_url}/{file_name}",
+                "path": f"{self.path_prefix}/{file_name}",
+                "interval": self.interval,
+            }
+            files[local_path] = content
+            new_rules.append(f"RULE-SET,{name},{policy}")
+
+        return new_rules, providers, files
+
+    def _split_runs(self, rules):
+        """
+        将规则按连续的相同目标策略分段
+
+        Yields:
+            tuple: (策略名称或None, [(原始规则, 规则集内容行), ...])
+        """
+        current_policy = None
+        current_run = []
+        for rule in rules:
+            policy, payload = self._parse_rule(rule)
+            if policy != current_policy or policy is None:
+                if current_run:
+                    yield current_policy, current_run
+                current_policy = policy
+                current_run = []
+            current_run.append((rule, payload))
+        if current_run:
+            yield current_policy, current_run
+
+    def _parse_rule(self, rule):
+        """
+        解析规则，返回目标策略和规则集中的内容行；不可外置的规则返回(None, None)
+        """
+        parts = [part.strip() for part in str(rule).split(',')]
+        if len(parts) < 3 or parts[0].upper() not in self.externalizable_types:
+            return None, None
+        # 规则集内容行不包含目标策略，但保留no-resolve等附加参数
+        return parts[2], ",".join(parts[:2] + parts[3:])
+
+    def stale_files(self, rules_dir, current_files):
+        """
+        查找规则集目录中不再被引用的旧文件
+
+        Args:
+            rules_dir (str): 规则集目录
+            current_files (iterable): 当前生成的文件路径
+
+        Returns:
+            list: 旧文件路径列表
+        """
+        if not os.path.isdir(rules_dir):
+            return []
+        current = {os.path.abspath(path) for path in current_files}
+        return [
+            os.path.join(rules_dir, file_name)
+            for file_name in os.listdir(rules_dir)
+            if file_name.endswith('.yaml') and os.path.abspath(os.path.join(rules_dir, file_name)) not in current
+        ]
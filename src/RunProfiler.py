@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+
+class RunProfiler:
+    """
+    单次运行的分阶段性能分析（通过 --profile 启用，未启用时不会导入本模块）
+
+    每个阶段输出：
+    - <序号>-<阶段>.prof：主线程的cProfile统计，可用snakeviz查看
+    - <序号>-<阶段>-memory.txt：阶段结束时tracemalloc按代码行统计的前top_n个内存分配
+    整个运行输出：
+    - profile.speedscope.json：所有线程的栈采样（获取阶段的网络请求、Playwright等待在线程池中），
+      按阶段和线程分为多个profile，可用speedscope打开
+    - summary.txt：各阶段耗时和内存峰值
+    """
+
+    def __init__(self, output_dir, top_n=30, sample_interval=0.005):
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.stage_times = []
+        # 附加在汇总中的说明（例如浏览器预热节省的时间）
+        self.notes = []
+        self._stage_name = None
+        self._started_at = None
+        self._stop_event = threading.Event()
+        self._sampler = None
+        # 栈采样：帧表，以及 (阶段, 线程名) -> [(帧索引列表, 权重)]
+        self._frames = []
+        self._frame_index = {}
+        self._samples = {}
+
+    def start(self):
+        """
+        开始分析：启动tracemalloc和栈采样线程
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._started_at = time.perf_counter()
+        tracemalloc.start()
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        print(f"性能分析已启用，结果将写入 {os.path.abspath(self.output_dir)}")
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        分析一个阶段
+
+        Args:
+            name (str): 阶段名称
+        """
+        index = len(self.stage_times) + 1
+        prefix = os.path.join(self.output_dir, f"{index}-{name}")
+        profile = cProfile.Profile()
+        self._stage_name = name
+        started_at = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started_at
+            self._stage_name = None
+            self.stage_times.append((name, elapsed))
+            profile.dump_stats(f"{prefix}.prof")
+            self._write_memory_top(f"{prefix}-memory.txt", name)
+
+    def note(self, line):
+        """
+        在汇总的阶段耗时之后附加一行说明
+
+        Args:
+            line (str): 说明
+        """
+        self.notes.append(line)
+
+    def stop(self):
+        """
+        结束分析：停止采样并写出speedscope文件和汇总
+        """
+        if self._sampler is None:
+            return
+        self._stop_event.set()
+        self._sampler.join()
+        self._sampler = None
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self._write_speedscope(os.path.join(self.output_dir, "profile.speedscope.json"))
+        total = time.perf_counter() - self._started_at
+        lines = [f"总耗时 {total:.2f} 秒，Python堆内存峰值 {peak / 1024 / 1024:.1f} MB", ""]
+        lines += [f"{name:<12}{elapsed:>10.2f} 秒" for name, elapsed in self.stage_times]
+        if self.notes:
+            lines += [""] + self.notes
+        with open(os.path.join(self.output_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        print("\n性能分析结果：")
+        for line in lines:
+            print(f"  {line}" if line else "")
+        print(f"  snakeviz {os.path.join(self.output_dir, '<阶段>.prof')} 查看各阶段的cProfile，"
+              f"profile.speedscope.json 可在 https://www.speedscope.app 打开")
+
+    def _write_memory_top(self, path, name):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        stats = snapshot.statistics('lineno')
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"阶段 {name} 结束时：当前 {current / 1024 / 1024:.1f} MB，峰值 {peak / 1024 / 1024:.1f} MB\n\n")
+            for stat in stats[:self.top_n]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} 个  {frame.filename}:{frame.lineno}\n")
+
+    def _frame_id(self, code):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self._frame_index.get(key)
+        if frame_id is None:
+            frame_id = len(self._frames)
+            self._frame_index[key] = frame_id
+            self._frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return frame_id
+
+    def _sample_loop(self):
+        own_ident = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.sample_interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            stage = self._stage_name or "other"
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                key = (stage, names.get(ident, str(ident)))
+                self._samples.setdefault(key, []).append((stack, weight))
+
+    def _write_speedscope(self, path):
+        profiles = []
+        for (stage, thread_name), samples in self._samples.items():
+            total = sum(weight for _, weight in samples)
+            profiles.append({
+                "type": "sampled",
+                "name": f"{stage} / {thread_name}",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [stack for stack, _ in samples],
+                "weights": [weight for _, weight in samples],
+            })
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "free-vpn2clash",
+            "exporter": "RunProfiler",
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
@@ -1,13 +1,32 @@
-import base64
 import yaml
 import os
+import re
 import sys
+import copy
 import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
 
 # 添加当前目录到Python路径，以便导入同级模块
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from ProxyNamer import ProxyNamer
+from FormatEmitters import SingBoxEmitter, UriSubscriptionEmitter
+from RuleProviders import RuleProviderBuilder
+from RuleCompiler import RuleCompiler
+from ProxyProviders import ProxyProviderBuilder
+from HealthStore import HealthStore
+from NodeProber import NodeProber
+from NodeParsers import NodeParserRegistry, decode_base64, split_uri
+from NodeDeduplicator import create_deduplicator
+from ContentHash import semantic_hash
+from RegionIndex import RegionIndex
+
 class ConfigManager:
+    def __init__(self):
+        # 已加载配置的缓存：配置文件路径 -> (修改时间, 配置字典)
+        self._cache = {}
+    
     def load_configuration(self, config_file=None):
         """
         加载配置文件
@@ -28,6 +47,12 @@ class ConfigManager:
         if not os.path.exists(config_file):
             raise FileNotFoundError(f"配置文件不存在: {config_file}")
         
+        # 配置文件未修改时直接返回缓存的副本（调用方可能修改返回的字典）
+        mtime = os.path.getmtime(config_file)
+        cached = self._cache.get(config_file)
+        if cached and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
+        
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
@@ -35,6 +60,7 @@ class ConfigManager:
             # 添加默认值（如果配置项不存在）
             config = self._add_defaults(config)
             
+            self._cache[config_file] = (mtime, copy.deepcopy(config))
             return config
             
         except yaml.YAMLError as e:
@@ -155,15 +181,45 @@ class SSRConverter:
             'SA': '🇸🇦',  # 沙特阿拉伯
             'ZA': '🇿🇦',  # 南非
         }
-        # 用于跟踪已使用的节点名称，确保唯一性
-        self.name_counter = {}
+        # 节点命名组件（预编译正则、来源名称缓存、按次转换的名称分配）
+        self.proxy_namer = ProxyNamer(self.country_flag_map)
+        # 其他输出格式（sing-box、URI订阅）
+        self.sing_box_emitter = SingBoxEmitter()
+        self.uri_emitter = UriSubscriptionEmitter()
+        # 协议到节点解析函数的注册表，新协议在此注册
+        self.node_parsers = NodeParserRegistry()
+        for scheme, parser in (("ssr", self._parse_ssr_url), ("vmess", self._parse_vmess_url),
+                               ("ss", self._parse_ss_url), ("vless", self._parse_vless_url),
+                               ("hysteria2", self._parse_hysteria2_url), ("hy2", self._parse_hysteria2_url),
+                               ("trojan", self._parse_trojan_url)):
+            self.node_parsers.register(scheme, parser)
+        # 最近一次保存的输出文件路径，以及是否改变了文件内容
+        self.last_output_file = None
+        self.last_output_changed = False
+        # 最近一次转换中内容发生变化的proxy-provider分片，以及各分片的内容哈希
+        self.last_changed_providers = []
+        self.last_shard_hashes = {}
+        # 最近一次转换的语义内容哈希，以及是否因语义内容未变化而跳过了写出
+        self.last_content_hash = None
+        self.last_output_unchanged = False
+        # 最近一次转换中各profile的生成结果
+        self.last_profile_results = []
+    
+    @property
+    def name_counter(self):
+        """
+        当前转换中已使用的节点名称计数器
+        """
+        return self.proxy_namer.name_counter
     
     def convert_ssr_nodes_to_clash_config(self, ssr_nodes, config_file=None, output_file=None):
         """
         将SSR节点列表转换为Clash配置格式
         
+        节点只解析和去重一次；配置了profiles时，主配置和各profile基于同一份解析结果并行生成
+        
         Args:
-            ssr_nodes (list): SSR/VMess节点列表，每个节点是一个元组 (node_url, source_url)
+            ssr_nodes (list or NodeArtifact): SSR/VMess节点列表或节点中间文件，每个节点是一个元组 (node_url, source_url)
             config_file (str, optional): 配置文件路径
             output_file (str, optional): 输出文件路径
             
@@ -175,8 +231,144 @@ class SSRConverter:
         
         # 加载配置
         config = self.config_manager.load_configuration(config_file)
+        
+        # 每次转换使用新的名称分配，避免延续上一次的数字后缀
+        self.proxy_namer.reset()
+        self.last_changed_providers = []
+        self.last_shard_hashes = {}
+        self.last_content_hash = None
+        self.last_output_unchanged = False
+        self.last_profile_results = []
+        
+        # 地区索引：解析时记录每个节点所在地区，用于生成按地区的url-test组（如果配置了）
+        region_config = config.get("region_groups") or {}
+        region_index = None
+        if region_config.get("enable", False):
+            region_index = RegionIndex.from_config(self.country_flag_map, region_config)
+        
+        proxies, nodes_by_source, proxy_regions = self._parse_nodes(ssr_nodes, config, region_index)
+        
+        # 根据节点健康度历史剔除长期不可用的节点并排序（如果配置了）
+        health_config = config.get("health") or {}
+        if health_config.get("enable", False) and proxies:
+            proxies, nodes_by_source = self._apply_health_history(proxies, nodes_by_source, health_config)
+        
+        # 从配置获取输出目录和文件名
+        output_config = config.get("output", {})
+        output_dir = output_config.get("directory", "./output")
+        default_output_file = output_config.get("clash_config_file", "clash_config.yaml")
+        
+        # 如果没有提供输出文件路径，使用配置中的默认路径
+        if not output_file:
+            # 确保输出目录存在
+            os.makedirs(output_dir, exist_ok=True)
+            output_file = os.path.join(output_dir, default_output_file)
+        
+        # 多配置输出：各profile的输出文件与主配置位于同一目录
+        profiles = [profile for profile in config.get("profiles") or [] if profile.get("enable", True)]
+        parsed = (proxies, nodes_by_source, proxy_regions, region_index)
+        if not profiles:
+            clash_config, result = self._render_profile(config, None, parsed, output_file)
+        else:
+            # 各profile只读取共享的节点、来源分组和地区索引，生成各自的配置字典，可以并发生成
+            with ThreadPoolExecutor(max_workers=len(profiles) + 1) as executor:
+                main_future = executor.submit(self._render_profile, config, None, parsed, output_file)
+                profile_futures = [
+                    (profile, executor.submit(self._render_profile, config, profile, parsed,
+                                              os.path.join(os.path.dirname(output_file), profile["file"])))
+                    for profile in profiles
+                ]
+                clash_config, result = main_future.result()
+                for profile, future in profile_futures:
+                    try:
+                        self.last_profile_results.append(future.result()[1])
+                    except Exception as e:
+                        print(f"生成配置 {profile.get('name', profile.get('file'))} 失败: {str(e)}")
+            for profile_result in self.last_profile_results:
+                state = "未变化" if not profile_result["changed"] else "已更新"
+                print(f"配置 {profile_result['name']}：{profile_result['proxies']} 个节点，{state}（{profile_result['output_file']}）")
+        
+        self.last_output_file = result["output_file"]
+        self.last_output_changed = result["changed"]
+        self.last_output_unchanged = result["unchanged"]
+        self.last_content_hash = result["content_hash"]
+        self.last_changed_providers = result["changed_providers"]
+        self.last_shard_hashes = result["shard_hashes"]
+        return clash_config
+    
+    def _parse_nodes(self, ssr_nodes, config, region_index=None):
+        """
+        解析所有节点并按唯一键去重
+        
+        Args:
+            ssr_nodes (list or NodeArtifact): 节点列表，每个节点是一个元组 (node_url, source_url)
+            config (dict): 配置字典
+            region_index (RegionIndex, optional): 地区索引，为None时不识别节点地区
+            
+        Returns:
+            tuple: (Clash代理配置列表, 来源URL到节点名称列表的映射, 节点名称到国家代码的映射)
+        """
+        proxies = []
+        # 按来源URL分组存储节点
+        nodes_by_source = {}
+        proxy_regions = {}
+        
+        # 转换每个节点并按唯一键去重（节点数超过dedup.threshold时使用有界内存的去重实现）
+        with create_deduplicator(config.get("dedup"), len(ssr_nodes)) as proxy_keys:
+            for i, node_item in enumerate(ssr_nodes):
+                try:
+                    # 检查节点格式（支持旧格式和新格式）
+                    if isinstance(node_item, tuple) and len(node_item) >= 2:
+                        node_url, source_url = node_item
+                    else:
+                        node_url = node_item
+                        source_url = "未知来源"
+                
+                    # 生成来源名称（按来源URL缓存）
+                    source_name = self.proxy_namer.short_source_name(source_url)
+                
+                    # 按协议选择解析函数
+                    proxy = self.node_parsers.parse(node_url, source_name)
+                
+                    # 生成唯一键并检查是否已存在
+                    proxy_key = self._generate_proxy_unique_key(proxy)
+                    if proxy_keys.add(proxy_key):
+                        proxies.append(proxy)
+                    
+                        # 将节点添加到对应的来源分组
+                        if source_url not in nodes_by_source:
+                            nodes_by_source[source_url] = []
+                        nodes_by_source[source_url].append(proxy["name"])
+                        if region_index:
+                            proxy_regions[proxy["name"]] = region_index.detect(proxy["name"], proxy.get("server", ""))
+                    
+                        print(f"成功添加节点: {proxy['name']} (来源: {source_url})")
+                    else:
+                        print(f"跳过重复节点: {proxy['name']}")
+                except Exception as e:
+                    # 处理不同格式的节点
+                    node_url = node_item[0] if isinstance(node_item, tuple) else node_item
+                    print(f"转换节点失败 {node_url[:50]}...: {str(e)}")
+        
+        print(f"总共转换了 {len(proxies)} 个唯一节点")
+        if region_index:
+            detected = sum(1 for code in proxy_regions.values() if code)
+            print(f"识别出 {detected} 个节点的地区，共 {len(set(proxy_regions.values()) - {None})} 个地区")
+        return proxies, nodes_by_source, proxy_regions
+    
+    def _clash_config_template(self, config, rules=None):
+        """
+        根据clash配置生成Clash配置字典（代理组和规则为副本，各配置可以独立修改）
+        
+        Args:
+            config (dict): 配置字典
+            rules (list, optional): 规则列表，默认使用clash.rules
+            
+        Returns:
+            dict: 不含节点的Clash配置字典
+        """
         clash_config = config.get("clash", {})
-        clash_config = {
+        return {
                 "name": "free-VPN",
                 "alias": "free-VPN", 
             "port": clash_config.get("port", 7890),
@@ -196,190 +388,513 @@ class SSRConverter:
                 ]
             }),
             "rule-providers": clash_config.get("rule-providers", {}),
-            "rules": clash_config.get("rules", [
+            "rules": list(rules if rules is not None else clash_config.get("rules", [
                 "DOMAIN-SUFFIX,google.com,PROXY",
                 "DOMAIN-SUFFIX,facebook.com,PROXY",
                 "DOMAIN-SUFFIX,youtube.com,PROXY",
                 "GEOIP,CN,DIRECT",
                 "MATCH,PROXY"
-            ]),
-            "proxy-groups": clash_config.get("proxy-groups", []),
+            ])),
+            "proxy-groups": copy.deepcopy(clash_config.get("proxy-groups", [])),
             "proxies": []
         }
+    
+    def _filter_proxies(self, proxies, nodes_by_source, filter_config):
+        """
+        按profile的筛选条件选择节点（保持原有顺序，节点配置本身不复制）
         
-        # 按来源URL分组存储节点
-        nodes_by_source = {}
+        Args:
+            proxies (list): Clash代理配置列表
+            nodes_by_source (dict): 来源URL到节点名称列表的映射
+            filter_config (dict): 筛选条件（types、exclude_types、sources、name_pattern、max_nodes）
+            
+        Returns:
+            tuple: (筛选后的代理配置列表, 对应的来源分组映射)
+        """
+        types = set(filter_config.get("types") or [])
+        exclude_types = set(filter_config.get("exclude_types") or [])
+        sources = filter_config.get("sources") or []
+        name_pattern = re.compile(filter_config["name_pattern"]) if filter_config.get("name_pattern") else None
+        max_nodes = filter_config.get("max_nodes", 0)
+        
+        proxy_sources = {name: source_url for source_url, names in nodes_by_source.items() for name in names}
+        selected = []
+        for proxy in proxies:
+            if types and proxy["type"] not in types:
+                continue
+            if proxy["type"] in exclude_types:
+                continue
+            if sources and not any(source in proxy_sources.get(proxy["name"], "") for source in sources):
+                continue
+            if name_pattern and not name_pattern.search(proxy["name"]):
+                continue
+            selected.append(proxy)
+            if max_nodes and len(selected) >= max_nodes:
+                break
+        
+        selected_names = {proxy["name"] for proxy in selected}
+        selected_by_source = {}
+        for source_url, names in nodes_by_source.items():
+            kept_names = [name for name in names if name in selected_names]
+            if kept_names:
+                selected_by_source[source_url] = kept_names
+        return selected, selected_by_source
+    
+    def _build_proxy_groups(self, clash_config, nodes_by_source, layout="full"):
+        """
+        添加AUTO-SWITCH、FREE-PROXY和按来源的代理组
         
-        # 转换每个节点，使用集合进行去重
-        proxy_keys = set()
-        for i, node_item in enumerate(ssr_nodes):
-            try:
-                # 检查节点格式（支持旧格式和新格式）
-                if isinstance(node_item, tuple) and len(node_item) >= 2:
-                    node_url, source_url = node_item
-                else:
-                    node_url = node_item
-                    source_url = "未知来源"
-                
-                # 生成来源名称
-                source_name = self._clean_source_url_for_group_name(source_url)
-                # 简化来源名称，只保留最后部分
-                if '-' in source_name:
-                    source_name = source_name.split('-')[-1].strip()
-                # 对于GitHub来源，只保留仓库名称的最后一部分
-                if '/' in source_name:
-                    source_name = source_name.split('/')[-1].strip()
+        Args:
+            clash_config (dict): Clash配置字典（包含节点）
+            nodes_by_source (dict): 来源URL到节点名称列表的映射
+            layout (str): 代理组布局，full包含来源分组，minimal只有FREE-PROXY和AUTO-SWITCH
+        """
+        # 获取所有代理名称
+        all_proxy_names = [proxy["name"] for proxy in clash_config["proxies"]]
+        if layout == "minimal":
+            nodes_by_source = {}
+        
+        # 从配置中获取现有的代理组（如果有）
+        proxy_groups = clash_config.get("proxy-groups", [])
+        
+        # 更新或添加"AUTO-SWITCH"组
+        auto_switch_group_exists = False
+        for group in proxy_groups:
+            if group["name"] == "AUTO-SWITCH":
+                group["proxies"] = all_proxy_names
+                auto_switch_group_exists = True
+                break
+        if not auto_switch_group_exists:
+            proxy_groups.append({
+                "name": "AUTO-SWITCH",
+                "type": "url-test",
+                "url": "http://www.gstatic.com/generate_204",
+                "interval": 300,
+                "tolerance": 50,
+                "proxies": all_proxy_names
+            })
+        
+        # 更新FREE-PROXY组，确保它包含AUTO-SWITCH、来源分组和所有节点作为选项
+        proxy_group_exists = False
+        for group in proxy_groups:
+            if group["name"] == "FREE-PROXY":
+                # 清空现有代理列表，重新构建
+                group["proxies"] = []
                 
-                if node_url.startswith('ssr://'):
-                    proxy = self._parse_ssr_url(node_url, source_name)
-                elif node_url.startswith('vmess://'):
-                    proxy = self._parse_vmess_url(node_url, source_name)
-                elif node_url.startswith('ss://'):
-                    proxy = self._parse_ss_url(node_url, source_name)
-                elif node_url.startswith('vless://'):
-                    proxy = self._parse_vless_url(node_url, source_name)
-                elif node_url.startswith('hysteria2://'):
-                    proxy = self._parse_hysteria2_url(node_url, source_name)
-                elif node_url.startswith('trojan://'):
-                    proxy = self._parse_trojan_url(node_url, source_name)
-                else:
-                    raise ValueError(f"不支持的节点类型: {node_url[:20]}...")
+                # 添加AUTO-SWITCH组
+                if "AUTO-SWITCH" not in group["proxies"]:
+                    group["proxies"].append("AUTO-SWITCH")
                 
-                # 生成唯一键并检查是否已存在
-                proxy_key = self._generate_proxy_unique_key(proxy)
-                if proxy_key not in proxy_keys:
-                    proxy_keys.add(proxy_key)
-                    clash_config["proxies"].append(proxy)
-                    
-                    # 将节点添加到对应的来源分组
-                    if source_url not in nodes_by_source:
-                        nodes_by_source[source_url] = []
-                    nodes_by_source[source_url].append(proxy["name"])
-                    
-                    print(f"成功添加节点: {proxy['name']} (来源: {source_url})")
-                else:
-                    print(f"跳过重复节点: {proxy['name']}")
-            except Exception as e:
-                # 处理不同格式的节点
-                node_url = node_item[0] if isinstance(node_item, tuple) else node_item
-                print(f"转换节点失败 {node_url[:50]}...: {str(e)}")
-        
-        print(f"总共转换了 {len(clash_config['proxies'])} 个唯一节点")
+                proxy_group_exists = True
+                break
+        if not proxy_group_exists:
+            # 创建FREE-PROXY组并添加到最上方
+            free_proxy_group = {
+                "name": "FREE-PROXY",
+                "type": "select",
+                "proxies": ["AUTO-SWITCH"]
+            }
+            proxy_groups.insert(0, free_proxy_group)
         
-        # 添加代理组（仅当有代理时）
-        if clash_config["proxies"]:
-            # 获取所有代理名称
-            all_proxy_names = [proxy["name"] for proxy in clash_config["proxies"]]
+        # 更新或添加按来源分组的代理组
+        existing_group_names = {group["name"]: group for group in proxy_groups}
+        for source_url, proxy_names in nodes_by_source.items():
+            # 清理来源URL，使其适合作为组名
+            group_name = self.proxy_namer.group_name(source_url)
             
-            # 从配置中获取现有的代理组（如果有）
-            proxy_groups = clash_config.get("proxy-groups", [])
-            
-            # 更新或添加"AUTO-SWITCH"组
-            auto_switch_group_exists = False
-            for group in proxy_groups:
-                if group["name"] == "AUTO-SWITCH":
-                    group["proxies"] = all_proxy_names
-                    auto_switch_group_exists = True
-                    break
-            if not auto_switch_group_exists:
+            if group_name in existing_group_names:
+                # 更新已存在的代理组的proxies列表
+                existing_group_names[group_name]["proxies"] = proxy_names
+            else:
+                # 添加新的代理组
                 proxy_groups.append({
-                    "name": "AUTO-SWITCH",
-                    "type": "url-test",
-                    "url": "http://www.gstatic.com/generate_204",
-                    "interval": 300,
-                    "tolerance": 50,
-                    "proxies": all_proxy_names
-                })
-            
-            # 更新FREE-PROXY组，确保它包含AUTO-SWITCH、来源分组和所有节点作为选项
-            proxy_group_exists = False
-            for group in proxy_groups:
-                if group["name"] == "FREE-PROXY":
-                    # 清空现有代理列表，重新构建
-                    group["proxies"] = []
-                    
-                    # 添加AUTO-SWITCH组
-                    if "AUTO-SWITCH" not in group["proxies"]:
-                        group["proxies"].append("AUTO-SWITCH")
-                    
-                    proxy_group_exists = True
-                    break
-            if not proxy_group_exists:
-                # 创建FREE-PROXY组并添加到最上方
-                free_proxy_group = {
-                    "name": "FREE-PROXY",
+                    "name": group_name,
                     "type": "select",
-                    "proxies": ["AUTO-SWITCH"]
-                }
-                proxy_groups.insert(0, free_proxy_group)
-            
-            # 更新或添加按来源分组的代理组
-            existing_group_names = {group["name"]: group for group in proxy_groups}
-            for source_url, proxy_names in nodes_by_source.items():
-                # 清理来源URL，使其适合作为组名
-                group_name = self._clean_source_url_for_group_name(source_url)
+                    "proxies": proxy_names
+                })
+        
+        # 更新FREE-PROXY组，添加来源分组和所有节点
+        for group in proxy_groups:
+            if group["name"] == "FREE-PROXY":
+                # 添加来源分组
+                for source_url in nodes_by_source.keys():
+                    group_name = self.proxy_namer.group_name(source_url)
+                    if group_name not in group["proxies"]:
+                        group["proxies"].append(group_name)
                 
-                if group_name in existing_group_names:
-                    # 更新已存在的代理组的proxies列表
-                    existing_group_names[group_name]["proxies"] = proxy_names
-                else:
-                    # 添加新的代理组
-                    proxy_groups.append({
-                        "name": group_name,
-                        "type": "select",
-                        "proxies": proxy_names
-                    })
+                # 添加所有节点
+                for proxy_name in all_proxy_names:
+                    if proxy_name not in group["proxies"]:
+                        group["proxies"].append(proxy_name)
+                break
+        
+        clash_config["proxy-groups"] = proxy_groups
+    
+    def _add_region_groups(self, clash_config, proxy_regions, region_index):
+        """
+        添加地区选择组和按地区的url-test组（位于AUTO-SWITCH之后），地区选择组加入FREE-PROXY
+        
+        Args:
+            clash_config (dict): Clash配置字典（已添加代理组）
+            proxy_regions (dict): 节点名称到国家代码的映射
+            region_index (RegionIndex): 地区索引
             
-            # 更新FREE-PROXY组，添加来源分组和所有节点
-            for group in proxy_groups:
-                if group["name"] == "FREE-PROXY":
-                    # 添加来源分组
-                    for source_url in nodes_by_source.keys():
-                        group_name = self._clean_source_url_for_group_name(source_url)
-                        if group_name not in group["proxies"]:
-                            group["proxies"].append(group_name)
-                    
-                    # 添加所有节点
-                    for proxy_name in all_proxy_names:
-                        if proxy_name not in group["proxies"]:
-                            group["proxies"].append(proxy_name)
-                    break
+        Returns:
+            set: 添加的代理组名称
+        """
+        region_groups = region_index.build_groups([proxy["name"] for proxy in clash_config["proxies"]], proxy_regions)
+        if not region_groups:
+            return set()
+        region_group_names = {group["name"] for group in region_groups}
+        proxy_groups = [group for group in clash_config["proxy-groups"] if group["name"] not in region_group_names]
+        position = next((i + 1 for i, group in enumerate(proxy_groups) if group["name"] == "AUTO-SWITCH"),
+                        len(proxy_groups))
+        proxy_groups[position:position] = region_groups
+        for group in proxy_groups:
+            if group["name"] == "FREE-PROXY":
+                group["proxies"] = [name for name in group["proxies"] if name != region_index.selector_name]
+                group["proxies"].insert(1 if group["proxies"][:1] == ["AUTO-SWITCH"] else 0, region_index.selector_name)
+                break
+        clash_config["proxy-groups"] = proxy_groups
+        print(f"添加了 {len(region_groups) - 1} 个地区分组")
+        return region_group_names
+    
+    def _profile_output_config(self, output_config, profile, output_file):
+        """
+        生成profile的输出配置：输出格式、其他格式的文件名（以profile文件名为前缀）和分片目录
+        
+        Args:
+            output_config (dict): 输出配置
+            profile (dict): profile配置
+            output_file (str): profile的Clash配置输出文件路径
             
-            clash_config["proxy-groups"] = proxy_groups
-        else:
-            # 如果没有代理，仍然保留配置文件中的代理组
-            clash_config["proxy-groups"] = clash_config.get("proxy-groups", [])
+        Returns:
+            dict: profile的输出配置
+        """
+        stem = os.path.splitext(os.path.basename(output_file))[0]
+        profile_output = dict(output_config)
+        profile_output["formats"] = profile.get("formats") or ["clash"]
+        profile_output["sing_box_file"] = f"{stem}.sing-box.json"
+        profile_output["uri_file"] = f"{stem}.txt"
+        profile_output["base64_file"] = f"{stem}.b64"
+        # 规则集和节点分片放在各profile的子目录中，清理旧文件时不会删除其他配置的文件；
+        # 下载URL和客户端本地路径同样加上子目录，否则会指向主配置的同名分片
+        for key, default_directory, default_prefix in (("rule_providers", "rules", "./ruleset"),
+                                                       ("proxy_providers", "providers", "./proxy_providers")):
+            provider_config = output_config.get(key) or {}
+            if provider_config.get("enable", False):
+                profile_output[key] = {
+                    **provider_config,
+                    "directory": os.path.join(provider_config.get("directory", default_directory), stem),
+                    "path_prefix": f"{provider_config.get('path_prefix', default_prefix).rstrip('/')}/{stem}",
+                }
+                if provider_config.get("base_url"):
+                    profile_output[key]["base_url"] = f"{provider_config['base_url'].rstrip('/')}/{stem}"
+        return profile_output
+    
+    def _render_profile(self, config, profile, parsed, output_file):
+        """
+        生成并写出一个配置（主配置或profile）
         
-        # 从配置获取输出目录和文件名
+        Args:
+            config (dict): 配置字典
+            profile (dict): profile配置，None表示主配置
+            parsed (tuple): 各配置共享的只读解析结果：(所有Clash代理配置, 来源URL到节点名称列表的映射,
+                            节点名称到国家代码的映射, 地区索引或None)
+            output_file (str): Clash配置输出文件路径
+            
+        Returns:
+            tuple: (Clash配置字典, 生成结果字典：name、output_file、proxies、changed、unchanged、
+                   content_hash、changed_providers、shard_hashes)
+        """
+        proxies, nodes_by_source, proxy_regions, region_index = parsed
         output_config = config.get("output", {})
-        output_dir = output_config.get("directory", "./output")
-        default_output_file = output_config.get("clash_config_file", "clash_config.yaml")
+        if profile is None:
+            name = "main"
+            clash_config = self._clash_config_template(config)
+            layout = "full"
+        else:
+            name = profile.get("name") or os.path.basename(output_file)
+            clash_config = self._clash_config_template(config, profile.get("rules"))
+            proxies, nodes_by_source = self._filter_proxies(proxies, nodes_by_source, profile.get("filter") or {})
+            layout = profile.get("groups", "full")
+            output_config = self._profile_output_config(output_config, profile, output_file)
+            if not profile.get("region_groups", True):
+                region_index = None
+        clash_config["proxies"] = list(proxies)
+        result = {"name": name, "output_file": output_file, "proxies": len(proxies), "changed": False,
+                  "unchanged": False, "content_hash": None, "changed_providers": [], "shard_hashes": {}}
+        
+        # 添加代理组（仅当有代理时）；没有代理时仍然保留配置文件中的代理组
+        region_group_names = set()
+        if clash_config["proxies"]:
+            self._build_proxy_groups(clash_config, nodes_by_source, layout)
+            if region_index:
+                region_group_names = self._add_region_groups(clash_config, proxy_regions, region_index)
+        
+        # 编译并精简规则列表（如果配置了）
+        compiler_config = config.get("rule_compiler") or {}
+        if compiler_config.get("enable", False):
+            clash_config["rules"] = RuleCompiler.from_config(compiler_config).compile(clash_config["rules"])
+        
+        # 语义内容与上次输出相同（只有节点顺序或名称后缀变化）时跳过写出所有输出
+        hash_config = output_config.get("content_hash") or {}
+        hash_file = None
+        if hash_config.get("enable", False) and clash_config["proxies"]:
+            hash_file = os.path.join(os.path.dirname(output_file), f".{os.path.basename(output_file)}.hash")
+            result["content_hash"] = semantic_hash(clash_config, output_config)
+            if self._content_unchanged(hash_file, result["content_hash"], output_file, output_config):
+                result["unchanged"] = True
+                print(f"配置 {name} 的语义内容未变化（{result['content_hash'][:12]}），跳过写出: unchanged")
+                return clash_config, result
+        
+        # 将规则拆分为独立的rule-provider文件（如果配置了）
+        provider_config = output_config.get("rule_providers") or {}
+        if provider_config.get("enable", False) and clash_config["proxies"]:
+            if provider_config.get("base_url"):
+                self._externalize_rules(clash_config, output_file, provider_config)
+            else:
+                print("警告: 已启用output.rule_providers但未设置base_url，客户端无法加载本机的规则集文件，"
+                      "规则保留在主配置中")
+        
+        # 将节点拆分为proxy-provider分片（如果配置了），主配置只引用分片
+        main_config = clash_config
+        shard_config = output_config.get("proxy_providers") or {}
+        if shard_config.get("enable", False) and clash_config["proxies"]:
+            if shard_config.get("base_url"):
+                main_config, result["changed_providers"], result["shard_hashes"] = self._shard_proxies(
+                    clash_config, nodes_by_source, output_file, shard_config, region_group_names)
+            else:
+                print("警告: 已启用output.proxy_providers但未设置base_url，客户端无法加载本机的分片文件，"
+                      "节点保留在主配置中")
         
-        # 如果没有提供输出文件路径，使用配置中的默认路径
-        if not output_file:
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = os.path.join(output_dir, default_output_file)
+        emitted, outputs = self._emit_outputs(clash_config, output_file, output_config, main_config)
+        result["changed"] = bool(outputs.get("clash"))
         
-        # 保存配置前的检查
-        if len(clash_config["proxies"]) > 0:
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        # 所有输出都写出成功后才记录哈希，避免下次运行跳过未写出的输出
+        if hash_file and emitted:
+            self._write_if_changed(hash_file, result["content_hash"] + "\n")
+        
+        return clash_config, result
+    
+    def _content_unchanged(self, hash_file, content_hash, output_file, output_config):
+        """
+        判断本次转换的语义内容哈希是否与上次写出时记录的哈希相同
+        
+        Args:
+            hash_file (str): 哈希文件路径
+            content_hash (str): 本次转换的语义内容哈希
+            output_file (str): Clash配置输出文件路径
+            output_config (dict): 输出配置
+            
+        Returns:
+            bool: 哈希相同且Clash配置文件存在时返回True
+        """
+        if "clash" in (output_config.get("formats") or ["clash"]) and not os.path.exists(output_file):
+            return False
+        try:
+            with open(hash_file, 'r', encoding='utf-8') as f:
+                return f.read().strip() == content_hash
+        except OSError:
+            return False
+    
+    def _apply_health_history(self, proxies, nodes_by_source, health_config):
+        """
+        使用节点健康度历史：剔除长期不可用的节点，探测剩余节点并记录结果，按得分排序
+        
+        Args:
+            proxies (list): Clash代理配置列表
+            nodes_by_source (dict): 来源URL到节点名称列表的映射
+            health_config (dict): health配置
             
-            # 检查文件是否存在
-            file_exists = os.path.exists(output_file)
+        Returns:
+            tuple: (筛选排序后的代理配置列表, 对应的来源分组映射)
+        """
+        try:
+            store = HealthStore(health_config.get("directory", "./health"), health_config.get("history", 32),
+                                evict_after=health_config.get("evict_after", 2592000))
+        except ImportError as e:
+            print(f"{str(e)}，跳过节点健康度处理")
+            return proxies, nodes_by_source
+        
+        min_samples = health_config.get("min_samples", 5)
+        min_success_rate = health_config.get("min_success_rate", 0.1)
+        
+        recheck_interval = health_config.get("recheck_interval", 86400)
+        
+        # 1. 探测前剔除历史上长期不可用的节点（超过recheck_interval未探测的节点重新探测）
+        keys = [self._generate_proxy_unique_key(proxy) for proxy in proxies]
+        store.touch(keys)
+        scores = store.scores(keys)
+        dead = ((scores["samples"] >= min_samples) & (scores["success_rate"] < min_success_rate)
+                & (scores["since_last_probe"] < recheck_interval))
+        if dead.any():
+            print(f"根据健康度历史剔除 {int(dead.sum())} 个长期不可用的节点")
+        alive = [i for i in range(len(proxies)) if not dead[i]]
+        
+        # 2. 探测剩余节点并记录结果
+        if health_config.get("probe", True):
+            prober = NodeProber(health_config.get("probe_timeout", 3), health_config.get("probe_workers", 64))
+            results = prober.probe([proxies[i] for i in alive])
+            probed = [(keys[i], result) for i, result in zip(alive, results) if result is not None]
+            store.record([key for key, _ in probed], [ok for _, (ok, _) in probed], [rtt for _, (_, rtt) in probed])
+            print(f"探测了 {len(probed)} 个节点，成功 {sum(1 for _, (ok, _) in probed if ok)} 个")
+        store.flush()
+        
+        # 3. 按成功率（无记录时视为0.5）和中位延迟排序
+        if health_config.get("rank", True):
+            scores = store.scores([keys[i] for i in alive])
+            success_rate = [0.5 if rate != rate else rate for rate in scores["success_rate"].tolist()]
+            p50 = [float('inf') if value != value else value for value in scores["p50"].tolist()]
+            order = sorted(range(len(alive)), key=lambda k: (-success_rate[k], p50[k]))
+            alive = [alive[k] for k in order]
+        
+        kept_proxies = [proxies[i] for i in alive]
+        rank = {proxy["name"]: position for position, proxy in enumerate(kept_proxies)}
+        kept_by_source = {}
+        for source_url, names in nodes_by_source.items():
+            kept_names = sorted((name for name in names if name in rank), key=rank.get)
+            if kept_names:
+                kept_by_source[source_url] = kept_names
+        return kept_proxies, kept_by_source
+    
+    def _shard_proxies(self, clash_config, nodes_by_source, output_file, shard_config, skip_groups=()):
+        """
+        将节点写入proxy-provider分片文件，生成只引用分片的精简主配置
+        
+        Args:
+            clash_config (dict): 完整的Clash配置字典
+            nodes_by_source (dict): 来源URL到节点名称列表的映射
+            output_file (str): Clash配置输出文件路径
+            shard_config (dict): output.proxy_providers配置
+            skip_groups (iterable): 直接引用节点、无法改为引用分片的代理组（例如地区分组），不写入主配置
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                yaml.dump(clash_config, f, allow_unicode=True, default_flow_style=False)
+        Returns:
+            tuple: (精简后的主配置, 内容发生变化的分片名称列表, {分片名称: 内容哈希})
+        """
+        builder = ProxyProviderBuilder.from_config(shard_config)
+        providers_dir = os.path.join(os.path.dirname(output_file), shard_config.get("directory", "providers"))
+        
+        proxy_sources = {name: source_url for source_url, names in nodes_by_source.items() for name in names}
+        source_names = {source_url: self.proxy_namer.short_source_name(source_url) for source_url in nodes_by_source}
+        providers, files, source_shards = builder.build(
+            clash_config["proxies"], proxy_sources, source_names, self._generate_proxy_unique_key, providers_dir
+        )
+        
+        changed_providers = []
+        shard_hashes = {}
+        for shard_name, (file_path, content, content_hash) in files.items():
+            shard_hashes[shard_name] = content_hash
+            if self._write_if_changed(file_path, content):
+                changed_providers.append(shard_name)
+        
+        # 清理不再引用的旧分片文件
+        for file_path in builder.stale_files(providers_dir, [path for path, _, _ in files.values()]):
+            os.remove(file_path)
+            print(f"已删除旧分片文件: {file_path}")
+        
+        all_providers = list(providers.keys())
+        source_groups = {self.proxy_namer.group_name(url): shard for url, shard in source_shards.items()}
+        
+        proxy_groups = []
+        for group in copy.deepcopy(clash_config["proxy-groups"]):
+            if group["name"] in skip_groups:
+                continue
+            if group["name"] == "AUTO-SWITCH":
+                group.pop("proxies", None)
+                group["use"] = all_providers
+            elif group["name"] == "FREE-PROXY":
+                group["proxies"] = ["AUTO-SWITCH"] + list(source_groups.keys())
+                group["use"] = all_providers
+            elif group["name"] in source_groups:
+                group.pop("proxies", None)
+                group["use"] = [source_groups[group["name"]]]
+            elif group["name"] in {self.proxy_namer.group_name(url) for url in nodes_by_source}:
+                # 按哈希分片时不保留来源分组
+                continue
+            proxy_groups.append(group)
+        
+        main_config = dict(clash_config)
+        main_config["proxies"] = []
+        main_config["proxy-providers"] = providers
+        main_config["proxy-groups"] = proxy_groups
+        print(f"节点已拆分为 {len(providers)} 个proxy-provider分片（按{builder.shard_by}）")
+        return main_config, changed_providers, shard_hashes
+    
+    def _externalize_rules(self, clash_config, output_file, provider_config):
+        """
+        将内联规则写入独立的rule-provider文件，主配置改为RULE-SET引用
+        
+        Args:
+            clash_config (dict): Clash配置字典
+            output_file (str): Clash配置输出文件路径
+            provider_config (dict): output.rule_providers配置
+        """
+        builder = RuleProviderBuilder.from_config(provider_config)
+        rules_dir = os.path.join(os.path.dirname(output_file), provider_config.get("directory", "rules"))
+        
+        rules, providers, files = builder.build(clash_config["rules"], rules_dir)
+        for file_path, content in files.items():
+            self._write_if_changed(file_path, content)
+        
+        # 清理不再引用的旧规则集文件
+        for file_path in builder.stale_files(rules_dir, files.keys()):
+            os.remove(file_path)
+            print(f"已删除旧规则集文件: {file_path}")
+        
+        clash_config["rule-providers"] = {**(clash_config.get("rule-providers") or {}), **providers}
+        clash_config["rules"] = rules
+        print(f"规则已拆分为 {len(providers)} 个rule-provider，主配置规则数 {len(rules)}")
+    
+    def _emit_outputs(self, clash_config, output_file, output_config, main_config=None):
+        """
+        基于同一份解析结果并发生成所有配置的输出格式
+        
+        Args:
+            clash_config (dict): Clash配置字典
+            output_file (str): Clash配置输出文件路径
+            output_config (dict): 输出配置
+            main_config (dict, optional): 写入Clash配置文件的主配置，默认为clash_config
             
-            if file_exists:
-                print(f"已更新文件: {output_file}，添加了 {len(clash_config['proxies'])} 个节点")
-            else:
-                print(f"已创建文件: {output_file}，添加了 {len(clash_config['proxies'])} 个节点")
-        else:
-            print(f"节点数组为空，未更新文件: {output_file}")
+        Returns:
+            tuple: (所有输出格式是否都生成成功, 输出格式到文件内容是否变化的映射)
+        """
+        main_config = main_config or clash_config
+        formats = output_config.get("formats") or ["clash"]
+        output_dir = os.path.dirname(output_file)
         
-        return clash_config
+        emitters = {}
+        if "clash" in formats:
+            emitters["clash"] = lambda: self._save_clash_config(main_config, output_file)
+        if clash_config["proxies"]:
+            if "sing-box" in formats:
+                sing_box_file = os.path.join(output_dir, output_config.get("sing_box_file", "free-VPN.sing-box.json"))
+                emitters["sing-box"] = lambda: self._write_if_changed(
+                    sing_box_file, self.sing_box_emitter.render(clash_config))
+            if "uri" in formats:
+                uri_file = os.path.join(output_dir, output_config.get("uri_file", "free-VPN.txt"))
+                emitters["uri"] = lambda: self._write_if_changed(
+                    uri_file, self.uri_emitter.render(clash_config))
+            if "base64" in formats:
+                base64_file = os.path.join(output_dir, output_config.get("base64_file", "free-VPN.b64"))
+                emitters["base64"] = lambda: self._write_if_changed(
+                    base64_file, self.uri_emitter.render_base64(clash_config))
+        
+        if len(emitters) == 1:
+            return True, {name: emit() for name, emit in emitters.items()}
+        
+        # 各输出格式只读取共享的clash_config，可以并发生成
+        succeeded = True
+        outputs = {}
+        with ThreadPoolExecutor(max_workers=len(emitters)) as executor:
+            futures = {name: executor.submit(emit) for name, emit in emitters.items()}
+            for name, future in futures.items():
+                try:
+                    outputs[name] = future.result()
+                except Exception as e:
+                    succeeded = False
+                    print(f"生成{name}格式输出失败: {str(e)}")
+        return succeeded, outputs
     
     def _parse_ssr_url(self, ssr_url, source_name=""):
         """
@@ -394,22 +909,9 @@ class SSRConverter:
         if not ssr_url.startswith('ssr://'):
             raise ValueError("不是有效的SSR URL")
         
-        # 去掉前缀并解码
-        encoded_part = ssr_url[6:]
-        
-        # 处理URL安全的base64编码
-        encoded_part = encoded_part.replace('-', '+').replace('_', '/')
-        padding = '=' * ((4 - len(encoded_part) % 4) % 4)
-        encoded_part += padding
-        
-        decoded = base64.b64decode(encoded_part).decode('utf-8')
-        
-        # 解析主参数部分和查询参数部分
-        if '?' in decoded:
-            main_part, params_part = decoded.split('?')
-        else:
-            main_part = decoded
-            params_part = ''
+        # 整体为base64编码：server:port:protocol:method:obfs:base64(password)/?params
+        decoded = decode_base64(ssr_url[6:])
+        main_part, _, params_part = decoded.partition('?')
         
         # 解析主部分：server:port:protocol:method:obfs:password
         parts = main_part.split(':')
@@ -419,35 +921,19 @@ class SSRConverter:
         server, port, protocol, method, obfs, password_part = parts
         
         # 密码部分可能包含结尾的'/'，需要移除
-        if password_part.endswith('/'):
-            password_part = password_part[:-1]
+        password = decode_base64(password_part.rstrip('/'))
         
-        # 处理密码部分的URL安全base64编码
-        password_part = password_part.replace('-', '+').replace('_', '/')
-        # 添加base64填充
-        padding = '=' * ((4 - len(password_part) % 4) % 4)
-        password_part += padding
-        
-        # 解析参数字符串
+        # 参数值均为base64编码，无法解码时保留原值
         params = {}
         if params_part:
             for param in params_part.split('&'):
-                if '=' in param:
-                    key, value = param.split('=', 1)  # 只在第一个=处分割，处理值中包含=的情况
-                    # 处理URL安全的base64编码
-                    value = value.replace('-', '+').replace('_', '/')
-                    # 添加base64填充
-                    padding = '=' * ((4 - len(value) % 4) % 4)
-                    value += padding
+                key, sep, value = param.partition('=')
+                if sep:
                     try:
-                        decoded_value = base64.b64decode(value).decode('utf-8')
-                        params[key] = decoded_value
-                    except Exception:
+                        params[key] = decode_base64(value)
+                    except ValueError:
                         params[key] = value
         
-        # 解码密码
-        password = base64.b64decode(password_part).decode('utf-8')
-        
         # 构造Clash代理配置 - 确保名称唯一
         base_name = params.get('remarks', 'SSR')
         # 使用_process_proxy_name方法处理节点名称
@@ -489,18 +975,8 @@ class SSRConverter:
         if not vmess_url.startswith('vmess://'):
             raise ValueError("不是有效的VMess URL")
         
-        # 去掉前缀并解码
-        encoded_part = vmess_url[8:]
-        
-        # 处理URL安全的base64编码
-        encoded_part = encoded_part.replace('-', '+').replace('_', '/')
-        padding = '=' * ((4 - len(encoded_part) % 4) % 4)
-        encoded_part += padding
-        
-        decoded = base64.b64decode(encoded_part).decode('utf-8')
-        
-        # 解析JSON
-        vmess_config = json.loads(decoded)
+        # 去掉前缀并解码JSON
+        vmess_config = json.loads(decode_base64(vmess_url[8:]))
         
         # 构造Clash代理配置 - 确保名称唯一
         base_name = vmess_config.get("ps", "VMess")
@@ -515,7 +991,8 @@ class SSRConverter:
             "uuid": vmess_config.get("id"),
             "alterId": int(vmess_config.get("aid", 0)),
             "cipher": vmess_config.get("scy", "auto"),
-            "tls": vmess_config.get("tls", "").lower() == "true",
+            # v2rayN格式中tls字段为"tls"，部分来源使用"true"
+            "tls": str(vmess_config.get("tls", "")).lower() in ("tls", "true"),
             "skip-cert-verify": True,
             "network": vmess_config.get("net", "tcp"),
             "udp": True
@@ -539,57 +1016,50 @@ class SSRConverter:
         """
         解析SS URL并转换为Clash代理配置
         
+        支持SIP002格式 ss://base64(method:password)@server:port#name（认证部分也可以是百分号编码的明文），
+        以及旧格式 ss://base64(method:password@server:port)#name
+        
         Args:
             ss_url (str): SS URL
             
         Returns:
             dict: Clash代理配置
         """
-        if not ss_url.startswith('ss://'):
+        scheme, _, rest = ss_url.partition('://')
+        if scheme.lower() != 'ss':
             raise ValueError("不是有效的SS URL")
         
-        # 去掉前缀
-        encoded_part = ss_url[5:]
-        
-        # 解析@符号分隔的两部分：base64(加密方式:密码) 和 服务器:端口
+        encoded_part, _, fragment = rest.partition('#')
+        encoded_part = encoded_part.partition('?')[0]
         if '@' not in encoded_part:
-            raise ValueError("SS URL格式错误，缺少@符号")
-        
-        auth_part, server_part = encoded_part.split('@', 1)
-        
-        # 解析服务器和端口
-        if ':' not in server_part:
-            raise ValueError("SS URL格式错误，服务器部分缺少端口")
-        
-        # 处理可能包含路径或参数的服务器部分
-        server_port_part = server_part.split('?')[0]
-        
-        # 处理可能包含注释的端口号（如:990#注释）
-        if '#' in server_port_part:
-            server_port_part = server_port_part.split('#')[0]
-        
-        server, port_str = server_port_part.rsplit(':', 1)
-        port = int(port_str)
+            # 旧格式：服务器和端口也在base64编码中。base64文本可能包含'/'，
+            # 解码后的明文密码可能包含'?'、'/'、'#'，因此不能使用split_uri切分
+            try:
+                decoded = decode_base64(encoded_part)
+            except ValueError as e:
+                raise ValueError(f"SS URL格式错误，缺少@符号: {str(e)}")
+            decoded_auth, sep, hostport = decoded.rpartition('@')
+            if not sep:
+                raise ValueError("SS URL格式错误，缺少@符号")
+            server, port = self._split_host_port(hostport)
+            name = unquote(fragment) if fragment else ''
+        else:
+            uri = split_uri(ss_url)
+            server, port, name = uri.host, uri.require_port(), uri.fragment
+            # 认证部分可以是base64编码或百分号编码的明文
+            try:
+                decoded_auth = decode_base64(uri.userinfo)
+            except ValueError:
+                decoded_auth = uri.userinfo
         
         # 解析加密方式和密码
-        try:
-            # 处理URL安全的base64编码
-            auth_part = auth_part.replace('-', '+').replace('_', '/')
-            padding = '=' * ((4 - len(auth_part) % 4) % 4)
-            auth_part += padding
-            
-            decoded_auth = base64.b64decode(auth_part).decode('utf-8')
-            
-            if ':' not in decoded_auth:
-                raise ValueError("SS URL格式错误，认证部分缺少加密方式和密码的分隔符")
-            
-            method, password = decoded_auth.split(':', 1)
-        except Exception as e:
-            raise ValueError(f"解析SS URL认证部分失败: {str(e)}")
+        method, sep, password = decoded_auth.partition(':')
+        if not sep:
+            raise ValueError("SS URL格式错误，认证部分缺少加密方式和密码的分隔符")
         
         # 构造Clash代理配置 - 确保名称唯一
-        # SS URL通常没有备注信息，使用协议名称作为基础名称
-        base_name = "SS"
+        # 优先使用URL片段作为备注，没有备注时使用协议名称
+        base_name = name or "SS"
         # 使用_process_proxy_name方法处理节点名称
         proxy_name = self._process_proxy_name(base_name, source_name)
         proxy = {
@@ -604,6 +1074,27 @@ class SSRConverter:
         
         return proxy
     
+    def _split_host_port(self, hostport):
+        """
+        拆分明文的 服务器:端口（IPv6地址带方括号）
+        
+        Args:
+            hostport (str): 服务器和端口
+            
+        Returns:
+            tuple: (服务器, 端口)
+        """
+        if hostport.startswith('['):
+            host, _, port = hostport[1:].partition(']')
+            port = port[1:]
+        else:
+            host, _, port = hostport.rpartition(':')
+        if not host or not port:
+            raise ValueError("SS URL格式错误，服务器部分缺少端口")
+        if not port.isdigit():
+            raise ValueError(f"端口格式错误: {port}")
+        return host, int(port)
+    
     def _generate_proxy_unique_key(self, proxy):
         """
         生成代理配置的唯一键，用于去重
@@ -712,49 +1203,11 @@ class SSRConverter:
         Returns:
             str: 清理后的分组名称
         """
-        import re
-        
-        # 特殊处理GitHub链接
-        github_match = re.match(r'^https?://github\.com/([^/]+)/([^/]+)', source_url)
-        if github_match:
-            username = github_match.group(1)
-            repo_name = github_match.group(2)
-            # 移除可能的wiki路径
-            repo_name = re.sub(r'/wiki.*$', '', repo_name)
-            # 只保留仓库名称的最后一部分（如果包含/）
-            repo_name = repo_name.split('/')[-1]
-            return f"Github - {username}/{repo_name}"
-        
-        # 移除协议部分 (http://, https://)
-        group_name = re.sub(r'^https?://', '', source_url)
-        
-        # 移除路径部分
-        group_name = re.sub(r'/.*$', '', group_name)
-        
-        # 移除端口号 (如果有)
-        group_name = re.sub(r':\d+$', '', group_name)
-        
-        # 移除特殊字符，保留中文、英文、数字和部分标点
-        group_name = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9.-_]', '', group_name)
-        
-        # 限制长度
-        max_length = 30
-        if len(group_name) > max_length:
-            group_name = group_name[:max_length]
-        
-        # 如果处理后为空，使用默认名称
-        if not group_name:
-            group_name = "未知来源"
-        
-        return group_name
+        return self.proxy_namer.group_name(source_url)
     
     def _process_proxy_name(self, base_name, source_name=""):
         """
-        处理代理节点名称，实现以下功能：
-        1. 将国家代码（如 NL、HK）替换为国旗图标
-        2. 清理名称中的冗余信息
-        3. 确保名称唯一性（添加数字后缀）
-        4. 添加来源信息（如 - fanqiang、- FreeProxyGo）
+        处理代理节点名称（国旗替换、清理冗余信息、添加来源、确保唯一性）
         
         Args:
             base_name (str): 原始节点名称
@@ -763,43 +1216,7 @@ class SSRConverter:
         Returns:
             str: 处理后的节点名称
         """
-        import re
-        
-        # 1. 替换国家代码为国旗图标
-        processed_name = base_name
-        
-        # 匹配类似 "NL荷兰"、"HK中国香港" 等格式的国家代码
-        country_code_pattern = r'^(\w{2})([\u4e00-\u9fa5]+)'  # 匹配开头的两个字母和随后的中文
-        match = re.match(country_code_pattern, processed_name)
-        
-        if match:
-            country_code = match.group(1).upper()
-            if country_code in self.country_flag_map:
-                # 替换国家代码为国旗图标
-                country_name = match.group(2)
-                processed_name = f"{self.country_flag_map[country_code]}{country_name}"
-        
-        # 2. 清理名称中的冗余信息
-        # 移除可能的数字ID或其他多余标识
-        processed_name = re.sub(r'^\d+\s*-\s*', '', processed_name)  # 移除开头的数字和连字符
-        
-        # 3. 添加来源信息
-        if source_name:
-            processed_name = f"{processed_name} - {source_name}"
-        
-        # 4. 确保名称唯一性
-        if processed_name in self.name_counter:
-            self.name_counter[processed_name] += 1
-            processed_name = f"{processed_name}{self.name_counter[processed_name]}"
-        else:
-            self.name_counter[processed_name] = 0
-        
-        # 限制名称长度
-        max_length = 50
-        if len(processed_name) > max_length:
-            processed_name = processed_name[:max_length]
-        
-        return processed_name
+        return self.proxy_namer.allocate(base_name, source_name)
     
     def _parse_vless_url(self, vless_url, source_name=""):
         """
@@ -811,46 +1228,17 @@ class SSRConverter:
         Returns:
             dict: Clash代理配置
         """
-        if not vless_url.startswith('vless://'):
+        uri = split_uri(vless_url)
+        if uri.scheme != 'vless':
             raise ValueError("不是有效的VLESS URL")
-        
-        # 去掉前缀
-        url_part = vless_url[8:]
-        
-        if '@' not in url_part:
+        if not uri.userinfo:
             raise ValueError("VLESS URL格式错误，缺少@符号")
         
-        uuid_part, server_part = url_part.split('@', 1)
-        
-        # 解析服务器和端口
-        if ':' not in server_part:
-            raise ValueError("VLESS URL格式错误，服务器部分缺少端口")
-        
-        # 处理可能包含路径或参数的服务器部分
-        server_port_path, params_part = server_part.split('?', 1) if '?' in server_part else (server_part, '')
-        
-        # 处理URL中的片段部分（#后面的内容）
-        fragment_part = ''
-        if '#' in server_port_path:
-            server_port_path, fragment_part = server_port_path.split('#', 1)
-        
-        if '/' in server_port_path:
-            server_port_part, path_part = server_port_path.split('/', 1)
-            path_part = '/' + path_part
-        else:
-            server_port_part = server_port_path
-            path_part = ''
-        
-        server, port_str = server_port_part.rsplit(':', 1)
-        port = int(port_str)
-        
-        # 解析参数字符串
-        params = {}
-        if params_part:
-            for param in params_part.split('&'):
-                if '=' in param:
-                    key, value = param.split('=', 1)
-                    params[key] = value
+        server = uri.host
+        port = uri.require_port()
+        params = uri.params
+        # 分享链接通常在path参数中给出ws/h2路径，也兼容直接写在URI路径中的形式
+        path_part = params.get('path') or uri.path
         
         # 处理网络类型
         network_type = params.get('type', params.get('net', 'tcp'))
@@ -867,10 +1255,7 @@ class SSRConverter:
         
         # 构造Clash代理配置 - 确保名称唯一
         # 优先使用URL片段作为备注
-        if fragment_part:
-            base_name = fragment_part
-        else:
-            base_name = params.get('remarks', 'VLESS')
+        base_name = uri.fragment or params.get('remarks', 'VLESS')
         # 使用_process_proxy_name方法处理节点名称
         proxy_name = self._process_proxy_name(base_name, source_name)
         
@@ -879,7 +1264,7 @@ class SSRConverter:
             "type": "vless",
             "server": server,
             "port": port,
-            "uuid": uuid_part,
+            "uuid": uri.userinfo,
             "network": network_type,
             "tls": tls_enabled,
             "udp": params.get('udp', '').lower() == 'true',
@@ -932,7 +1317,7 @@ class SSRConverter:
     
     def _parse_hysteria2_url(self, hysteria2_url, source_name=""):
         """
-        解析Hysteria2 URL并转换为Clash代理配置
+        解析Hysteria2 URL（hysteria2://或hy2://）并转换为Clash代理配置
         
         Args:
             hysteria2_url (str): Hysteria2 URL
@@ -941,48 +1326,28 @@ class SSRConverter:
         Returns:
             dict: Clash代理配置
         """
-        if not hysteria2_url.startswith('hysteria2://'):
+        uri = split_uri(hysteria2_url)
+        if uri.scheme not in ('hysteria2', 'hy2'):
             raise ValueError("不是有效的Hysteria2 URL")
-        
-        # 去掉前缀
-        url_part = hysteria2_url[12:]
-        
-        if '@' not in url_part:
+        if not uri.userinfo:
             raise ValueError("Hysteria2 URL格式错误，缺少@符号")
         
-        # 解析密码和服务器端口部分
-        password_part, server_part = url_part.split('@', 1)
-        
-        # 解析服务器和端口
-        if ':' not in server_part:
-            raise ValueError("Hysteria2 URL格式错误，服务器部分缺少端口")
-        
-        # 处理可能包含路径或参数的服务器部分
-        server_port_path, params_part = server_part.split('?', 1) if '?' in server_part else (server_part, '')
-        
-        server, port_str = server_port_path.rsplit(':', 1)
-        port = int(port_str)
-        
-        # 解析参数字符串
-        params = {}
-        if params_part:
-            for param in params_part.split('&'):
-                if '=' in param:
-                    key, value = param.split('=', 1)
-                    params[key] = value
+        port = uri.require_port()
+        params = uri.params
         
         # 构造Clash代理配置 - 确保名称唯一
-        base_name = params.get('remarks', 'Hysteria2')
+        # 优先使用URL片段作为备注
+        base_name = uri.fragment or params.get('remarks', 'Hysteria2')
         # 使用_process_proxy_name方法处理节点名称
         proxy_name = self._process_proxy_name(base_name, source_name)
         
         proxy = {
             "name": proxy_name,
             "type": "hysteria2",
-            "server": server,
+            "server": uri.host,
             "port": port,
-            "password": password_part,
-            "insecure": params.get('insecure', '').lower() == '1' or params.get('insecure', '').lower() == 'true',
+            "password": uri.userinfo,
+            "insecure": params.get('insecure', '').lower() in ('1', 'true'),
             "udp": params.get('udp', '').lower() == 'true'
         }
         
@@ -1024,57 +1389,28 @@ class SSRConverter:
         Returns:
             dict: Clash代理配置
         """
-        if not trojan_url.startswith('trojan://'):
+        uri = split_uri(trojan_url)
+        if uri.scheme != 'trojan':
             raise ValueError("不是有效的Trojan URL")
-        
-        # 去掉前缀
-        url_part = trojan_url[9:]
-        
-        if '@' not in url_part:
+        if not uri.userinfo:
             raise ValueError("Trojan URL格式错误，缺少@符号")
         
-        # 解析密码和服务器端口部分
-        password_part, server_part = url_part.split('@', 1)
-        
-        # 解析服务器和端口
-        if ':' not in server_part:
-            raise ValueError("Trojan URL格式错误，服务器部分缺少端口")
-        
-        # 处理可能包含路径或参数的服务器部分
-        server_port_path, params_part = server_part.split('?', 1) if '?' in server_part else (server_part, '')
-        
-        # 处理URL中的片段部分（#后面的内容）
-        fragment_part = ''
-        if '#' in server_port_path:
-            server_port_path, fragment_part = server_port_path.split('#', 1)
-        
-        server, port_str = server_port_path.rsplit(':', 1)
-        port = int(port_str)
-        
-        # 解析参数字符串
-        params = {}
-        if params_part:
-            for param in params_part.split('&'):
-                if '=' in param:
-                    key, value = param.split('=', 1)
-                    params[key] = value
+        port = uri.require_port()
+        params = uri.params
         
         # 构造Clash代理配置 - 确保名称唯一
         # 优先使用URL片段作为备注
-        if fragment_part:
-            base_name = fragment_part
-        else:
-            base_name = params.get('remarks', 'Trojan')
+        base_name = uri.fragment or params.get('remarks', 'Trojan')
         # 使用_process_proxy_name方法处理节点名称
         proxy_name = self._process_proxy_name(base_name, source_name)
         
         proxy = {
             "name": proxy_name,
             "type": "trojan",
-            "server": server,
+            "server": uri.host,
             "port": port,
-            "password": password_part,
-            "skip-cert-verify": params.get('insecure', '').lower() == '1' or params.get('insecure', '').lower() == 'true',
+            "password": uri.userinfo,
+            "skip-cert-verify": params.get('insecure', params.get('allowInsecure', '')).lower() in ('1', 'true'),
             "udp": params.get('udp', '').lower() == 'true'
         }
         
@@ -1100,28 +1436,63 @@ class SSRConverter:
     
     def save_clash_config_to_file(self, clash_config, file_path):
         """
-        将Clash配置保存到文件
+        将Clash配置保存到文件，内容与现有文件相同时跳过写入
         
         Args:
             clash_config (dict): Clash配置字典
             file_path (str): 输出文件路径
-        """
-        # 保存配置前的检查
-        if len(clash_config.get("proxies", [])) > 0:
-            # 确保输出目录存在
-            dir_name = os.path.dirname(file_path)
-            if dir_name and not os.path.exists(dir_name):
-                os.makedirs(dir_name, exist_ok=True)
             
-            # 检查文件是否存在
-            file_exists = os.path.exists(file_path)
+        Returns:
+            bool: 文件内容是否发生变化
+        """
+        self.last_output_file = file_path
+        self.last_output_changed = self._save_clash_config(clash_config, file_path)
+        return self.last_output_changed
+    
+    def _save_clash_config(self, clash_config, file_path):
+        """
+        将Clash配置保存到文件（不修改转换器状态，可在多个线程中同时调用）
+        
+        Returns:
+            bool: 文件内容是否发生变化
+        """
+        # 保存配置前的检查（节点可能位于proxy-provider分片中）
+        if clash_config.get("proxies") or clash_config.get("proxy-providers"):
+            content = yaml.dump(clash_config, allow_unicode=True, default_flow_style=False)
+            changed = self._write_if_changed(file_path, content)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                yaml.dump(clash_config, f, allow_unicode=True, default_flow_style=False)
+            if changed:
+                print(f"Clash配置添加了 {len(clash_config['proxies'])} 个节点")
+            return changed
+        print(f"节点数组为空，未更新文件: {file_path}")
+        return False
+    
+    def _write_if_changed(self, file_path, content):
+        """
+        写入文本文件，内容与现有文件相同时跳过写入
+        
+        Args:
+            file_path (str): 文件路径
+            content (str): 文件内容
             
-            if file_exists:
-                print(f"已更新文件: {file_path}，添加了 {len(clash_config['proxies'])} 个节点")
-            else:
-                print(f"已创建文件: {file_path}，添加了 {len(clash_config['proxies'])} 个节点")
-        else:
-            print(f"节点数组为空，未更新文件: {file_path}")
+        Returns:
+            bool: 文件内容是否发生变化
+        """
+        # 确保输出目录存在
+        dir_name = os.path.dirname(file_path)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+        
+        # 检查文件是否存在，以及内容是否变化
+        file_exists = os.path.exists(file_path)
+        if file_exists:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    print(f"内容未变化，跳过写入: {file_path}")
+                    return False
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        print(f"{'已更新' if file_exists else '已创建'}文件: {file_path}")
+        return True
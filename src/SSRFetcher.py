@@ -1,9 +1,14 @@
 import re
 import os
 import sys
+import copy
 import requests
-import base64
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import codecs
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Tuple
 from playwright.sync_api import sync_playwright
 
@@ -11,8 +16,21 @@ from playwright.sync_api import sync_playwright
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from bs4 import BeautifulSoup
+from RetryPolicy import RetryPolicy
+from CircuitBreaker import CircuitBreaker
+from SourceCache import SourceCache
+from CapturePolicy import CapturePolicy
+from BrowserPrewarm import BrowserPrewarmer
+from HedgePolicy import HedgePolicy, FetchCancelled
+from SourceAdapters import adapters_for_url, GenericAdapter
+from NodeParsers import decode_base64
+from NodeDeduplicator import create_deduplicator
 
 class ConfigManager:
+    def __init__(self):
+        # 已加载配置的缓存：配置文件路径 -> (修改时间, 配置字典)
+        self._cache = {}
+    
     def load_configuration(self, config_file=None):
         """
         加载配置文件
@@ -33,6 +51,12 @@ class ConfigManager:
         if not os.path.exists(config_file):
             raise FileNotFoundError(f"配置文件不存在: {config_file}")
         
+        # 配置文件未修改时直接返回缓存的副本（调用方可能修改返回的字典）
+        mtime = os.path.getmtime(config_file)
+        cached = self._cache.get(config_file)
+        if cached and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
+        
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
@@ -40,6 +64,7 @@ class ConfigManager:
             # 添加默认值（如果配置项不存在）
             config = self._add_defaults(config)
             
+            self._cache[config_file] = (mtime, copy.deepcopy(config))
             return config
             
         except yaml.YAMLError as e:
@@ -116,17 +141,90 @@ class ConfigManager:
         
         return config
 
+# 支持的代理协议前缀（与SSRConverter中注册的节点解析函数一致）
+PROXY_PROTOCOLS = ['ssr://', 'vmess://', 'vless://', 'ss://', 'hysteria2://', 'hy2://', 'trojan://']
+_SCHEME_PATTERN = '|'.join(protocol[:-3] for protocol in PROXY_PROTOCOLS)
+# 代理链接：到下一个代理协议开头或行尾为止
+NODE_LINK_PATTERN = re.compile(rf'(?:{_SCHEME_PATTERN})://[^\s]*?(?=(?:{_SCHEME_PATTERN})://|$)')
+
 class SSRFetcher:
     def __init__(self):
         self.config_manager = ConfigManager()
+        # 复用HTTP连接池（守护模式下跨多次刷新保持连接）
+        self.session = requests.Session()
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = None
+        self.source_cache = None
+        # 镜像来源的对冲策略；对冲请求的取消事件按线程保存
+        self.hedge_policy = None
+        self._local = threading.local()
+        # 响应体大小上限（字节）和每个来源的节点数上限，0表示不限制
+        self.max_body_size = 10 * 1024 * 1024
+        self.max_nodes_per_source = 0
+        self.capture_policy = CapturePolicy()
+        # 浏览器预热器，以及最近一次获取中预热的浏览器（未预热时为None）
+        self.browser_prewarmer = None
+        self.last_warm_browser = None
+        # 来源适配器：是否启用，以及为个别来源指定的适配器
+        self.adapters_enabled = True
+        self.adapter_overrides = {}
+        # 最近一次获取的结果：各来源的节点、被熔断跳过的来源、因截止时间未完成的来源、使用缓存节点的来源
+        self.last_nodes_by_source = {}
+        self.last_skipped_sources = []
+        self.last_cutoff_sources = []
+        self.last_stale_sources = []
+        # 最近一次获取中各来源的获取方式（适配器名称、browser或stale_cache）和获取时间（time.time）
+        self.last_strategies = {}
+        self.last_fetched_at = {}
+        # 最近一次获取中发出了对冲请求的来源，以及使用镜像结果的来源（来源URL -> 镜像URL）
+        self.last_hedged_sources = []
+        self.last_mirror_sources = {}
+        # 节点去重配置（顶层dedup配置），节点数超过阈值时使用有界内存的去重实现
+        self.dedup_config = {}
+    
+    def configure(self, ssr_source):
+        """
+        根据ssr_source配置设置重试策略、熔断器、来源缓存、镜像对冲、浏览器预热和下载限制
+        
+        Args:
+            ssr_source (dict): ssr_source配置
+        """
+        self.max_body_size = ssr_source.get("max_body_size", 10 * 1024 * 1024)
+        self.max_nodes_per_source = ssr_source.get("max_nodes_per_source", 0)
+        self.capture_policy = CapturePolicy.from_config(ssr_source.get("browser_capture") or {})
+        prewarm_config = ssr_source.get("browser_prewarm") or {}
+        if prewarm_config.get("enable", False):
+            self.browser_prewarmer = BrowserPrewarmer.from_config(prewarm_config)
+        else:
+            self.browser_prewarmer = None
+        adapter_config = ssr_source.get("adapters") or {}
+        self.adapters_enabled = adapter_config.get("enable", True)
+        self.adapter_overrides = adapter_config.get("overrides") or {}
+        self.retry_policy = RetryPolicy.from_config(ssr_source.get("retry") or {})
+        breaker_config = ssr_source.get("circuit_breaker") or {}
+        if breaker_config.get("enable", False):
+            self.circuit_breaker = CircuitBreaker.from_config(breaker_config)
+        else:
+            self.circuit_breaker = None
+        cache_config = ssr_source.get("stale_cache") or {}
+        if cache_config.get("enable", False):
+            self.source_cache = SourceCache.from_config(cache_config)
+        else:
+            self.source_cache = None
+        mirror_config = ssr_source.get("mirrors") or {}
+        if mirror_config.get("enable", False):
+            self.hedge_policy = HedgePolicy.from_config(mirror_config)
+        else:
+            self.hedge_policy = None
     
-    def get_nodes_from_web(self, config_file=None, custom_urls=None):
+    def get_nodes_from_web(self, config_file=None, custom_urls=None, deadline=None):
         """
         从多个Web页面并发获取代理节点列表
         
         Args:
             config_file (str, optional): 配置文件路径
             custom_urls (list or str, optional): 自定义URL列表或单个URL，优先使用此URL
+            deadline (float, optional): 截止时间（time.monotonic），到达后不再等待未完成的来源
             
         Returns:
             list: 代理节点列表，每个节点是一个元组 (node_url, source_url)
@@ -134,6 +232,8 @@ class SSRFetcher:
         # 加载配置
         config = self.config_manager.load_configuration(config_file)
         ssr_source = config.get("ssr_source", {})
+        self.configure(ssr_source)
+        self.dedup_config = config.get("dedup") or {}
         
         # 处理自定义URLs参数
         if custom_urls:
@@ -152,202 +252,610 @@ class SSRFetcher:
 
         print(f"尝试使用URL列表: {urls}")
         
-        all_nodes_with_source = []
+        nodes_by_source = self.fetch_nodes_by_source(urls, user_agent, timeout, deadline)
+        
+        return self.merge_nodes_by_source(nodes_by_source, urls)
+    
+    def fetch_nodes_by_source(self, urls, user_agent=None, timeout=None, deadline=None):
+        """
+        并发获取多个URL的节点，按来源返回
+        
+        Args:
+            urls (list): URL列表
+            user_agent (str): User-Agent字符串
+            timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic），到达后取消未完成的来源，
+                                        未完成的来源记录在last_cutoff_sources中
+            
+        启用来源缓存时，失败、被跳过、被截止或超过serve_stale_after秒仍未完成的来源使用缓存节点，
+        这些来源记录在last_stale_sources中；慢来源的获取在后台继续，完成后更新缓存
+        
+        启用浏览器预热且有来源需要Playwright回退时，在提交HTTP请求前于后台启动浏览器，
+        预热的浏览器记录在last_warm_browser中
+        
+        配置了镜像的来源使用对冲请求，发出对冲请求的来源记录在last_hedged_sources中，
+        使用镜像结果的来源记录在last_mirror_sources中
+        
+        Returns:
+            dict: 来源URL到节点列表的映射，请求失败或被截止（且没有可用缓存）的URL不包含在结果中
+        """
+        nodes_by_source = {}
+        self.last_nodes_by_source = nodes_by_source
+        self.last_skipped_sources = []
+        self.last_cutoff_sources = []
+        self.last_stale_sources = []
+        self.last_strategies = {}
+        self.last_fetched_at = {}
+        self.last_warm_browser = None
+        self.last_hedged_sources = []
+        self.last_mirror_sources = {}
         max_workers = 5  # 最大并发数
+        breaker = self.circuit_breaker
+        cache = self.source_cache
+        
+        # 跳过已熔断的来源
+        if breaker:
+            allowed_urls = []
+            for url in urls:
+                if breaker.allow(url):
+                    allowed_urls.append(url)
+                else:
+                    self.last_skipped_sources.append(url)
+                    print(f"URL {url} 已熔断，{breaker.retry_in(url) / 60:.0f} 分钟后再尝试，本次跳过")
+            urls = allowed_urls
+        
+        # 需要Playwright回退的来源先在后台启动浏览器，与HTTP获取并行
+        prewarmer = self.browser_prewarmer
+        if prewarmer:
+            prewarm_sources = prewarmer.sources_to_prewarm(urls)
+            if prewarm_sources:
+                print(f"{len(prewarm_sources)} 个来源可能需要浏览器渲染，后台预热浏览器")
+                self.last_warm_browser = prewarmer.launch()
         
         # 使用线程池并发获取所有URL
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_url = {
-                executor.submit(self._fetch_and_parse_nodes, url, user_agent, timeout): url
-                for url in urls
-            }
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # 提交所有任务
+        future_to_url = {
+            executor.submit(self._fetch_source, url, user_agent, timeout, deadline): url
+            for url in urls
+        }
+        
+        # 超过该时间仍未完成的来源先使用缓存节点
+        stale_deadline = None
+        if cache and cache.serve_stale_after:
+            stale_deadline = time.monotonic() + cache.serve_stale_after
+        
+        pending = set(future_to_url)
+        try:
+            while pending:
+                # 等待任务完成，直到下一个时间点（使用缓存或截止时间）
+                now = time.monotonic()
+                checkpoints = [t for t in (stale_deadline, deadline) if t is not None]
+                wait_timeout = max(min(checkpoints) - now, 0) if checkpoints else None
+                done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                
+                # 处理完成的任务
+                for future in done:
+                    self._collect_fetch_result(future_to_url[future], future, nodes_by_source)
+                
+                now = time.monotonic()
+                if stale_deadline is not None and now >= stale_deadline:
+                    stale_deadline = None
+                    for future in list(pending):
+                        url = future_to_url[future]
+                        if self._serve_stale(url, nodes_by_source, "响应过慢"):
+                            # 不再等待该来源，获取完成后在后台更新缓存
+                            pending.discard(future)
+                            future.add_done_callback(
+                                lambda f, url=url: self._collect_fetch_result(url, f, None)
+                            )
+                
+                if deadline is not None and now >= deadline and pending:
+                    self.last_cutoff_sources = [future_to_url[future] for future in pending]
+                    print(f"已到达截止时间，{len(pending)} 个来源未完成: {self.last_cutoff_sources}")
+                    for url in self.last_cutoff_sources:
+                        self._serve_stale(url, nodes_by_source, "未在截止时间前完成")
+                    break
+        finally:
+            # 取消尚未开始的任务；正在执行的任务受截止时间约束，会尽快结束
+            executor.shutdown(wait=False, cancel_futures=True)
+            # 仍在后台运行的来源可继续使用预热的浏览器，之后的回退启动新浏览器
+            if self.last_warm_browser:
+                self.last_warm_browser.close_when_idle()
+        
+        for url in self.last_skipped_sources:
+            self._serve_stale(url, nodes_by_source, "已熔断")
+        
+        if breaker:
+            try:
+                breaker.save()
+            except OSError as e:
+                print(f"保存熔断状态失败: {str(e)}")
+        if cache:
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"保存来源缓存失败: {str(e)}")
+        if prewarmer:
+            try:
+                prewarmer.save()
+            except OSError as e:
+                print(f"保存浏览器使用记录失败: {str(e)}")
+        if self.hedge_policy:
+            try:
+                self.hedge_policy.save()
+            except OSError as e:
+                print(f"保存来源耗时记录失败: {str(e)}")
+        
+        return nodes_by_source
+    
+    def _collect_fetch_result(self, url, future, nodes_by_source):
+        """
+        记录单个来源的获取结果，并更新熔断器和来源缓存
+        
+        Args:
+            url (str): 来源URL
+            future (Future): 已完成的获取任务
+            nodes_by_source (dict): 来源URL到节点列表的映射；为None时表示后台刷新，只更新并保存缓存
+        """
+        if future.cancelled():
+            return
+        nodes = []
+        error = None
+        try:
+            nodes = future.result()
+            print(f"URL {url} 成功获取到 {len(nodes)} 个节点")
+        except Exception as e:
+            error = e
+            print(f"URL {url} 请求失败: {str(e)}")
+        
+        # 只有连接错误、超时和HTTP错误计为熔断失败，来源正常响应但没有节点时不熔断
+        if self.circuit_breaker:
+            if error is None:
+                self.circuit_breaker.record_success(url)
+            elif CircuitBreaker.is_failure(error):
+                self.circuit_breaker.record_failure(url)
+        if self.source_cache and nodes:
+            self.source_cache.put(url, nodes)
+        
+        if nodes_by_source is None:
+            # 后台刷新：当前运行已使用缓存节点，新结果留给下次使用
+            try:
+                if self.circuit_breaker:
+                    self.circuit_breaker.save()
+                if self.source_cache:
+                    self.source_cache.save()
+                    print(f"URL {url} 的缓存已在后台刷新")
+            except OSError as e:
+                print(f"保存来源 {url} 的后台刷新结果失败: {str(e)}")
+        elif nodes:
+            nodes_by_source[url] = nodes
+            self.last_fetched_at[url] = time.time()
+        else:
+            self._serve_stale(url, nodes_by_source, "获取失败")
+    
+    def _serve_stale(self, url, nodes_by_source, reason):
+        """
+        使用来源的缓存节点
+        
+        Args:
+            url (str): 来源URL
+            nodes_by_source (dict): 来源URL到节点列表的映射
+            reason (str): 使用缓存的原因
             
-            # 处理完成的任务
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    nodes = future.result()
-                    print(f"URL {url} 成功获取到 {len(nodes)} 个节点")
-                    # 添加来源信息，每个节点作为元组 (node_url, source_url)
-                    for node in nodes:
-                        all_nodes_with_source.append((node, url))
-                except Exception as e:
-                    print(f"URL {url} 请求失败: {str(e)}")
+        Returns:
+            bool: 是否有可用的缓存节点
+        """
+        if not self.source_cache:
+            return False
+        nodes, age = self.source_cache.get(url)
+        if nodes is None:
+            return False
+        print(f"URL {url} {reason}，使用 {age / 3600:.1f} 小时前缓存的 {len(nodes)} 个节点")
+        nodes_by_source[url] = nodes
+        self.last_stale_sources.append(url)
+        self.last_strategies[url] = "stale_cache"
+        self.last_fetched_at[url] = time.time() - age
+        return True
+    
+    def merge_nodes_by_source(self, nodes_by_source, urls=None):
+        """
+        合并各来源的节点并去重，保留每个唯一节点及其第一个来源
         
-        if not all_nodes_with_source:
-            raise Exception("所有URL都未能获取到节点")
+        Args:
+            nodes_by_source (dict): 来源URL到节点列表的映射
+            urls (list, optional): 来源顺序，默认使用映射的顺序
+            
+        Returns:
+            list: 代理节点列表，每个节点是一个元组 (node_url, source_url)，所有来源都没有节点时为空列表
+        """
+        if urls is None:
+            urls = list(nodes_by_source.keys())
         
-        # 去重，保留每个唯一节点及其第一个来源
         unique_nodes_with_source = []
-        seen_nodes = set()
-        for node, source_url in all_nodes_with_source:
-            if node not in seen_nodes:
-                seen_nodes.add(node)
-                unique_nodes_with_source.append((node, source_url))
+        total_count = sum(len(nodes_by_source.get(url, [])) for url in urls)
+        with create_deduplicator(self.dedup_config, total_count) as deduplicator:
+            for url in urls:
+                for node in nodes_by_source.get(url, []):
+                    if deduplicator.add(node):
+                        unique_nodes_with_source.append((node, url))
         
-        print(f"总共获取到 {len(all_nodes_with_source)} 个节点，去重后剩余 {len(unique_nodes_with_source)} 个节点")
+        if not total_count:
+            print("所有URL都未能获取到节点")
+            return []
+        
+        print(f"总共获取到 {total_count} 个节点，去重后剩余 {len(unique_nodes_with_source)} 个节点")
         
         return unique_nodes_with_source
     
-    def _fetch_and_parse_nodes(self, url, user_agent=None, timeout=None):
+    def _fetch_source(self, url, user_agent=None, timeout=None, deadline=None):
+        """
+        获取一个来源的节点：配置了镜像时使用对冲请求，并记录成功获取的耗时
+        
+        Args:
+            url (str): 来源URL
+            user_agent (str): User-Agent字符串
+            timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic）
+            
+        Returns:
+            list: 提取的节点列表
+        """
+        hedge = self.hedge_policy
+        mirrors = hedge.mirrors_for(url) if hedge else []
+        if mirrors:
+            return self._fetch_hedged(url, mirrors, user_agent, timeout, deadline)
+        return self._fetch_timed(url, user_agent, timeout, deadline)
+    
+    def _fetch_timed(self, url, user_agent=None, timeout=None, deadline=None):
+        started_at = time.monotonic()
+        nodes = self._fetch_and_parse_nodes(url, user_agent, timeout, deadline)
+        if nodes and self.hedge_policy:
+            self.hedge_policy.record_latency(url, time.monotonic() - started_at)
+        return nodes
+    
+    def _fetch_hedged(self, url, mirrors, user_agent=None, timeout=None, deadline=None):
+        """
+        对冲请求：先请求来源，超过对冲延迟仍未完成或请求失败时依次请求镜像，
+        使用最先获取到节点的结果，其余请求在读取响应体或重试前取消
+        
+        Args:
+            url (str): 来源URL
+            mirrors (list): 镜像URL列表（按优先顺序）
+            user_agent (str): User-Agent字符串
+            timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic）
+            
+        Returns:
+            list: 最先获取到的节点列表，全部失败时抛出最后一个异常或返回空列表
+        """
+        breaker = self.circuit_breaker
+        candidates = [url] + [mirror for mirror in mirrors if not breaker or breaker.allow(mirror)]
+        delay = self.hedge_policy.hedge_delay(url)
+        self.last_mirror_sources.pop(url, None)
+        cancel_event = threading.Event()
+        results = queue.Queue()
+        
+        def attempt(candidate):
+            self._local.cancel_event = cancel_event
+            try:
+                results.put((candidate, self._fetch_timed(candidate, user_agent, timeout, deadline), None))
+            except Exception as e:
+                results.put((candidate, None, e))
+        
+        def launch(candidate):
+            threading.Thread(target=attempt, args=(candidate,), name=f"hedge-{candidate}", daemon=True).start()
+        
+        launch(candidates[0])
+        started, running = 1, 1
+        hedged = False
+        last_error = None
+        try:
+            while running:
+                # 还有镜像可用时最多等待对冲延迟，截止时间后不再发出新的请求
+                wait_timeout = None
+                if started < len(candidates) and (deadline is None or time.monotonic() < deadline):
+                    wait_timeout = delay
+                try:
+                    candidate, nodes, error = results.get(timeout=wait_timeout)
+                except queue.Empty:
+                    if not hedged:
+                        hedged = True
+                        self.last_hedged_sources.append(url)
+                    print(f"URL {url} 超过 {delay:.1f} 秒未完成，向镜像 {candidates[started]} 发出对冲请求")
+                    launch(candidates[started])
+                    started += 1
+                    running += 1
+                    continue
+                running -= 1
+                if nodes:
+                    if candidate != url:
+                        print(f"URL {url} 使用镜像 {candidate} 的结果")
+                        self.last_mirror_sources[url] = candidate
+                        self.last_strategies[url] = self.last_strategies.get(candidate)
+                    return nodes
+                last_error = error or last_error
+                if started < len(candidates) and (deadline is None or time.monotonic() < deadline):
+                    print(f"{candidate} 未获取到节点，立即请求镜像 {candidates[started]}")
+                    launch(candidates[started])
+                    started += 1
+                    running += 1
+        finally:
+            # 取消其余请求：未完成的请求在读取下一块响应体或重试前结束
+            cancel_event.set()
+        if last_error:
+            raise last_error
+        return []
+    
+    def _check_cancelled(self):
+        """
+        对冲请求中已有其他镜像返回结果时抛出FetchCancelled
+        """
+        cancel_event = getattr(self._local, "cancel_event", None)
+        if cancel_event is not None and cancel_event.is_set():
+            raise FetchCancelled("已有其他镜像返回结果，取消本次获取")
+    
+    def _fetch_and_parse_nodes(self, url, user_agent=None, timeout=None, deadline=None):
         """
         从指定URL获取并解析节点
         
+        先使用来源适配器直接获取原始内容（Markdown、纯文本或API），适配器失败或未提取到节点时
+        回退到通用适配器（下载并解析页面HTML，必要时使用Playwright渲染）
+        
         Args:
             url (str): 要获取的URL
             user_agent (str): User-Agent字符串
             timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic），请求超时和重试等待不会超过该时间
             
         Returns:
             list: 提取的节点列表
         """
-        import json
-        import html
-        import time
-        
-        max_retries = 3  # 最大重试次数
-        retry_delay = 5  # 初始重试延迟（秒）
+        max_retries = self.retry_policy.max_attempts  # 最大尝试次数
+        adapters = adapters_for_url(url, self.adapter_overrides) if self.adapters_enabled else [GenericAdapter()]
         
         for retry in range(max_retries):
             try:
+                self._check_cancelled()
                 print(f"尝试获取URL内容，第{retry+1}/{max_retries}次尝试")
+                self.last_strategies.pop(url, None)
                 
-                # 获取页面HTML
-                raw_html = self._get_html_from_http(url, user_agent, timeout)
-                
-                # 检查是否获取到了有效的HTML
-                if not raw_html or raw_html.strip() == "":
-                    raise ValueError("获取到的HTML内容为空")
-                
-                ssr_nodes = []
-                proxy_protocols = ['ssr://', 'vmess://', 'vless://', 'ss://', 'hysteria2://', 'trojan://']
-                
-                # 先尝试直接检测并处理base64编码的内容
-                try:
-                    # 检查是否为base64编码：只包含base64字符，且长度是4的倍数
-                    # 移除可能的URL安全字符和空白字符，检查原始HTML内容
-                    base64_candidate = raw_html.strip()
-                    # 移除所有空白字符（包括换行符）
-                    base64_candidate = re.sub(r'\s+', '', base64_candidate)
-                    # 替换URL安全的base64字符
-                    base64_candidate = base64_candidate.replace('-', '+').replace('_', '/')
-                    # 检查是否只包含base64字符
-                    if re.match(r'^[A-Za-z0-9+/]+={0,2}$', base64_candidate) and len(base64_candidate) % 4 == 0:
-                        print("检测到可能的base64编码内容，尝试解码...")
-                        # 添加必要的填充
-                        padding = '=' * ((4 - len(base64_candidate) % 4) % 4)
-                        base64_candidate += padding
-                        # 解码base64
-                        decoded_content = base64.b64decode(base64_candidate).decode('utf-8')
-                        print(f"base64解码成功，内容长度: {len(decoded_content)} 字符")
-                        print(f"解码后的内容前100字符: {decoded_content[:100]}...")
-                        # 从解码后的内容中提取VPN链接
-                        self._extract_ssr_nodes_from_text(decoded_content, ssr_nodes)
-                        
-                        # 如果成功提取到节点，直接返回
-                        if ssr_nodes:
-                            unique_nodes = list(set(ssr_nodes))
-                            print(f"从base64内容中提取到 {len(unique_nodes)} 个节点")
+                # 专用适配器失败后不再重试，直接回退到下一个适配器
+                while len(adapters) > 1:
+                    adapter = adapters[0]
+                    try:
+                        unique_nodes = adapter.fetch_nodes(self, url, user_agent, timeout, deadline)
+                        if unique_nodes:
+                            print(f"适配器 {adapter.name} 获取到 {len(unique_nodes)} 个节点")
+                            self.last_strategies[url] = adapter.name
                             return unique_nodes
-                except Exception as e:
-                    print(f"base64解码失败，继续使用原始HTML内容: {str(e)}")
-                    # 解码失败，继续使用原始HTML内容
-                    pass
-                
-                # 原始内容不是base64编码，继续使用BeautifulSoup解析
-                html_content = raw_html
-                soup = BeautifulSoup(html_content, 'lxml')
-                raw_text = soup.get_text()
-                clean_text = " ".join(raw_text.split())
-                
-                print(f"开始解析URL {url} 的HTML内容")
-                # 检查解析后的内容是否包含代理节点
-                if any(proxy_type in html_content for proxy_type in proxy_protocols):
-                    print("HTML内容中检测到代理节点")
-                else:
-                    print(f"URL {html_content[:100]}... 的HTML内容中未检测到直接的代理节点")
-                    print(f"HTML内容长度: {len(soup.get_text())} 字符")
-                    print(f"HTML内容: {clean_text[:100]}... 字符")
-
-                    print("HTML内容中未直接检测到代理节点")
-                    html_content = self._get_html_from_browser(url, user_agent, timeout)
-                    # 重新创建soup对象
-                    soup = BeautifulSoup(html_content, 'lxml')
-                
-                # 特殊处理GitLab Wiki页面的data-page-info属性
-                if 'gitlab.com' in url:
-                    print("检测到GitLab URL，尝试解析data-page-info属性...")
-                    div_with_data = soup.find('div', {'data-page-info': True})
-                    if div_with_data:
-                        page_info = div_with_data['data-page-info']
-                        
-                        # 尝试解析JSON获取wiki内容
-                        try:
-                            # 解码HTML实体
-                            decoded_page_info = html.unescape(page_info)
-                            json_data = json.loads(decoded_page_info)
-                            
-                            if 'content' in json_data:
-                                wiki_content = json_data['content']
-                                print(f"从GitLab data-page-info提取到Wiki内容，长度: {len(wiki_content)} 字符")
-                                self._extract_ssr_nodes_from_text(wiki_content, ssr_nodes)
-                        except Exception as e:
-                            print(f"解析GitLab data-page-info失败: {str(e)}")
-                
-                # 1. 查找所有代码块
-                code_blocks = soup.find_all(['pre', 'code'])
-                print(f"找到 {len(code_blocks)} 个代码块")
-                for block in code_blocks:
-                    code_text = block.get_text()
-                    self._extract_ssr_nodes_from_text(code_text, ssr_nodes)
-                
-                # 2. 查找所有链接
-                links = soup.find_all('a')
-                for link in links:
-                    href = link.get('href')
-                    if href and any(href.startswith(proxy_type) for proxy_type in proxy_protocols):
-                        ssr_nodes.append(href)
-                
-                # 3. 查找所有段落文本
-                paragraphs = soup.find_all('p')
-                for p in paragraphs:
-                    text = p.get_text()
-                    self._extract_ssr_nodes_from_text(text, ssr_nodes)
-                
-                # 4. 查找所有列表项
-                list_items = soup.find_all('li')
-                for li in list_items:
-                    text = li.get_text()
-                    self._extract_ssr_nodes_from_text(text, ssr_nodes)
-                
-                # 5. 直接从整个页面文本中搜索
-                self._extract_ssr_nodes_from_text(soup.get_text(), ssr_nodes)
+                        print(f"适配器 {adapter.name} 未提取到节点，回退到 {adapters[1].name}")
+                    except FetchCancelled:
+                        raise
+                    except Exception as e:
+                        print(f"适配器 {adapter.name} 获取失败，回退到 {adapters[1].name}: {str(e)}")
+                    adapters.pop(0)
                 
-                # 去重
-                unique_nodes = list(set(ssr_nodes))
+                unique_nodes = adapters[0].fetch_nodes(self, url, user_agent, timeout, deadline)
                 
                 if unique_nodes:
                     print(f"第{retry+1}次尝试成功，获取到 {len(unique_nodes)} 个节点")
+                    # 通用适配器使用Playwright渲染时已记录为browser
+                    self.last_strategies.setdefault(url, adapters[0].name)
                     return unique_nodes
                 else:
                     print(f"第{retry+1}次尝试未获取到任何节点，准备重试...")
                     
+            except FetchCancelled:
+                raise
             except Exception as e:
                 print(f"第{retry+1}次尝试失败: {str(e)}")
                 
-                # 如果不是最后一次重试，等待后继续
-                if retry < max_retries - 1:
-                    wait_time = retry_delay * (2 ** retry)  # 指数退避
-                    print(f"等待 {wait_time} 秒后进行第{retry+2}次尝试")
-                    time.sleep(wait_time)
-                else:
-                    print(f"已达到最大重试次数 {max_retries}，放弃获取")
+                # 按重试策略决定是否重试（404等错误不重试，遵循Retry-After）
+                wait_time = self.retry_policy.next_delay(retry, e)
+                if wait_time is None:
+                    if retry < max_retries - 1:
+                        print("该错误不值得重试，放弃获取")
+                    else:
+                        print(f"已达到最大重试次数 {max_retries}，放弃获取")
                     raise
+                if deadline is not None and time.monotonic() + wait_time >= deadline:
+                    print("重试等待将超过截止时间，放弃获取")
+                    raise
+                print(f"等待 {wait_time:.1f} 秒后进行第{retry+2}次尝试")
+                # 对冲请求被取消时不再等待
+                cancel_event = getattr(self._local, "cancel_event", None)
+                if cancel_event is not None:
+                    cancel_event.wait(wait_time)
+                else:
+                    time.sleep(wait_time)
         
         # 如果所有重试都失败，返回空列表
         return []
     
+    def _fetch_html_nodes(self, url, user_agent=None, timeout=None, deadline=None):
+        """
+        通用适配器：下载页面HTML并提取节点，页面中没有节点时使用Playwright渲染
+        
+        Args:
+            url (str): 要获取的URL
+            user_agent (str): User-Agent字符串
+            timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic）
+            
+        Returns:
+            list: 去重后的节点列表
+        """
+        # 获取页面HTML（本次尝试的超时时间不超过剩余时间）
+        raw_html = self._get_html_from_http(url, user_agent, self._bounded_timeout(timeout, deadline))
+        
+        # 检查是否获取到了有效的HTML
+        if not raw_html or raw_html.strip() == "":
+            raise ValueError("获取到的HTML内容为空")
+        
+        # 先尝试直接检测并处理base64编码的内容
+        decoded_content = self._decode_base64_content(raw_html)
+        if decoded_content is not None:
+            ssr_nodes = []
+            # 从解码后的内容中提取VPN链接
+            self._extract_ssr_nodes_from_text(decoded_content, ssr_nodes)
+            
+            # 如果成功提取到节点，直接返回
+            if ssr_nodes:
+                unique_nodes = self._unique_nodes(ssr_nodes)
+                print(f"从base64内容中提取到 {len(unique_nodes)} 个节点")
+                return unique_nodes
+        
+        # 原始内容不是base64编码，继续解析HTML
+        html_content = raw_html
+        
+        print(f"开始解析URL {url} 的HTML内容")
+        # 检查解析后的内容是否包含代理节点
+        if any(proxy_type in html_content for proxy_type in PROXY_PROTOCOLS):
+            print("HTML内容中检测到代理节点")
+        else:
+            raw_text = BeautifulSoup(html_content, 'lxml').get_text()
+            clean_text = " ".join(raw_text.split())
+            print(f"URL {html_content[:100]}... 的HTML内容中未检测到直接的代理节点")
+            print(f"HTML内容长度: {len(raw_text)} 字符")
+            print(f"HTML内容: {clean_text[:100]}... 字符")
+
+            print("HTML内容中未直接检测到代理节点")
+            self.last_strategies[url] = "browser"
+            if self.browser_prewarmer:
+                self.browser_prewarmer.record_browser_source(url)
+            self._check_cancelled()
+            html_content = self._get_html_from_browser(url, user_agent, self._bounded_timeout(timeout, deadline))
+        
+        return self._parse_html_nodes(html_content)
+    
+    def _decode_base64_content(self, raw_content):
+        """
+        检测并解码整体为base64编码的内容（订阅格式）
+        
+        Args:
+            raw_content (str): 原始内容
+            
+        Returns:
+            str: 解码后的内容；不是base64编码或解码失败时返回None
+        """
+        try:
+            # 检查是否为base64编码：移除所有空白字符（包括换行符）后只包含base64字符（含URL安全字符），
+            # 缺少的填充由解码器补齐
+            base64_candidate = re.sub(r'\s+', '', raw_content)
+            if re.match(r'^[A-Za-z0-9+/_-]+={0,2}$', base64_candidate) and len(base64_candidate) % 4 != 1:
+                print("检测到可能的base64编码内容，尝试解码...")
+                decoded_content = decode_base64(base64_candidate)
+                print(f"base64解码成功，内容长度: {len(decoded_content)} 字符")
+                print(f"解码后的内容前100字符: {decoded_content[:100]}...")
+                return decoded_content
+        except Exception as e:
+            print(f"base64解码失败，继续使用原始内容: {str(e)}")
+        return None
+    
+    def _parse_html_nodes(self, html_content):
+        """
+        使用BeautifulSoup从HTML中提取节点
+        
+        Args:
+            html_content (str): 页面HTML
+            
+        Returns:
+            list: 去重后的节点列表
+        """
+        import json
+        import html
+        
+        ssr_nodes = []
+        soup = BeautifulSoup(html_content, 'lxml')
+        
+        # 特殊处理GitLab Wiki页面的data-page-info属性（Wiki内容以JSON形式嵌入页面）
+        div_with_data = soup.find('div', {'data-page-info': True})
+        if div_with_data:
+            print("检测到data-page-info属性，尝试解析Wiki内容...")
+            page_info = div_with_data['data-page-info']
+            
+            # 尝试解析JSON获取wiki内容
+            try:
+                # 解码HTML实体
+                decoded_page_info = html.unescape(page_info)
+                json_data = json.loads(decoded_page_info)
+                
+                if 'content' in json_data:
+                    wiki_content = json_data['content']
+                    print(f"从data-page-info提取到Wiki内容，长度: {len(wiki_content)} 字符")
+                    self._extract_ssr_nodes_from_text(wiki_content, ssr_nodes)
+            except Exception as e:
+                print(f"解析data-page-info失败: {str(e)}")
+        
+        # 1. 查找所有代码块
+        code_blocks = soup.find_all(['pre', 'code'])
+        print(f"找到 {len(code_blocks)} 个代码块")
+        for block in code_blocks:
+            code_text = block.get_text()
+            self._extract_ssr_nodes_from_text(code_text, ssr_nodes)
+        
+        # 2. 查找所有链接
+        links = soup.find_all('a')
+        for link in links:
+            href = link.get('href')
+            if href and any(href.startswith(proxy_type) for proxy_type in PROXY_PROTOCOLS):
+                ssr_nodes.append(href)
+        
+        # 3. 查找所有段落文本
+        paragraphs = soup.find_all('p')
+        for p in paragraphs:
+            text = p.get_text()
+            self._extract_ssr_nodes_from_text(text, ssr_nodes)
+        
+        # 4. 查找所有列表项
+        list_items = soup.find_all('li')
+        for li in list_items:
+            text = li.get_text()
+            self._extract_ssr_nodes_from_text(text, ssr_nodes)
+        
+        # 5. 直接从整个页面文本中搜索
+        self._extract_ssr_nodes_from_text(soup.get_text(), ssr_nodes)
+        
+        # 去重
+        return self._unique_nodes(ssr_nodes)
+    
+    def _bounded_timeout(self, timeout, deadline):
+        """
+        将请求超时时间限制在截止时间之前
+        
+        Args:
+            timeout (int): 配置的超时时间（秒）
+            deadline (float): 截止时间（time.monotonic），None表示不限制
+            
+        Returns:
+            float: 本次请求的超时时间（秒）
+        """
+        timeout = timeout or 30
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("已超过运行截止时间")
+        return min(timeout, remaining)
+    
+    def _unique_nodes(self, ssr_nodes):
+        """
+        按首次出现的顺序去重，并限制每个来源的节点数
+        
+        Args:
+            ssr_nodes (list): 提取的节点列表
+            
+        Returns:
+            list: 去重后的节点列表
+        """
+        with create_deduplicator(self.dedup_config, len(ssr_nodes)) as deduplicator:
+            unique_nodes = [node for node in ssr_nodes if deduplicator.add(node)]
+        if self.max_nodes_per_source and len(unique_nodes) > self.max_nodes_per_source:
+            print(f"节点数 {len(unique_nodes)} 超过每个来源的上限 {self.max_nodes_per_source}，只保留前 {self.max_nodes_per_source} 个")
+            unique_nodes = unique_nodes[:self.max_nodes_per_source]
+        return unique_nodes
+    
     def _get_html_from_http(self, url, user_agent=None, timeout=None):
         # 默认值
         default_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -358,12 +866,64 @@ class SSRFetcher:
             'User-Agent': user_agent or default_user_agent
         }
         
-        response = requests.get(url, headers=headers, timeout=timeout or default_timeout)
-        response.raise_for_status()  # 检查请求是否成功
-        if response.status_code == 200:
-            return response.text
+        # 流式读取响应体，超过大小上限或已扫描到足够的节点时停止读取
+        with self.session.get(url, headers=headers, timeout=timeout or default_timeout, stream=True) as response:
+            response.raise_for_status()  # 检查请求是否成功
+            if response.status_code == 200:
+                return self._read_body_streaming(response)
+            else:
+                raise Exception(f"HTTP请求失败，状态码: {response.status_code}")
+    
+    def _read_body_streaming(self, response, chunk_size=64 * 1024):
+        """
+        分块读取响应体，同时扫描已读取的完整行中的节点
+        
+        读取的字节数超过max_body_size，或扫描到的节点数达到max_nodes_per_source时提前停止，
+        返回已读取的内容（HTML解析器可以处理被截断的页面）；对冲请求被取消时抛出FetchCancelled。
+        没有换行的分块只暂存，读到换行时才拼接并扫描一次，单行的大响应体（如base64订阅）不会被反复拼接
+        
+        Args:
+            response (requests.Response): 以stream=True发送的请求的响应
+            chunk_size (int): 每次读取的字节数
+            
+        Returns:
+            str: 响应体文本
+        """
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        parts = []
+        scanned_nodes = set()
+        # 上一个换行之后尚未扫描的文本分块
+        pending_parts = []
+        total_bytes = 0
+        
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            self._check_cancelled()
+            total_bytes += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            
+            if self.max_body_size and total_bytes >= self.max_body_size:
+                print(f"响应体超过大小上限 {self.max_body_size} 字节，停止读取")
+                break
+            
+            if self.max_nodes_per_source:
+                # 只扫描完整的行，最后一行可能被分块截断，留到下一块
+                newline = text.rfind('\n')
+                if newline < 0:
+                    pending_parts.append(text)
+                    continue
+                complete = ''.join(pending_parts) + text[:newline]
+                pending_parts = [text[newline + 1:]]
+                found = []
+                self._extract_ssr_nodes_from_text(complete, found)
+                scanned_nodes.update(found)
+                if len(scanned_nodes) >= self.max_nodes_per_source:
+                    print(f"已扫描到 {self.max_nodes_per_source} 个节点，停止读取（已读取 {total_bytes} 字节）")
+                    break
         else:
-            raise Exception(f"HTTP请求失败，状态码: {response.status_code}")
+            parts.append(decoder.decode(b'', final=True))
+        
+        return ''.join(parts)
 
     def _get_html_from_browser(self, url, user_agent=None, timeout=None):
         # 默认值
@@ -371,18 +931,26 @@ class SSRFetcher:
         default_timeout = 30  # 减少默认超时时间
         
         html_content = None
-        captured_requests = []
-        captured_responses = []
+        policy = self.capture_policy
+        # 请求/响应日志只保留最近log_size条，用于未找到节点时排查
+        capture_log = deque(maxlen=policy.log_size) if policy.log_size else None
+        # 候选响应只保存引用，响应体在页面稳定后再读取
+        candidate_responses = deque(maxlen=policy.max_candidates)
         api_responses_with_proxies = []
         
+        warm_browser = self.last_warm_browser
         with sync_playwright() as p:
             browser = None
             context = None
             page = None
+            warm = False
             
             try:
-                # 启动浏览器（无头模式）
-                browser = p.chromium.launch(headless=True)
+                # 优先连接预热的浏览器，否则启动浏览器（无头模式）
+                acquire_started = time.perf_counter()
+                browser, warm = self._acquire_browser(p, warm_browser)
+                if warm_browser:
+                    warm_browser.record_use(time.perf_counter() - acquire_started, warm)
                 context = browser.new_context(
                     user_agent=user_agent or default_user_agent,
                     viewport={'width': 1920, 'height': 1080}
@@ -392,43 +960,16 @@ class SSRFetcher:
                 # 设置超时
                 page.set_default_timeout((timeout or default_timeout) * 1000)
                 
-                # 捕获所有网络请求和响应
-                def capture_request(request):
-                    captured_requests.append({
-                        'url': request.url,
-                        'method': request.method,
-                        'headers': dict(request.headers)
-                    })
-                    print(f"页面请求: {request.method} {request.url}")
-                
+                # 按捕获策略筛选网络响应：回调中只检查响应头，不读取响应体，避免阻塞页面事件处理
                 def capture_response(response):
                     request = response.request
-                    captured_responses.append({
-                        'url': request.url,
-                        'method': request.method,
-                        'status': response.status,
-                        'headers': dict(response.headers)
-                    })
-                    print(f"页面响应: {response.status} {request.url}")
-                    
-                    # 检查响应是否可能包含代理节点数据
-                    content_type = response.headers.get('content-type', '')
-                    if any(subtype in content_type for subtype in ['application/json', 'text/plain', 'text/html']):
-                        try:
-                            # 在同步API中，使用response.text()方法获取内容
-                            response_body = response.text()
-                            
-                            # 检查响应内容是否包含代理节点
-                            if any(proxy_type in response_body for proxy_type in ['ssr://', 'vmess://', 'vless://', 'ss://', 'hysteria2://']):
-                                print(f"响应 {request.url} 中检测到代理节点")
-                                api_responses_with_proxies.append({
-                                    'url': request.url,
-                                    'body': response_body
-                                })
-                        except Exception as e:
-                            print(f"读取响应 {request.url} 内容失败: {str(e)}")
+                    if capture_log is not None:
+                        capture_log.append(f"{response.status} {request.method} {request.url}")
+                    headers = response.headers
+                    if policy.is_candidate(request.url, headers.get('content-type', ''),
+                                           headers.get('content-length'), request.resource_type):
+                        candidate_responses.append(response)
                 
-                page.on('request', capture_request)
                 page.on('response', capture_response)
                 
                 # 导航到URL并等待初始加载完成
@@ -486,6 +1027,17 @@ class SSRFetcher:
                         print(f"页面内容仍在变化，第{_+1}次检查")
                     page.wait_for_timeout(1000)  # 每1秒检查一次
                 
+                # 页面稳定后读取候选响应的响应体，检查是否包含代理节点
+                print(f"共 {len(candidate_responses)} 个候选响应")
+                for response in list(candidate_responses):
+                    response_body = policy.read_body(response, self.session, timeout or default_timeout)
+                    if response_body and any(proxy_type in response_body for proxy_type in PROXY_PROTOCOLS):
+                        print(f"响应 {response.url} 中检测到代理节点")
+                        api_responses_with_proxies.append({
+                            'url': response.url,
+                            'body': response_body
+                        })
+                
                 # 尝试直接执行JavaScript来获取页面中的代理节点
                 proxy_nodes = []
                 try:
@@ -516,9 +1068,9 @@ class SSRFetcher:
                         body = response_data['body']
                         url = response_data['url']
                         
-                        # 提取所有代理节点，使用与_extract_ssr_nodes_from_text相同的正则表达式
-                        import re
-                        matches = re.findall(r'(?:ssr|vmess|vless|ss|hysteria2)://[^\s\n\r]*?(?=(?:ssr|vmess|vless|ss)://|$)', body)
+                        # 提取所有代理节点（逐行匹配，与页面文本的提取方式相同）
+                        matches = []
+                        self._extract_ssr_nodes_from_text(body, matches)
                         
                         if matches:
                             print(f"从响应 {url} 中提取到 {len(matches)} 个代理节点")
@@ -540,6 +1092,10 @@ class SSRFetcher:
                 else:
                     # 继续尝试获取完整HTML
                     print("页面文本中仍然没有找到代理节点")
+                    if capture_log:
+                        print(f"最近 {len(capture_log)} 个页面响应:")
+                        for entry in capture_log:
+                            print(f"  {entry}")
                     
                     # 获取完整的HTML内容
                     html_content = page.content()
@@ -565,16 +1121,41 @@ class SSRFetcher:
                 
                 try:
                     if browser:
+                        # 预热的浏览器只断开连接，进程由预热器结束
                         browser.close()
-                        print("浏览器已关闭")
+                        print("已断开预热的浏览器" if warm else "浏览器已关闭")
                 except Exception as e:
                     print(f"关闭浏览器失败: {str(e)}")
+                if warm:
+                    warm_browser.release()
     
         if not html_content:
             raise ValueError(f"无法获取URL {url} 的内容")
     
         return html_content
     
+    def _acquire_browser(self, p, warm_browser):
+        """
+        获取Playwright回退使用的浏览器：连接预热的浏览器，不可用时启动新浏览器
+        
+        Args:
+            p: sync_playwright实例
+            warm_browser (WarmBrowser): 预热的浏览器，未预热时为None
+            
+        Returns:
+            tuple: (浏览器, 是否为预热的浏览器)
+        """
+        endpoint = warm_browser.acquire() if warm_browser else None
+        if endpoint:
+            try:
+                browser = p.chromium.connect_over_cdp(endpoint)
+                print("已连接预热的浏览器")
+                return browser, True
+            except Exception as e:
+                warm_browser.release()
+                print(f"连接预热的浏览器失败，启动新浏览器: {str(e)}")
+        return p.chromium.launch(headless=True), False
+    
     def _extract_ssr_nodes_from_text(self, text, nodes_array):
         """
         从文本中提取节点
@@ -583,7 +1164,7 @@ class SSRFetcher:
             text (str): 要提取的文本
             nodes_array (list): 存储提取的节点的数组
         """
-        # 正则表达式匹配ssr://、vmess://、vless://、ss://、hysteria2://和trojan://开头的链接
+        # 正则表达式匹配PROXY_PROTOCOLS中各协议开头的链接
         # 对于有换行符分隔的节点，使用换行符作为分隔符
         # 对于没有换行符分隔的节点，使用下一个代理协议开头或字符串结束作为分隔符
         # 先按换行符分割文本，然后对每个部分使用正则表达式匹配
@@ -594,7 +1175,6 @@ class SSRFetcher:
             if not line:
                 continue
             # 正则表达式匹配代理链接，直到遇到下一个代理协议开头或字符串结束
-            ssr_vmess_regex = r'(?:ssr|vmess|vless|ss|hysteria2|trojan)://[^\s]*?(?=(?:ssr|vmess|vless|ss|hysteria2|trojan)://|$)'
-            matches = re.findall(ssr_vmess_regex, line)
+            matches = NODE_LINK_PATTERN.findall(line)
             if matches:
                 nodes_array.extend(matches)
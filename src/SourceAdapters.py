@@ -0,0 +1,196 @@
+import re
+import json
+from urllib.parse import urlparse, quote, unquote
+
+class SourceAdapter:
+    """
+    来源适配器基类：把来源URL映射为原始内容的地址（Markdown、纯文本或API），直接从原始内容中提取节点，
+    不需要下载渲染后的HTML，也不需要DOM解析
+    """
+
+    name = ""
+
+    def matches(self, url):
+        """
+        判断适配器是否适用于该来源URL
+        """
+        return False
+
+    def endpoint(self, url):
+        """
+        返回原始内容的地址
+        """
+        return url
+
+    def fetch_nodes(self, fetcher, url, user_agent=None, timeout=None, deadline=None):
+        """
+        获取原始内容并提取节点
+
+        Args:
+            fetcher (SSRFetcher): 节点获取器，复用其HTTP会话、下载限制和节点提取
+            url (str): 来源URL
+            user_agent (str): User-Agent字符串
+            timeout (int): 请求超时时间（秒）
+            deadline (float, optional): 截止时间（time.monotonic）
+
+        Returns:
+            list: 去重后的节点列表
+        """
+        endpoint = self.endpoint(url)
+        print(f"适配器 {self.name} 获取原始内容: {endpoint}")
+        body = fetcher._get_html_from_http(endpoint, user_agent, fetcher._bounded_timeout(timeout, deadline))
+        return fetcher._unique_nodes(self.extract_nodes(body, fetcher))
+
+    def extract_nodes(self, body, fetcher):
+        """
+        从原始内容中提取节点
+
+        Args:
+            body (str): 原始内容
+            fetcher (SSRFetcher): 节点获取器
+
+        Returns:
+            list: 节点列表（可能包含重复）
+        """
+        nodes = []
+        fetcher._extract_ssr_nodes_from_text(self._strip_markdown(body), nodes)
+        return nodes
+
+    def _strip_markdown(self, text):
+        # 节点提取按行匹配到行尾，Markdown中节点前后常有行内代码标记、HTML标签或其他文字，
+        # 因此按空白和这些符号拆分为单独的行
+        return re.sub(r'[`<>\s]+', '\n', text)
+
+class GitHubWikiAdapter(SourceAdapter):
+    """
+    GitHub Wiki页面：直接获取Wiki仓库中的原始Markdown
+    https://github.com/{owner}/{repo}/wiki/{page} -> https://raw.githubusercontent.com/wiki/{owner}/{repo}/{page}.md
+    """
+
+    name = "github_wiki"
+    pattern = re.compile(r'^https?://github\.com/([^/]+)/([^/]+)/wiki/?([^?#]*)')
+
+    def matches(self, url):
+        return bool(self.pattern.match(url))
+
+    def endpoint(self, url):
+        owner, repo, page = self.pattern.match(url).groups()
+        return f"https://raw.githubusercontent.com/wiki/{owner}/{repo}/{page.strip('/') or 'Home'}.md"
+
+class GitHubBlobAdapter(SourceAdapter):
+    """
+    GitHub仓库中的文件页面：获取文件的原始内容
+    https://github.com/{owner}/{repo}/blob/{ref}/{path} -> https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{path}
+    """
+
+    name = "github_blob"
+    pattern = re.compile(r'^https?://github\.com/([^/]+)/([^/]+)/blob/([^?#]+)')
+
+    def matches(self, url):
+        return bool(self.pattern.match(url))
+
+    def endpoint(self, url):
+        owner, repo, path = self.pattern.match(url).groups()
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{path}"
+
+class GitHubReadmeAdapter(SourceAdapter):
+    """
+    GitHub仓库首页：获取默认分支的README原始内容
+    https://github.com/{owner}/{repo} -> https://raw.githubusercontent.com/{owner}/{repo}/HEAD/README.md
+    """
+
+    name = "github_readme"
+    pattern = re.compile(r'^https?://github\.com/([^/]+)/([^/?#]+)/?(?:[?#].*)?$')
+
+    def matches(self, url):
+        return bool(self.pattern.match(url))
+
+    def endpoint(self, url):
+        owner, repo = self.pattern.match(url).groups()
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/README.md"
+
+class GitLabWikiAdapter(SourceAdapter):
+    """
+    GitLab Wiki页面：通过项目API获取Wiki的原始Markdown
+    https://gitlab.com/{namespace}/{project}/-/wikis/{slug} -> https://gitlab.com/api/v4/projects/{id}/wikis/{slug}
+    """
+
+    name = "gitlab_wiki"
+    pattern = re.compile(r'^(https?://[^/]*gitlab[^/]*)/(.+?)/-/wikis/([^?#]+)')
+
+    def matches(self, url):
+        return bool(self.pattern.match(url))
+
+    def endpoint(self, url):
+        base, project, slug = self.pattern.match(url).groups()
+        return (f"{base}/api/v4/projects/{quote(unquote(project), safe='')}"
+                f"/wikis/{quote(unquote(slug.strip('/')), safe='')}")
+
+    def extract_nodes(self, body, fetcher):
+        content = json.loads(body).get("content", "")
+        print(f"从GitLab API获取到Wiki内容，长度: {len(content)} 字符")
+        return super().extract_nodes(content, fetcher)
+
+class RawTextAdapter(SourceAdapter):
+    """
+    原始文本来源（raw文件、Gist、订阅地址）：不做HTML解析，base64订阅先解码
+    """
+
+    name = "raw"
+    raw_hosts = {"raw.githubusercontent.com", "gist.githubusercontent.com"}
+
+    def matches(self, url):
+        parsed = urlparse(url)
+        return (parsed.netloc in self.raw_hosts or '/-/raw/' in parsed.path
+                or parsed.path.endswith(('.txt', '.md')))
+
+    def extract_nodes(self, body, fetcher):
+        decoded = fetcher._decode_base64_content(body)
+        return super().extract_nodes(decoded if decoded is not None else body, fetcher)
+
+class GenericAdapter(SourceAdapter):
+    """
+    通用适配器：下载页面HTML并解析（必要时使用Playwright渲染），适用于所有来源，作为其他适配器的回退
+    """
+
+    name = "generic"
+
+    def matches(self, url):
+        return True
+
+    def fetch_nodes(self, fetcher, url, user_agent=None, timeout=None, deadline=None):
+        return fetcher._fetch_html_nodes(url, user_agent, timeout, deadline)
+
+# 按顺序匹配，第一个匹配的适配器优先使用，失败时回退到通用适配器
+SOURCE_ADAPTERS = [
+    GitHubWikiAdapter(),
+    GitHubBlobAdapter(),
+    GitHubReadmeAdapter(),
+    GitLabWikiAdapter(),
+    RawTextAdapter(),
+]
+
+def adapters_for_url(url, overrides=None):
+    """
+    选择来源使用的适配器
+
+    Args:
+        url (str): 来源URL
+        overrides (dict, optional): 来源URL到适配器名称的映射，用于为个别来源指定适配器
+
+    Returns:
+        list: 依次尝试的适配器列表，最后一个总是通用适配器
+    """
+    generic = GenericAdapter()
+    name = (overrides or {}).get(url)
+    if name:
+        if name == generic.name:
+            return [generic]
+        for adapter in SOURCE_ADAPTERS:
+            if adapter.name == name:
+                return [adapter, generic]
+        print(f"未知的来源适配器 {name}，使用自动选择")
+    for adapter in SOURCE_ADAPTERS:
+        if adapter.matches(url):
+            return [adapter, generic]
+    return [generic]
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+
+class SourceCache:
+    """
+    各来源最近一次成功获取的节点缓存（stale-while-revalidate）
+
+    来源获取失败、被熔断跳过或被截止时，使用不超过max_stale秒的缓存节点，
+    保证输出中的节点和来源分组保持稳定；缓存在下次运行时刷新。
+    serve_stale_after大于0时，超过该时间仍未完成的来源也先使用缓存节点，获取在后台继续；
+    默认关闭，慢但正常的来源等到请求超时为止，不会被旧节点替换。
+    """
+
+    def __init__(self, cache_file, max_stale=259200, serve_stale_after=0):
+        self.cache_file = cache_file
+        self.max_stale = max_stale
+        self.serve_stale_after = serve_stale_after
+        self._lock = threading.Lock()
+        self._entries = {}
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取来源缓存失败，重新开始缓存: {str(e)}")
+
+    @classmethod
+    def from_config(cls, cache_config):
+        """
+        根据ssr_source.stale_cache配置创建来源缓存
+
+        Args:
+            cache_config (dict): ssr_source.stale_cache配置
+
+        Returns:
+            SourceCache: 来源缓存
+        """
+        return cls(
+            cache_config.get("cache_file", "./cache/sources.json"),
+            max_stale=cache_config.get("max_stale", 259200),
+            serve_stale_after=cache_config.get("serve_stale_after", 0),
+        )
+
+    def get(self, url, now=None):
+        """
+        获取来源的缓存节点
+
+        Args:
+            url (str): 来源URL
+            now (float, optional): 当前时间
+
+        Returns:
+            tuple: (节点列表, 缓存时长秒数)；没有缓存或缓存超过max_stale时返回(None, None)
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry or not entry.get("nodes"):
+            return None, None
+        age = now - entry.get("fetched_at", 0)
+        if age > self.max_stale:
+            return None, None
+        return list(entry["nodes"]), age
+
+    def put(self, url, nodes, fetched_at=None):
+        """
+        记录来源最近一次成功获取的节点
+
+        Args:
+            url (str): 来源URL
+            nodes (list): 节点列表
+            fetched_at (float, optional): 获取时间
+        """
+        if not nodes:
+            return
+        with self._lock:
+            self._entries[url] = {
+                "fetched_at": fetched_at if fetched_at is not None else time.time(),
+                "nodes": list(nodes),
+            }
+
+    def save(self):
+        """
+        将缓存写入文件，超过max_stale的条目被清理
+        """
+        if not self.cache_file:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries = {
+                url: entry for url, entry in self._entries.items()
+                if now - entry.get("fetched_at", 0) <= self.max_stale
+            }
+            entries = dict(self._entries)
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.cache_file}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import time
+import uuid
+
+class SourceQueue:
+    """
+    基于SQLite的来源任务队列，放在共享目录中即可供多个进程或多台机器上的工作进程使用
+
+    每次运行（run）包含一组来源任务，任务状态依次为pending -> claimed -> done/failed，
+    协调进程结束运行时未完成的任务标记为cancelled。工作进程领取的任务在lease秒内未完成时
+    （例如工作进程退出）可以被其他工作进程重新领取，最多尝试max_attempts次。
+    跨机器共享时使用默认的回滚日志模式（WAL模式要求所有进程在同一台机器上），共享目录需要支持文件锁。
+    """
+
+    def __init__(self, queue_file, lease=300, max_attempts=2, retention=86400):
+        self.queue_file = queue_file
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retention = retention
+        directory = os.path.dirname(queue_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS runs ("
+                       "run_id TEXT PRIMARY KEY, created_at REAL, closed INTEGER DEFAULT 0)")
+            db.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                       "run_id TEXT, url TEXT, position INTEGER, state TEXT, worker TEXT, "
+                       "claimed_at REAL, attempts INTEGER DEFAULT 0, shard_file TEXT, error TEXT, "
+                       "source_failure INTEGER DEFAULT 0, PRIMARY KEY (run_id, url))")
+            # 旧版本创建的队列文件没有source_failure列
+            columns = [row[1] for row in db.execute("PRAGMA table_info(jobs)")]
+            if "source_failure" not in columns:
+                db.execute("ALTER TABLE jobs ADD COLUMN source_failure INTEGER DEFAULT 0")
+
+    @classmethod
+    def from_config(cls, distributed_config):
+        """
+        根据distributed配置创建任务队列
+
+        Args:
+            distributed_config (dict): distributed配置
+
+        Returns:
+            SourceQueue: 任务队列
+        """
+        return cls(
+            distributed_config.get("queue_file", "./cache/queue.sqlite"),
+            lease=distributed_config.get("lease", 300),
+            max_attempts=distributed_config.get("max_attempts", 2),
+        )
+
+    def _connect(self):
+        # 每次操作使用新连接，连接不跨线程或进程共享；领取任务时用BEGIN IMMEDIATE加写锁
+        return _Connection(self.queue_file)
+
+    def create_run(self, urls):
+        """
+        创建一次运行并加入来源任务，同时结束超过retention秒的遗留运行并清理其任务
+
+        Args:
+            urls (list): 来源URL列表
+
+        Returns:
+            str: 运行ID
+        """
+        run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            old_runs = [row[0] for row in db.execute(
+                "SELECT run_id FROM runs WHERE created_at < ?", (now - self.retention,))]
+            for old_run in old_runs:
+                db.execute("DELETE FROM jobs WHERE run_id = ?", (old_run,))
+                db.execute("DELETE FROM runs WHERE run_id = ?", (old_run,))
+            db.execute("INSERT INTO runs (run_id, created_at) VALUES (?, ?)", (run_id, now))
+            db.executemany("INSERT OR IGNORE INTO jobs (run_id, url, position, state) VALUES (?, ?, ?, 'pending')",
+                           [(run_id, url, position) for position, url in enumerate(urls)])
+        return run_id
+
+    def claim(self, worker_id):
+        """
+        领取一个任务：最新创建的未结束运行中第一个待处理或租约已过期的任务
+        （优先处理当前协调进程的运行，异常退出的协调进程遗留的运行在空闲时处理）
+
+        Args:
+            worker_id (str): 工作进程标识
+
+        Returns:
+            tuple: (运行ID, 来源URL, 第几次尝试)；没有可领取的任务时返回None
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            # 租约过期且已达到最大尝试次数的任务标记为失败
+            db.execute("UPDATE jobs SET state = 'failed', error = '租约过期' "
+                       "WHERE state = 'claimed' AND claimed_at < ? AND attempts >= ?",
+                       (now - self.lease, self.max_attempts))
+            row = db.execute(
+                "SELECT jobs.run_id, jobs.url, jobs.attempts FROM jobs JOIN runs ON jobs.run_id = runs.run_id "
+                "WHERE runs.closed = 0 AND (jobs.state = 'pending' OR (jobs.state = 'claimed' AND jobs.claimed_at < ?)) "
+                "ORDER BY runs.created_at DESC, jobs.position LIMIT 1", (now - self.lease,)).fetchone()
+            if row is None:
+                return None
+            run_id, url, attempts = row
+            db.execute("UPDATE jobs SET state = 'claimed', worker = ?, claimed_at = ?, attempts = ? "
+                       "WHERE run_id = ? AND url = ?", (worker_id, now, attempts + 1, run_id, url))
+        return run_id, url, attempts + 1
+
+    def complete(self, run_id, url, shard_file):
+        """
+        记录任务完成及其节点分片文件
+        """
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET state = 'done', shard_file = ?, error = NULL "
+                       "WHERE run_id = ? AND url = ? AND state = 'claimed'", (shard_file, run_id, url))
+
+    def fail(self, run_id, url, error, source_failure=False):
+        """
+        记录任务失败
+
+        Args:
+            run_id (str): 运行ID
+            url (str): 来源URL
+            error (Exception): 失败原因
+            source_failure (bool): 是否为来源本身的失败（连接错误、超时、HTTP错误），协调进程据此更新熔断器
+        """
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET state = 'failed', error = ?, source_failure = ? "
+                       "WHERE run_id = ? AND url = ? AND state = 'claimed'",
+                       (str(error)[:500], int(source_failure), run_id, url))
+
+    def has_open_runs(self):
+        """
+        是否还有未结束的运行
+        """
+        with self._connect() as db:
+            return db.execute("SELECT 1 FROM runs WHERE closed = 0 LIMIT 1").fetchone() is not None
+
+    def status(self, run_id):
+        """
+        统计运行中各状态的任务数
+
+        Returns:
+            dict: 状态 -> 任务数
+        """
+        with self._connect() as db:
+            return dict(db.execute("SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state", (run_id,)))
+
+    def jobs(self, run_id):
+        """
+        按来源顺序返回运行中的任务
+
+        Returns:
+            list: 任务字典列表（url、state、worker、attempts、shard_file、error、source_failure）
+        """
+        with self._connect() as db:
+            rows = db.execute("SELECT url, state, worker, attempts, shard_file, error, source_failure FROM jobs "
+                              "WHERE run_id = ? ORDER BY position", (run_id,)).fetchall()
+        fields = ("url", "state", "worker", "attempts", "shard_file", "error", "source_failure")
+        return [dict(zip(fields, row[:-1] + (bool(row[-1]),))) for row in rows]
+
+    def close_run(self, run_id):
+        """
+        结束运行：未完成的任务标记为cancelled，工作进程不再领取该运行的任务
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("UPDATE jobs SET state = 'cancelled' WHERE run_id = ? AND state IN ('pending', 'claimed')",
+                       (run_id,))
+            db.execute("UPDATE runs SET closed = 1 WHERE run_id = ?", (run_id,))
+
+class _Connection:
+    """
+    SQLite连接的上下文管理器：退出时提交（出错时回滚）并关闭连接
+    """
+
+    def __init__(self, queue_file):
+        self.db = sqlite3.connect(queue_file, timeout=30, isolation_level=None)
+
+    def __enter__(self):
+        return self
+
+    def execute(self, sql, params=()):
+        return self.db.execute(sql, params)
+
+    def executemany(self, sql, params):
+        return self.db.executemany(sql, params)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if self.db.in_transaction:
+                if exc_type is None:
+                    self.db.commit()
+                else:
+                    self.db.rollback()
+        finally:
+            self.db.close()
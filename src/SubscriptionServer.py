@@ -0,0 +1,259 @@
+import asyncio
+import gzip
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BAD_REQUEST = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+class SubscriptionVariant:
+    """
+    订阅内容的一种编码形式（identity/gzip/br），响应头在更新时预先生成
+    """
+
+    def __init__(self, body, etag, header_block, not_modified_block):
+        self.body = body
+        self.etag = etag
+        self.header_block = header_block
+        self.not_modified_block = not_modified_block
+
+class SubscriptionServer:
+    """
+    内置订阅HTTP服务：在内存中提供最新生成的配置文件
+
+    - 强ETag + If-None-Match 条件请求（304）
+    - 预压缩的 gzip / brotli 版本（brotli需安装brotli库）
+    - subscription-userinfo / profile-update-interval 响应头
+    - 基于asyncio的单线程事件循环，支持HTTP/1.1长连接
+    """
+
+    def __init__(self, host="0.0.0.0", port=8080, path="/free-VPN.yaml",
+                 profile_update_interval=24, subscription_userinfo="",
+                 keepalive_timeout=75):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.profile_update_interval = profile_update_interval
+        self.subscription_userinfo = subscription_userinfo
+        self.keepalive_timeout = keepalive_timeout
+        # 编码名称 -> SubscriptionVariant，整体替换以保证线程安全
+        self._variants = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+
+    @classmethod
+    def from_config(cls, server_config):
+        """
+        根据subscription_server配置创建服务实例
+
+        Args:
+            server_config (dict): subscription_server配置
+
+        Returns:
+            SubscriptionServer: 服务实例
+        """
+        return cls(
+            host=server_config.get("host", "0.0.0.0"),
+            port=server_config.get("port", 8080),
+            path=server_config.get("path", "/free-VPN.yaml"),
+            profile_update_interval=server_config.get("profile_update_interval", 24),
+            subscription_userinfo=server_config.get("subscription_userinfo", ""),
+        )
+
+    def update(self, content):
+        """
+        更新订阅内容，预先计算ETag、压缩版本和响应头
+
+        Args:
+            content (bytes or str): 配置文件内容
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        last_modified = formatdate(time.time(), usegmt=True)
+
+        bodies = {"identity": content, "gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(content, quality=11)
+
+        variants = {}
+        for encoding, body in bodies.items():
+            etag = f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            common_headers = [
+                ("ETag", etag),
+                ("Last-Modified", last_modified),
+                ("Cache-Control", "no-cache"),
+                ("Vary", "Accept-Encoding"),
+                ("profile-update-interval", str(self.profile_update_interval)),
+            ]
+            if self.subscription_userinfo:
+                common_headers.append(("subscription-userinfo", self.subscription_userinfo))
+
+            headers = [("Content-Type", "text/yaml; charset=utf-8"), ("Content-Length", str(len(body)))]
+            if encoding != "identity":
+                headers.append(("Content-Encoding", encoding))
+            variants[encoding] = SubscriptionVariant(
+                body,
+                etag,
+                self._header_block("200 OK", headers + common_headers),
+                self._header_block("304 Not Modified", common_headers),
+            )
+
+        self._variants = variants
+        print(f"订阅服务内容已更新，大小 {len(content)} 字节，"
+              f"gzip {len(bodies['gzip'])} 字节" + (f"，br {len(bodies['br'])} 字节" if "br" in bodies else ""))
+
+    def has_content(self):
+        """
+        是否已加载订阅内容
+        """
+        return bool(self._variants)
+
+    def _header_block(self, status, headers):
+        """
+        生成状态行和响应头（不含Connection头和结尾空行）
+        """
+        lines = [f"HTTP/1.1 {status}"] + [f"{name}: {value}" for name, value in headers]
+        return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+    def _select_encoding(self, accept_encoding):
+        """
+        根据Accept-Encoding选择编码，优先br，其次gzip
+        """
+        accepted = set()
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            params = params.replace(" ", "")
+            if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self._variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def build_response(self, method, target, headers, keep_alive=True):
+        """
+        根据请求生成完整的响应字节
+
+        Args:
+            method (str): 请求方法
+            target (str): 请求路径
+            headers (dict): 请求头（键为小写）
+            keep_alive (bool): 是否保持连接
+
+        Returns:
+            bytes: 响应内容
+        """
+        connection = b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n"
+        variants = self._variants
+
+        if method not in ("GET", "HEAD"):
+            return b"HTTP/1.1 405 Method Not Allowed\r\nAllow: GET, HEAD\r\nContent-Length: 0\r\n" + connection
+        if target.split("?", 1)[0] != self.path:
+            return b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n" + connection
+        if not variants:
+            return b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 10\r\nContent-Length: 0\r\n" + connection
+
+        variant = variants[self._select_encoding(headers.get("accept-encoding", ""))]
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            if "*" in tags or variant.etag in tags or f"W/{variant.etag}" in tags:
+                return variant.not_modified_block + connection
+
+        if method == "HEAD":
+            return variant.header_block + connection
+        return variant.header_block + connection + variant.body
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    writer.write(BAD_REQUEST)
+                    break
+                method, target, version = parts
+
+                connection = headers.get("connection", "").lower()
+                if version == "HTTP/1.1":
+                    keep_alive = connection != "close"
+                else:
+                    keep_alive = connection == "keep-alive"
+
+                writer.write(self.build_response(method, target, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.LimitOverrunError):
+            # 请求行或请求头超过StreamReader的长度上限
+            writer.write(BAD_REQUEST)
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def serve(self):
+        """
+        在当前事件循环中运行服务，直到被取消
+        """
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                  reuse_address=True, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"订阅服务已启动: http://{self.host}:{self.port}{self.path}")
+        self._started.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self):
+        """
+        在后台线程中启动服务
+        """
+        def run():
+            try:
+                asyncio.run(self.serve())
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                print(f"订阅服务运行失败: {str(e)}")
+            finally:
+                self._started.set()
+
+        self._thread = threading.Thread(target=run, name="SubscriptionServer", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self):
+        """
+        停止后台服务
+        """
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(timeout=5)
@@ -14,7 +14,27 @@ def main():
     parser = argparse.ArgumentParser(description="Free VPN Clash Updater - 更新Clash配置的工具")
     parser.add_argument("-c", "--config", help="配置文件路径", default=None)
     parser.add_argument("-o", "--output", help="输出文件路径", default=None)
+    parser.add_argument("-d", "--daemon", action="store_true", help="守护模式：常驻进程并按配置的间隔定时刷新")
+    parser.add_argument("-w", "--worker", action="store_true", help="分布式获取的工作进程：从共享队列领取来源并写入节点分片")
+    parser.add_argument("--profile", nargs="?", const="./profile", default=None, metavar="DIR",
+                        help="分阶段性能分析（cProfile、栈采样和tracemalloc），结果写入DIR（默认./profile）")
     parser.add_argument("-v", "--version", action="version", version="Free VPN Clash Updater 1.0")
+    parser.set_defaults(artifact=None)
+    
+    # 子命令：fetch只获取节点并写出节点中间文件，convert只根据节点中间文件生成配置（不访问来源），
+    # all（默认）获取并生成配置；子命令中也可以使用-c、-o和--profile
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--config", help="配置文件路径", default=argparse.SUPPRESS)
+    common.add_argument("--profile", nargs="?", const="./profile", default=argparse.SUPPRESS, metavar="DIR",
+                        help="分阶段性能分析，结果写入DIR（默认./profile）")
+    common.add_argument("-a", "--artifact", default=argparse.SUPPRESS, metavar="FILE",
+                        help="节点中间文件路径（默认使用run.artifact_file配置，文件名以.gz结尾时使用gzip压缩）")
+    with_output = argparse.ArgumentParser(add_help=False)
+    with_output.add_argument("-o", "--output", help="输出文件路径", default=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest="command", metavar="{fetch,convert,all}")
+    subparsers.add_parser("fetch", parents=[common], help="获取节点并写出节点中间文件")
+    subparsers.add_parser("convert", parents=[common, with_output], help="根据节点中间文件生成Clash配置，不访问来源")
+    subparsers.add_parser("all", parents=[common, with_output], help="获取节点并生成Clash配置（默认）")
     
     args = parser.parse_args()
     
@@ -22,8 +42,28 @@ def main():
         # 创建更新器实例
         updater = ClashUpdater()
         
-        # 更新配置
-        updater.update_clash_config(args.config, args.output)
+        if args.worker:
+            # 工作进程，没有待处理的来源时退出
+            updater.run_worker(args.config)
+        elif args.daemon:
+            # 守护模式，直到被中断
+            updater.run_daemon(args.config, args.output)
+        else:
+            if args.profile:
+                # 性能分析（只在启用时导入分析模块）
+                from RunProfiler import RunProfiler
+                updater.profiler = RunProfiler(args.profile)
+                updater.profiler.start()
+            try:
+                if args.command == "fetch":
+                    updater.fetch_nodes(args.config, args.artifact)
+                elif args.command == "convert":
+                    updater.convert_artifact(args.config, args.output, args.artifact)
+                else:
+                    updater.update_clash_config(args.config, args.output, args.artifact)
+            finally:
+                if updater.profiler:
+                    updater.profiler.stop()
         
         print("\n操作完成！")
         sys.exit(0)
@@ -0,0 +1,112 @@
+import http.server
+import threading
+
+import pytest
+import requests
+
+from CapturePolicy import CapturePolicy
+
+
+def test_default_content_types_include_html():
+    policy = CapturePolicy.from_config({})
+    assert policy.is_candidate("https://example.com/sub", "text/html; charset=utf-8", "1024", "xhr")
+    assert policy.is_candidate("https://example.com/api", "application/json", None, "fetch")
+    assert not policy.is_candidate("https://example.com/logo", "image/png", "1024", "image")
+
+
+def test_html_is_bounded_by_body_size():
+    policy = CapturePolicy.from_config({"max_body_size": 1024})
+    assert not policy.is_candidate("https://example.com/page", "text/html", "4096", "document")
+
+
+class FakeRequest:
+    """
+    Playwright请求对象中read_body用到的部分
+    """
+
+    def __init__(self, url, method="GET"):
+        self.url = url
+        self.method = method
+        self.headers = {"user-agent": "test", "accept-encoding": "gzip, br"}
+
+    def all_headers(self):
+        return dict(self.headers, cookie="session=1")
+
+
+class FakeResponse:
+    """
+    Playwright响应对象中read_body用到的部分，body()返回整个响应体
+    """
+
+    def __init__(self, url, body, headers=None):
+        self.url = url
+        self.request = FakeRequest(url)
+        self.headers = headers or {}
+        self._body = body
+        self.body_calls = 0
+
+    def body(self):
+        self.body_calls += 1
+        return self._body
+
+
+@pytest.fixture
+def chunked_server():
+    """
+    以分块传输（没有Content-Length）返回响应体的服务，/big返回无限长的响应体
+    """
+    seen_headers = []
+
+    class ChunkedHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            seen_headers.append(dict(self.headers))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunk = b"ss://abc@example.com:443#n\n" * 1000
+            try:
+                for _ in range(10 ** 6 if self.path == "/big" else 2):
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ChunkedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", seen_headers
+    server.shutdown()
+
+
+def test_chunked_body_over_cap_is_aborted_while_streaming(chunked_server):
+    base, seen_headers = chunked_server
+    policy = CapturePolicy(max_body_size=256 * 1024)
+    response = FakeResponse(f"{base}/big", b"")
+
+    with requests.Session() as session:
+        assert policy.read_body(response, session, timeout=5) is None
+    assert response.body_calls == 0
+    assert seen_headers[0]["cookie"] == "session=1"
+    assert "br" not in seen_headers[0].get("Accept-Encoding", "")
+
+
+def test_chunked_body_within_cap_is_returned(chunked_server):
+    base, _ = chunked_server
+    policy = CapturePolicy(max_body_size=256 * 1024)
+    with requests.Session() as session:
+        body = policy.read_body(FakeResponse(f"{base}/small", b""), session, timeout=5)
+    assert body.count("ss://") == 2000
+
+
+def test_body_with_content_length_uses_browser_body():
+    policy = CapturePolicy(max_body_size=10)
+    response = FakeResponse("http://127.0.0.1:1/x", b"ss://a", {"content-length": "6"})
+    assert policy.read_body(response, requests.Session()) == "ss://a"
+    assert response.body_calls == 1
+    too_big = FakeResponse("http://127.0.0.1:1/x", b"x" * 11)
+    assert policy.read_body(too_big) is None
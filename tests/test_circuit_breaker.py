@@ -0,0 +1,65 @@
+from concurrent.futures import Future
+
+import requests
+
+from CircuitBreaker import CircuitBreaker
+from SSRFetcher import SSRFetcher
+
+
+def _done(result=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def test_breaker_is_keyed_per_source_url(tmp_path):
+    breaker = CircuitBreaker(str(tmp_path / "breaker.json"), failure_threshold=2)
+    bad, good = "https://raw.example.com/a/nodes.txt", "https://raw.example.com/b/nodes.txt"
+    breaker.record_failure(bad)
+    breaker.record_failure(bad)
+
+    assert not breaker.allow(bad)
+    assert breaker.allow(good)
+    assert breaker.retry_in(bad) > 0
+
+    breaker.save()
+    reloaded = CircuitBreaker(str(tmp_path / "breaker.json"), failure_threshold=2)
+    assert not reloaded.allow(bad)
+    reloaded.record_success(bad)
+    assert reloaded.allow(bad)
+
+
+def test_breaker_can_be_keyed_per_host(tmp_path):
+    breaker = CircuitBreaker.from_config({"state_file": str(tmp_path / "breaker.json"),
+                                          "failure_threshold": 1, "key": "host"})
+    breaker.record_failure("https://raw.example.com/a/nodes.txt")
+    assert not breaker.allow("https://raw.example.com/b/nodes.txt")
+    assert breaker.allow("https://other.example.com/a/nodes.txt")
+
+
+def test_only_transport_and_http_errors_count_as_failures():
+    response = requests.Response()
+    response.status_code = 503
+    assert CircuitBreaker.is_failure(requests.ConnectionError("refused"))
+    assert CircuitBreaker.is_failure(requests.Timeout("timed out"))
+    assert CircuitBreaker.is_failure(requests.HTTPError("503", response=response))
+    assert not CircuitBreaker.is_failure(ValueError("获取到的HTML内容为空"))
+    assert not CircuitBreaker.is_failure(TimeoutError("已超过运行截止时间"))
+
+
+def test_collect_fetch_result_does_not_trip_on_zero_nodes(tmp_path):
+    fetcher = SSRFetcher()
+    fetcher.source_cache = None
+    fetcher.circuit_breaker = CircuitBreaker(None, failure_threshold=1)
+    url = "https://example.com/empty.txt"
+
+    fetcher._collect_fetch_result(url, _done([]), {})
+    assert fetcher.circuit_breaker.allow(url)
+    fetcher._collect_fetch_result(url, _done(error=ValueError("页面中没有节点")), {})
+    assert fetcher.circuit_breaker.allow(url)
+
+    fetcher._collect_fetch_result(url, _done(error=requests.ConnectionError("refused")), {})
+    assert not fetcher.circuit_breaker.allow(url)
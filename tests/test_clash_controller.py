@@ -0,0 +1,137 @@
+import json
+import threading
+import http.server
+
+import pytest
+
+from ClashController import ClashController
+from ClashUpdater import ClashUpdater
+
+class StandInController:
+    """
+    本地模拟的Clash external-controller：记录请求，按设置的状态码响应
+    """
+
+    def __init__(self, secret="s3cret"):
+        self.secret = secret
+        self.requests = []
+        self.put_status = 204
+        controller = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                controller.requests.append((self.command, self.path, body, self.headers.get("Authorization")))
+                if self.headers.get("Authorization") != f"Bearer {controller.secret}":
+                    status = 401
+                elif self.command == "PUT":
+                    status = controller.put_status
+                else:
+                    status = 200
+                payload = b"{}" if status == 200 else b""
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_PUT = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def calls(self):
+        return [(method, path) for method, path, _, _ in self.requests]
+
+@pytest.fixture
+def controller():
+    stand_in = StandInController()
+    yield stand_in
+    stand_in.server.shutdown()
+
+def _updater(controller, tmp_path, changed=True, changed_providers=(), auto_restart=True):
+    output_file = tmp_path / "free-VPN.yaml"
+    output_file.write_text("proxies: []\n", encoding="utf-8")
+    updater = ClashUpdater()
+    updater.ssr_converter.last_output_file = str(output_file)
+    updater.ssr_converter.last_output_changed = changed
+    updater.ssr_converter.last_changed_providers = list(changed_providers)
+    restarts = []
+    updater._restart_clash_verge = lambda clash_verge_config: restarts.append(clash_verge_config)
+    config = {
+        "clash": {"external_controller": controller.url, "secret": controller.secret},
+        "clash_verge": {"hot_reload": True, "auto_restart": auto_restart, "reload_timeout": 5},
+    }
+    return updater, config, restarts
+
+def test_reload_config_puts_path_and_verifies(controller, tmp_path):
+    config_file = tmp_path / "free-VPN.yaml"
+    config_file.write_text("proxies: []\n", encoding="utf-8")
+    client = ClashController(controller.url, secret=controller.secret)
+
+    assert client.reload_config(str(config_file))
+    assert controller.calls() == [("PUT", "/configs?force=true"), ("GET", "/configs")]
+    assert json.loads(controller.requests[0][2]) == {"path": str(config_file)}
+
+def test_reload_config_with_payload(controller, tmp_path):
+    config_file = tmp_path / "free-VPN.yaml"
+    config_file.write_text("proxies: []\n", encoding="utf-8")
+
+    assert ClashController(controller.url, secret=controller.secret).reload_config(str(config_file), use_payload=True)
+    assert json.loads(controller.requests[0][2]) == {"payload": "proxies: []\n"}
+
+def test_wrong_secret_fails(controller, tmp_path):
+    config_file = tmp_path / "free-VPN.yaml"
+    config_file.write_text("proxies: []\n", encoding="utf-8")
+
+    assert not ClashController(controller.url, secret="wrong").reload_config(str(config_file))
+
+def test_update_proxy_provider_quotes_name(controller):
+    assert ClashController(controller.url, secret=controller.secret).update_proxy_provider("src a")
+    assert controller.calls() == [("PUT", "/providers/proxies/src%20a"), ("GET", "/providers/proxies/src%20a")]
+
+def test_hot_reload_only_updates_changed_providers(controller, tmp_path):
+    updater, config, restarts = _updater(controller, tmp_path, changed=False, changed_providers=["a", "b"])
+
+    updater._apply_clash_verge_config(config)
+
+    assert controller.calls() == [("PUT", "/providers/proxies/a"), ("GET", "/providers/proxies/a"),
+                                  ("PUT", "/providers/proxies/b"), ("GET", "/providers/proxies/b")]
+    assert restarts == []
+
+def test_hot_reload_failure_falls_back_to_restart(controller, tmp_path):
+    controller.put_status = 500
+    updater, config, restarts = _updater(controller, tmp_path)
+
+    updater._apply_clash_verge_config(config)
+
+    assert controller.calls() == [("PUT", "/configs?force=true")]
+    assert len(restarts) == 1
+
+def test_unreachable_controller_falls_back_to_restart(tmp_path):
+    stand_in = StandInController()
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
+    updater, config, restarts = _updater(stand_in, tmp_path)
+
+    updater._apply_clash_verge_config(config)
+
+    assert len(restarts) == 1
+
+def test_daemon_refresh_reloads_when_only_providers_changed(controller, tmp_path):
+    updater, config, restarts = _updater(controller, tmp_path, changed=False)
+
+    def convert(nodes_with_source, config_file=None, output_file=None):
+        updater.ssr_converter.last_output_changed = False
+        updater.ssr_converter.last_changed_providers = ["a"]
+    updater.ssr_converter.convert_ssr_nodes_to_clash_config = convert
+
+    updater._refresh_output(config, None, None, {"https://a.example.com": ["ss://node"]},
+                            ["https://a.example.com"])
+
+    assert controller.calls() == [("PUT", "/providers/proxies/a"), ("GET", "/providers/proxies/a")]
+    assert restarts == []
@@ -0,0 +1,55 @@
+import copy
+
+from ContentHash import proxy_identity, semantic_hash
+
+
+def _config():
+    return {
+        "port": 7890,
+        "proxies": [
+            {"name": "🇭🇰 HK 01", "type": "ss", "server": "a.example.com", "port": 443, "cipher": "aes-128-gcm",
+             "password": "p"},
+            {"name": "🇯🇵 JP 01", "type": "trojan", "server": "b.example.com", "port": 443, "password": "p"},
+        ],
+        "proxy-groups": [
+            {"name": "FREE-PROXY", "type": "select", "proxies": ["AUTO", "🇭🇰 HK 01", "🇯🇵 JP 01"]},
+            {"name": "AUTO", "type": "fallback", "proxies": ["🇭🇰 HK 01", "🇯🇵 JP 01"]},
+        ],
+        "rules": ["DOMAIN-SUFFIX,example.com,DIRECT", "MATCH,FREE-PROXY"],
+    }
+
+
+def _renamed(config, mapping):
+    config = copy.deepcopy(config)
+    for proxy in config["proxies"]:
+        proxy["name"] = mapping[proxy["name"]]
+    for group in config["proxy-groups"]:
+        group["proxies"] = [mapping.get(name, name) for name in group["proxies"]]
+    return config
+
+
+def test_hash_ignores_proxy_names_and_order():
+    config = _config()
+    renamed = _renamed(config, {"🇭🇰 HK 01": "🇭🇰 HK 02", "🇯🇵 JP 01": "🇯🇵 JP 03"})
+    renamed["proxies"].reverse()
+    renamed["proxy-groups"][0]["proxies"].reverse()
+
+    assert proxy_identity(config["proxies"][0]) == proxy_identity(renamed["proxies"][1])
+    assert semantic_hash(config) == semantic_hash(renamed)
+
+
+def test_hash_changes_with_semantic_content():
+    base = semantic_hash(_config())
+
+    changed_proxy = _config()
+    changed_proxy["proxies"][0]["port"] = 8443
+    fallback_order = _config()
+    fallback_order["proxy-groups"][1]["proxies"].reverse()
+    rule_order = _config()
+    rule_order["rules"].reverse()
+    other = _config()
+    other["port"] = 7891
+
+    hashes = {semantic_hash(config) for config in (changed_proxy, fallback_order, rule_order, other)}
+    assert base not in hashes and len(hashes) == 4
+    assert semantic_hash(_config(), {"file": "a.yaml"}) != semantic_hash(_config(), {"file": "b.yaml"})
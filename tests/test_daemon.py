@@ -0,0 +1,23 @@
+import time
+
+from ClashUpdater import ClashUpdater
+
+def test_expire_stale_sources_drops_sources_older_than_max_stale():
+    updater = ClashUpdater()
+    now = time.time()
+    nodes_by_source = {"fresh": ["ss://a"], "dead": ["ss://b"]}
+    fetched_at = {"fresh": now - 10, "dead": now - 7200}
+
+    expired = updater._expire_stale_sources(nodes_by_source, fetched_at, 3600)
+
+    assert expired == ["dead"]
+    assert nodes_by_source == {"fresh": ["ss://a"]}
+    assert "dead" not in fetched_at
+
+def test_expire_stale_sources_disabled_with_zero():
+    updater = ClashUpdater()
+    nodes_by_source = {"dead": ["ss://b"]}
+    fetched_at = {"dead": time.time() - 10 ** 7}
+
+    assert updater._expire_stale_sources(nodes_by_source, fetched_at, 0) == []
+    assert nodes_by_source == {"dead": ["ss://b"]}
@@ -0,0 +1,48 @@
+import yaml
+
+from ClashUpdater import ClashUpdater
+
+
+def _write_config(tmp_path, output_file):
+    config = {
+        "ssr_source": {
+            # 端口1没有服务，连接立即被拒绝
+            "urls": ["http://127.0.0.1:1/nodes.txt"],
+            "retry": {"max_attempts": 1},
+            "adapters": {"enable": False},
+            "circuit_breaker": {"enable": False},
+            "stale_cache": {"enable": False},
+            "mirrors": {"enable": False},
+            "browser_prewarm": {"enable": False},
+        },
+        "run": {"time_budget": 0, "artifact_file": str(tmp_path / "nodes.jsonl")},
+        "output": {"file": str(output_file)},
+    }
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump(config, allow_unicode=True), encoding="utf-8")
+    return str(config_file)
+
+
+def test_no_nodes_keeps_previous_output_and_reports_it(tmp_path, capsys):
+    output_file = tmp_path / "free-VPN.yaml"
+    output_file.write_text("previous", encoding="utf-8")
+    config_file = _write_config(tmp_path, output_file)
+    updater = ClashUpdater()
+
+    assert updater.update_clash_config(config_file, str(output_file)) is None
+
+    out = capsys.readouterr().out
+    assert "失败 1 个" in out
+    assert "失败: http://127.0.0.1:1/nodes.txt" in out
+    assert "本次未生成任何输出，保留上次的输出" in out
+    assert output_file.read_text(encoding="utf-8") == "previous"
+    assert not (tmp_path / "nodes.jsonl").exists()
+
+
+def test_fetch_subcommand_keeps_previous_artifact(tmp_path):
+    config_file = _write_config(tmp_path, tmp_path / "free-VPN.yaml")
+    artifact_file = tmp_path / "previous.jsonl"
+    artifact_file.write_text("previous", encoding="utf-8")
+
+    assert ClashUpdater().fetch_nodes(config_file, str(artifact_file)) is None
+    assert artifact_file.read_text(encoding="utf-8") == "previous"
@@ -0,0 +1,97 @@
+import json
+import base64
+
+import pytest
+
+from SSRConverter import SSRConverter
+from FormatEmitters import SingBoxEmitter, UriSubscriptionEmitter
+
+VMESS_CONFIG = {"v": "2", "ps": "vmess-ws", "add": "v.example.com", "port": "443", "id": "b831381d-6324-4d53-ad4f-8cda48b30811",
+                "aid": "0", "scy": "auto", "net": "ws", "type": "none", "host": "cdn.example.com", "path": "/ray",
+                "tls": "tls", "sni": "v.example.com"}
+
+NODE_URIS = [
+    "ss://YWVzLTI1Ni1nY206cGFzcw==@1.2.3.4:8388#ss-node",
+    "vmess://" + base64.b64encode(json.dumps(VMESS_CONFIG).encode()).decode(),
+    "vless://b831381d-6324-4d53-ad4f-8cda48b30811@vl.example.com:443?type=ws&security=tls&sni=vl.example.com"
+    "&path=%2Fws%3Fed%3D2048&host=cdn.example.com#vless-ws",
+    "vless://b831381d-6324-4d53-ad4f-8cda48b30811@vl.example.com:443?type=tcp&security=reality&sni=www.apple.com"
+    "&pbk=abcdef&sid=12ab&fp=chrome#vless-reality",
+    "vless://b831381d-6324-4d53-ad4f-8cda48b30811@vl.example.com:443?type=grpc&security=tls&serviceName=svc#vless-grpc",
+    "trojan://secret@tr.example.com:443?sni=tr.example.com&allowInsecure=1&type=ws&path=%2Ftrojan"
+    "&host=cdn.example.com#trojan-ws",
+    "trojan://secret@tr.example.com:443?sni=tr.example.com#trojan-tcp",
+    "hysteria2://pw@hy.example.com:443?sni=hy.example.com&insecure=1&obfs=salamander&obfs-password=ob"
+    "&upmbps=100&downmbps=200#hy2",
+]
+
+def _parse(converter, uri):
+    proxy = converter.node_parsers.parse(uri, "")
+    proxy.pop("name")
+    return proxy
+
+@pytest.mark.parametrize("uri", NODE_URIS)
+def test_uri_round_trip(uri):
+    converter = SSRConverter()
+    proxy = converter.node_parsers.parse(uri, "")
+    emitted = UriSubscriptionEmitter().proxy_to_uri(proxy)
+
+    reparsed = _parse(SSRConverter(), emitted)
+    proxy.pop("name")
+    assert reparsed == proxy
+
+def test_round_trip_keeps_ws_path_and_insecure():
+    converter = SSRConverter()
+    vless = converter.node_parsers.parse(NODE_URIS[2], "")
+    trojan = converter.node_parsers.parse(NODE_URIS[5], "")
+
+    assert vless["ws-opts"] == {"path": "/ws?ed=2048", "headers": {"Host": "cdn.example.com"}}
+    assert trojan["ws-opts"]["path"] == "/trojan"
+    assert trojan["skip-cert-verify"] is True
+
+    emitter = UriSubscriptionEmitter()
+    for proxy in (vless, trojan):
+        reparsed = SSRConverter().node_parsers.parse(emitter.proxy_to_uri(proxy), "")
+        assert reparsed["ws-opts"] == proxy["ws-opts"]
+        assert reparsed["skip-cert-verify"] == proxy["skip-cert-verify"]
+
+def test_base64_subscription_decodes_to_plain_subscription():
+    converter = SSRConverter()
+    clash_config = {"proxies": [converter.node_parsers.parse(uri, "") for uri in NODE_URIS]}
+    emitter = UriSubscriptionEmitter()
+
+    plain = emitter.render(clash_config)
+    assert len(plain.splitlines()) == len(NODE_URIS)
+    assert base64.b64decode(emitter.render_base64(clash_config)).decode("utf-8") == plain
+
+def test_sing_box_groups_reference_every_outbound():
+    converter = SSRConverter()
+    clash_config = {"proxies": [converter.node_parsers.parse(uri, "") for uri in NODE_URIS]}
+    outbounds = json.loads(SingBoxEmitter().render(clash_config))["outbounds"]
+
+    tags = {outbound["tag"] for outbound in outbounds}
+    for outbound in outbounds:
+        for member in outbound.get("outbounds", []):
+            assert member in tags
+    urltest = next(outbound for outbound in outbounds if outbound["type"] == "urltest")
+    assert len(urltest["outbounds"]) == len(NODE_URIS)
+
+def test_sing_box_without_supported_proxies_has_no_empty_group():
+    clash_config = {"proxies": [{"name": "ssr-only", "type": "ssr", "server": "s.example.com", "port": 443,
+                                 "cipher": "aes-256-cfb", "password": "pw", "protocol": "origin", "obfs": "plain"}]}
+    outbounds = json.loads(SingBoxEmitter().render(clash_config))["outbounds"]
+
+    assert all(outbound.get("outbounds") != [] for outbound in outbounds)
+    assert not any(outbound["type"] == "urltest" for outbound in outbounds)
+    selector = next(outbound for outbound in outbounds if outbound["tag"] == "FREE-PROXY")
+    assert selector["outbounds"] == ["direct"]
+
+def test_ssr_emit_then_parse_keeps_all_fields():
+    proxy = {"name": "ssr-node", "type": "ssr", "server": "s.example.com", "port": 443, "cipher": "aes-256-cfb",
+             "password": "pw", "protocol": "auth_aes128_md5", "obfs": "tls1.2_ticket_auth",
+             "protocol-param": "1:a", "obfs-param": "o.example.com"}
+    reparsed = SSRConverter().node_parsers.parse(UriSubscriptionEmitter().proxy_to_uri(proxy), "")
+
+    for key, value in proxy.items():
+        if key != "name":
+            assert reparsed[key] == value
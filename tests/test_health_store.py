@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from HealthStore import HealthStore
+
+
+def test_record_and_scores(tmp_path):
+    store = HealthStore(str(tmp_path), history=4)
+    store.record(["a", "b"], [True, False], [100, None], timestamp=1000)
+    store.record(["a", "b"], [True, True], [200, 50], timestamp=1010)
+
+    scores = store.scores(["a", "b", "unknown"], now=1020)
+    assert list(scores["samples"]) == [2, 2, 0]
+    assert scores["success_rate"][0] == 1.0
+    assert scores["success_rate"][1] == 0.5
+    assert scores["p50"][0] == 150
+    assert np.isnan(scores["success_rate"][2])
+
+
+def test_evict_drops_unseen_keys_and_compacts(tmp_path):
+    store = HealthStore(str(tmp_path), history=4, initial_capacity=2, evict_after=100)
+    keys = [f"node{i}" for i in range(10)]
+    store.record(keys, [True] * 10, [10.0 * i for i in range(10)], timestamp=1000)
+    assert store.capacity >= 10
+
+    # 只有node7、node8在最近一次转换中出现
+    store.touch(["node7", "node8"], now=1500)
+    assert store.evict(100, now=1500) == 8
+    assert store.capacity == 2
+
+    scores = store.scores(["node7", "node8", "node0"], now=1500)
+    assert list(scores["samples"]) == [1, 1, 0]
+    assert list(scores["p50"][:2]) == [70.0, 80.0]
+    assert scores["age"][0] == 500
+
+
+def test_flush_evicts_and_persists(tmp_path):
+    store = HealthStore(str(tmp_path), history=4, evict_after=100)
+    store.record(["old"], [True], [10], timestamp=1)
+    store.record(["new"], [True], [20])
+    store.flush()
+
+    reopened = HealthStore(str(tmp_path), history=4, evict_after=100)
+    scores = reopened.scores(["old", "new"])
+    assert list(scores["samples"]) == [0, 1]
+    assert scores["p50"][1] == 20
+
+
+def test_existing_history_without_last_seen_is_kept(tmp_path):
+    store = HealthStore(str(tmp_path), history=4)
+    store.record(["a"], [True], [10], timestamp=1)
+    store.flush()
+    del store
+    os.remove(tmp_path / "last_seen.npy")
+
+    reopened = HealthStore(str(tmp_path), history=4, evict_after=100)
+    reopened.flush()
+    assert list(reopened.scores(["a"])["samples"]) == [1]
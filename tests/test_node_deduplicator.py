@@ -0,0 +1,49 @@
+import hashlib
+import os
+
+from NodeDeduplicator import BloomFilter, DiskDeduplicator, NodeDeduplicator, create_deduplicator
+
+
+def _keys(count, duplicates_every=3):
+    keys = []
+    for i in range(count):
+        keys.append(f"ss://node{i}@example.com:443")
+        if i % duplicates_every == 0:
+            keys.append(f"ss://node{i // 2}@example.com:443")
+    return keys
+
+
+def test_disk_deduplicator_matches_exact_set_semantics(tmp_path):
+    keys = _keys(5000)
+    expected = []
+    seen = set()
+    for key in keys:
+        expected.append(key not in seen)
+        seen.add(key)
+
+    # 预期数量远小于实际数量，布隆过滤器大量误判，结果仍由磁盘存储精确确认
+    with DiskDeduplicator(100, directory=str(tmp_path), batch_size=64) as deduplicator:
+        assert [deduplicator.add(key) for key in keys] == expected
+        db_file = deduplicator._db_file
+        assert os.path.exists(db_file)
+    assert not os.path.exists(db_file)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    digests = [hashlib.blake2b(str(i).encode(), digest_size=16).digest() for i in range(1000)]
+    assert not bloom.check_and_add(digests[0])
+    for digest in digests:
+        bloom.check_and_add(digest)
+    assert all(bloom.check_and_add(digest) for digest in digests)
+
+
+def test_create_deduplicator_switches_on_threshold(tmp_path):
+    config = {"threshold": 10, "directory": str(tmp_path)}
+    with create_deduplicator(config, 10) as small:
+        assert type(small) is NodeDeduplicator
+        assert small.add("a") and not small.add("a")
+    with create_deduplicator(config, 11) as large:
+        assert isinstance(large, DiskDeduplicator)
+        assert large.add("a") and not large.add("a")
+    assert type(create_deduplicator({"threshold": 0}, 10 ** 9)) is NodeDeduplicator
@@ -0,0 +1,79 @@
+import base64
+
+import pytest
+
+from NodeParsers import decode_base64, split_uri
+from SSRConverter import SSRConverter
+from SSRFetcher import PROXY_PROTOCOLS, SSRFetcher
+
+
+def test_split_uri_parts():
+    uri = split_uri("vless://uuid%40x@example.com:443/ws%2Fpath?type=ws&sni=a.example.com#HK%2001")
+    assert (uri.scheme, uri.userinfo, uri.host, uri.port) == ("vless", "uuid@x", "example.com", 443)
+    assert uri.path == "/ws/path"
+    assert uri.params == {"type": "ws", "sni": "a.example.com"}
+    assert uri.fragment == "HK 01"
+
+
+def test_split_uri_ipv6_fragment_before_query_and_missing_port():
+    uri = split_uri("trojan://pass@[2001:db8::1]:8443#name?x=1")
+    assert (uri.host, uri.port, uri.fragment, uri.params) == ("2001:db8::1", 8443, "name?x=1", {})
+    assert split_uri("ss://abc@example.com").port is None
+    with pytest.raises(ValueError):
+        split_uri("ss://abc@example.com:abc")
+    with pytest.raises(ValueError):
+        split_uri("example.com:443")
+
+
+def test_decode_base64_is_lenient():
+    assert decode_base64("aGVsbG8/d29ybGQ=") == "hello?world"
+    assert decode_base64("aGVsbG8_d29ybGQ") == "hello?world"
+    assert decode_base64("aGVs\nbG8/d29y bGQ%3D") == "hello?world"
+    with pytest.raises(ValueError):
+        decode_base64("not base64!")
+
+
+def _legacy_ss(plain, name="legacy"):
+    return "ss://" + base64.b64encode(plain.encode()).decode() + "#" + name
+
+
+@pytest.mark.parametrize("plain, server, port, password", [
+    # base64文本包含'/'
+    ("aes-256-gcm:pass?/>>@1.2.3.4:8388", "1.2.3.4", 8388, "pass?/>>"),
+    ("chacha20-ietf-poly1305:p#w/d:x@example.com:443", "example.com", 443, "p#w/d:x"),
+    ("aes-128-gcm:p@ss@[2001:db8::1]:443", "2001:db8::1", 443, "p@ss"),
+])
+def test_legacy_ss_form(plain, server, port, password):
+    url = _legacy_ss(plain)
+    proxy = SSRConverter()._parse_ss_url(url)
+    assert (proxy["server"], proxy["port"], proxy["password"]) == (server, port, password)
+    assert proxy["cipher"] == plain.partition(':')[0]
+
+
+def test_legacy_ss_with_slash_in_base64():
+    url = _legacy_ss("aes-256-gcm:pass?/>>@1.2.3.4:8388")
+    assert '/' in url.partition('#')[0]
+
+
+def test_sip002_ss_form():
+    userinfo = base64.urlsafe_b64encode(b"aes-256-gcm:pa/ss").decode().rstrip("=")
+    proxy = SSRConverter()._parse_ss_url(f"ss://{userinfo}@example.com:8388/?plugin=obfs#SIP%20002")
+    assert (proxy["server"], proxy["port"], proxy["cipher"], proxy["password"]) == (
+        "example.com", 8388, "aes-256-gcm", "pa/ss")
+    with pytest.raises(ValueError):
+        SSRConverter()._parse_ss_url(_legacy_ss("aes-256-gcm:pass@example.com"))
+
+
+def test_extractor_protocols_match_registered_parsers():
+    registered = {f"{scheme}://" for scheme in SSRConverter().node_parsers.schemes()}
+    assert set(PROXY_PROTOCOLS) == registered
+
+
+def test_extractor_finds_hy2_links():
+    text = ("hy2://pw@a.example.com:443?sni=a.example.com#A\n"
+            "trojan://pw@b.example.com:443#Bhysteria2://pw@c.example.com:443#C")
+    nodes = []
+    SSRFetcher()._extract_ssr_nodes_from_text(text, nodes)
+    assert nodes == ["hy2://pw@a.example.com:443?sni=a.example.com#A", "trojan://pw@b.example.com:443#B",
+                     "hysteria2://pw@c.example.com:443#C"]
+    assert SSRConverter()._parse_hysteria2_url(nodes[0])["type"] == "hysteria2"
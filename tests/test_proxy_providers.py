@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+import pytest
+import yaml
+
+from ProxyProviders import ProxyProviderBuilder
+from SSRConverter import SSRConverter
+
+PROXIES = [
+    {"name": f"node-{i}", "type": "ss", "server": f"{i}.example.com", "port": 443, "cipher": "aes-256-gcm",
+     "password": "pw"}
+    for i in range(6)
+]
+PROXY_SOURCES = {f"node-{i}": "https://a.example.com/list" if i < 3 else "https://b.example.com/list"
+                 for i in range(6)}
+SOURCE_NAMES = {"https://a.example.com/list": "a", "https://b.example.com/list": "b"}
+
+def _key(proxy):
+    return f"{proxy['server']}:{proxy['port']}"
+
+def test_build_requires_base_url():
+    with pytest.raises(ValueError):
+        ProxyProviderBuilder()
+
+def test_source_shards_are_http_with_relative_paths(tmp_path):
+    builder = ProxyProviderBuilder(base_url="https://example.com/providers/")
+    providers, files, source_shards = builder.build(PROXIES, PROXY_SOURCES, SOURCE_NAMES, _key, str(tmp_path))
+
+    assert list(providers) == ["a", "b"]
+    assert source_shards == {"https://a.example.com/list": "a", "https://b.example.com/list": "b"}
+    for name, provider in providers.items():
+        assert provider["type"] == "http"
+        assert provider["url"] == f"https://example.com/providers/{name}.yaml"
+        assert provider["path"] == f"./proxy_providers/{name}.yaml"
+        assert not os.path.isabs(provider["path"])
+        assert provider["health-check"]["enable"] is True
+        assert files[name][0] == os.path.join(str(tmp_path), f"{name}.yaml")
+
+def test_node_change_keeps_providers_and_changes_only_its_shard(tmp_path):
+    builder = ProxyProviderBuilder(base_url="https://example.com/providers")
+    providers, files, _ = builder.build(PROXIES, PROXY_SOURCES, SOURCE_NAMES, _key, str(tmp_path))
+
+    changed = [dict(proxy) for proxy in PROXIES]
+    changed[0]["port"] = 8443
+    new_providers, new_files, _ = builder.build(changed, PROXY_SOURCES, SOURCE_NAMES, _key, str(tmp_path))
+
+    assert new_providers == providers
+    assert new_files["a"][1] != files["a"][1]
+    assert new_files["b"] == files["b"]
+    # 内容哈希只在分片内容变化时变化
+    assert new_files["a"][2] != files["a"][2]
+    assert new_files["b"][2] == files["b"][2]
+    assert files["a"][2] == hashlib.sha256(files["a"][1].encode("utf-8")).hexdigest()
+
+def _shard_members(files):
+    return {name: sorted(proxy["name"] for proxy in yaml.safe_load(content)["proxies"])
+            for name, (_, content, _) in files.items()}
+
+def test_hash_shards_are_stable_across_runs(tmp_path):
+    builder = ProxyProviderBuilder(shard_by="hash", buckets=4, base_url="https://example.com/providers")
+    providers, files, _ = builder.build(PROXIES, PROXY_SOURCES, SOURCE_NAMES, _key, str(tmp_path))
+    _, reordered_files, _ = builder.build(list(reversed(PROXIES)), PROXY_SOURCES, SOURCE_NAMES, _key, str(tmp_path))
+
+    assert list(providers) == sorted(providers)
+    assert _shard_members(files) == _shard_members(reordered_files)
+
+def test_profile_providers_use_profile_subdirectory_urls_and_paths():
+    output_config = {
+        "rule_providers": {"enable": True, "base_url": "https://raw.example.com/output/rules/"},
+        "proxy_providers": {"enable": True, "base_url": "https://raw.example.com/output/providers",
+                            "path_prefix": "./shards"},
+    }
+    profile_output = SSRConverter()._profile_output_config(output_config, {"name": "lite"}, "output/lite.yaml")
+
+    rules, shards = profile_output["rule_providers"], profile_output["proxy_providers"]
+    assert (rules["directory"], rules["base_url"], rules["path_prefix"]) == (
+        os.path.join("rules", "lite"), "https://raw.example.com/output/rules/lite", "./ruleset/lite")
+    assert (shards["directory"], shards["base_url"], shards["path_prefix"]) == (
+        os.path.join("providers", "lite"), "https://raw.example.com/output/providers/lite", "./shards/lite")
+    # 主配置的设置不受影响
+    assert output_config["proxy_providers"]["base_url"] == "https://raw.example.com/output/providers"
@@ -0,0 +1,37 @@
+from RegionIndex import RegionIndex
+
+FLAGS = {"HK": "🇭🇰", "JP": "🇯🇵", "US": "🇺🇸", "UK": "🇬🇧"}
+
+
+def test_detect_from_flag_code_and_tld():
+    index = RegionIndex(FLAGS)
+    assert index.detect("🇯🇵 东京 01") == "JP"
+    assert index.detect("[HK] 香港") == "HK"
+    assert index.detect("US_02") == "US"
+    assert index.detect("node", "edge.example.co.uk") == "UK"
+    assert index.detect("node", "edge.example.jp") == "JP"
+
+
+def test_unknown_regions_are_not_guessed():
+    index = RegionIndex(FLAGS)
+    assert index.detect("HKG relay") is None
+    assert index.detect("node", "203.0.113.7") is None
+    assert index.detect("node", "example.com") is None
+    assert index.detect("node", "example.de") is None
+
+
+def test_build_groups_orders_regions_and_folds_small_ones_into_other():
+    index = RegionIndex(FLAGS, min_nodes=2)
+    names = ["hk1", "jp1", "hk2", "us1", "hk3", "jp2", "x1"]
+    regions = {"hk1": "HK", "hk2": "HK", "hk3": "HK", "jp1": "JP", "jp2": "JP", "us1": "US"}
+
+    selector, *groups = index.build_groups(names, regions)
+
+    assert selector == {"name": "REGION", "type": "select", "proxies": ["🇭🇰 HK", "🇯🇵 JP", "OTHER"]}
+    assert [group["proxies"] for group in groups] == [["hk1", "hk2", "hk3"], ["jp1", "jp2"], ["x1", "us1"]]
+    assert all(group["type"] == "url-test" for group in groups)
+
+
+def test_build_groups_without_known_regions_is_empty():
+    index = RegionIndex(FLAGS, min_nodes=2)
+    assert index.build_groups(["a", "b"], {"a": "HK"}) == []
@@ -0,0 +1,65 @@
+from RuleCompiler import RuleCompiler
+
+
+def test_removes_duplicates_shadowed_rules_and_rules_after_match():
+    rules = [
+        "DOMAIN-SUFFIX,google.com,PROXY",
+        "DOMAIN,www.google.com,DIRECT",
+        "DOMAIN-SUFFIX,mail.google.com,DIRECT",
+        "DOMAIN-KEYWORD,ads,REJECT",
+        "DOMAIN,ads.example.com,DIRECT",
+        "DOMAIN-SUFFIX,google.com,PROXY",
+        "GEOIP,CN,DIRECT",
+        "MATCH,PROXY",
+        "DOMAIN,after.example.com,DIRECT",
+    ]
+    compiler = RuleCompiler()
+
+    assert compiler.compile(rules) == [
+        "DOMAIN-SUFFIX,google.com,PROXY",
+        "DOMAIN-KEYWORD,ads,REJECT",
+        "GEOIP,CN,DIRECT",
+        "MATCH,PROXY",
+    ]
+    assert compiler.last_report == {"before": 9, "after": 4, "verified": True}
+
+
+def test_child_rules_merge_into_later_parent_with_same_target():
+    rules = [
+        "DOMAIN,api.github.com,PROXY",
+        "DOMAIN-SUFFIX,raw.github.com,PROXY",
+        "DOMAIN-SUFFIX,example.org,DIRECT",
+        "DOMAIN-SUFFIX,github.com,PROXY",
+        "MATCH,DIRECT",
+    ]
+    assert RuleCompiler().compile(rules) == [
+        "DOMAIN-SUFFIX,github.com,PROXY",
+        "MATCH,DIRECT",
+    ]
+
+
+def test_conflicting_rules_in_between_prevent_merging():
+    rules = [
+        "DOMAIN,api.github.com,PROXY",
+        "DOMAIN-SUFFIX,github.com,DIRECT",
+        "DOMAIN-SUFFIX,cdn.example.com,PROXY",
+        "IP-CIDR,10.0.0.0/8,DIRECT",
+        "DOMAIN-SUFFIX,example.com,PROXY",
+    ]
+    assert RuleCompiler().compile(rules) == rules
+
+
+def test_failed_verification_falls_back_to_original_rules():
+    rules = ["DOMAIN,a.example.com,DIRECT", "DOMAIN-SUFFIX,example.com,PROXY"]
+    compiler = RuleCompiler()
+    # 模拟错误的编译结果：删除了会改变匹配结果的规则
+    compiler._merge_into_parents = lambda kept: kept[1:]
+
+    assert compiler.compile(rules) == rules
+    assert compiler.last_report["verified"] is False
+
+
+def test_verify_equivalence_reports_mismatched_domains():
+    compiler = RuleCompiler()
+    mismatches = compiler.verify_equivalence(["DOMAIN-SUFFIX,example.com,PROXY"], ["DOMAIN,example.com,PROXY"])
+    assert "www.example.com" in mismatches
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from RuleProviders import RuleProviderBuilder
+
+RULES = [
+    "DOMAIN-SUFFIX,google.com,FREE-PROXY",
+    "DOMAIN-SUFFIX,youtube.com,FREE-PROXY",
+    "DOMAIN-SUFFIX,baidu.com,DIRECT",
+    "DOMAIN-SUFFIX,qq.com,DIRECT",
+    "GEOIP,CN,DIRECT",
+    "MATCH,FREE-PROXY",
+]
+
+def test_build_requires_base_url():
+    with pytest.raises(ValueError):
+        RuleProviderBuilder()
+
+def test_build_emits_http_providers_with_relative_paths(tmp_path):
+    builder = RuleProviderBuilder(base_url="https://example.com/rules/")
+    rules, providers, files = builder.build(RULES, str(tmp_path))
+
+    assert rules == ["RULE-SET,free-proxy-1,FREE-PROXY", "RULE-SET,direct-1,DIRECT",
+                     "GEOIP,CN,DIRECT", "MATCH,FREE-PROXY"]
+    for name, provider in providers.items():
+        assert provider["type"] == "http"
+        assert provider["url"].startswith("https://example.com/rules/")
+        assert provider["path"].startswith("./ruleset/")
+        assert not os.path.isabs(provider["path"])
+        assert os.path.basename(provider["url"]) == os.path.basename(provider["path"])
+    assert sorted(os.path.basename(path) for path in files) == sorted(
+        os.path.basename(provider["path"]) for provider in providers.values())
+
+def test_file_names_follow_content(tmp_path):
+    builder = RuleProviderBuilder(base_url="https://example.com/rules")
+    _, first, _ = builder.build(RULES, str(tmp_path))
+    _, same, _ = builder.build(RULES, str(tmp_path))
+    _, changed, _ = builder.build(["DOMAIN-SUFFIX,bing.com,FREE-PROXY"] + RULES, str(tmp_path))
+
+    assert first == same
+    assert first["free-proxy-1"]["url"] != changed["free-proxy-1"]["url"]
+    assert first["direct-1"] == changed["direct-1"]
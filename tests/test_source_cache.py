@@ -0,0 +1,20 @@
+import time
+
+from SourceCache import SourceCache
+
+
+def test_default_does_not_serve_stale_early(tmp_path):
+    cache = SourceCache.from_config({"cache_file": str(tmp_path / "sources.json")})
+    assert cache.serve_stale_after == 0
+
+
+def test_cache_round_trip_and_max_stale(tmp_path):
+    cache = SourceCache(str(tmp_path / "sources.json"), max_stale=100)
+    cache.put("https://example.com/a", ["ss://a"])
+    cache.save()
+
+    reloaded = SourceCache(str(tmp_path / "sources.json"), max_stale=100)
+    nodes, age = reloaded.get("https://example.com/a")
+    assert nodes == ["ss://a"] and age < 100
+    assert reloaded.get("https://example.com/a", now=time.time() + 200) == (None, None)
+
@@ -0,0 +1,96 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from SourceQueue import SourceQueue
+
+
+def test_failed_jobs_record_whether_the_source_failed(tmp_path):
+    queue = SourceQueue(str(tmp_path / "queue.sqlite"))
+    run_id = queue.create_run(["https://a.example.com", "https://b.example.com"])
+    for _ in range(2):
+        _, url, _ = queue.claim("worker-1")
+        queue.fail(run_id, url, ValueError("x"), source_failure=url.startswith("https://a"))
+
+    jobs = queue.jobs(run_id)
+    assert [(job["state"], job["source_failure"]) for job in jobs] == [("failed", True), ("failed", False)]
+
+
+def test_queue_files_without_source_failure_are_migrated(tmp_path):
+    queue_file = str(tmp_path / "queue.sqlite")
+    db = sqlite3.connect(queue_file)
+    db.execute("CREATE TABLE jobs (run_id TEXT, url TEXT, position INTEGER, state TEXT, worker TEXT, "
+               "claimed_at REAL, attempts INTEGER DEFAULT 0, shard_file TEXT, error TEXT, "
+               "PRIMARY KEY (run_id, url))")
+    db.commit()
+    db.close()
+
+    queue = SourceQueue(queue_file)
+    run_id = queue.create_run(["https://a.example.com"])
+    assert queue.jobs(run_id)[0]["source_failure"] is False
+
+
+def _expire_leases(queue_file):
+    db = sqlite3.connect(queue_file)
+    db.execute("UPDATE jobs SET claimed_at = 0 WHERE state = 'claimed'")
+    db.commit()
+    db.close()
+
+
+def test_jobs_are_claimed_in_order_and_completed(tmp_path):
+    queue = SourceQueue(str(tmp_path / "queue.sqlite"))
+    run_id = queue.create_run(["https://a.example.com", "https://b.example.com"])
+
+    assert queue.claim("w1") == (run_id, "https://a.example.com", 1)
+    assert queue.claim("w2") == (run_id, "https://b.example.com", 1)
+    assert queue.claim("w3") is None
+
+    queue.complete(run_id, "https://a.example.com", "a.json")
+    assert queue.status(run_id) == {"done": 1, "claimed": 1}
+    assert queue.jobs(run_id)[0]["shard_file"] == "a.json"
+
+
+def test_expired_lease_is_reclaimed_until_max_attempts(tmp_path):
+    queue_file = str(tmp_path / "queue.sqlite")
+    queue = SourceQueue(queue_file, max_attempts=2)
+    run_id = queue.create_run(["https://a.example.com"])
+
+    assert queue.claim("w1")[2] == 1
+    _expire_leases(queue_file)
+    assert queue.claim("w2") == (run_id, "https://a.example.com", 2)
+    _expire_leases(queue_file)
+    assert queue.claim("w3") is None
+
+    job = queue.jobs(run_id)[0]
+    assert (job["state"], job["error"], job["source_failure"]) == ("failed", "租约过期", False)
+
+
+def test_close_run_cancels_unfinished_jobs(tmp_path):
+    queue = SourceQueue(str(tmp_path / "queue.sqlite"))
+    run_id = queue.create_run(["https://a.example.com", "https://b.example.com", "https://c.example.com"])
+    _, url, _ = queue.claim("w1")
+    queue.complete(run_id, url, "a.json")
+    queue.claim("w1")
+
+    queue.close_run(run_id)
+
+    assert [job["state"] for job in queue.jobs(run_id)] == ["done", "cancelled", "cancelled"]
+    assert not queue.has_open_runs()
+    assert queue.claim("w1") is None
+
+
+def test_concurrent_workers_never_claim_the_same_job(tmp_path):
+    queue = SourceQueue(str(tmp_path / "queue.sqlite"))
+    urls = [f"https://source{i}.example.com" for i in range(40)]
+    queue.create_run(urls)
+    claimed = []
+
+    def work(worker_id):
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                return
+            claimed.append(job[1])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(work, [f"w{i}" for i in range(4)]))
+    assert sorted(claimed) == sorted(urls)
@@ -0,0 +1,51 @@
+from SSRFetcher import SSRFetcher
+
+
+class FakeResponse:
+    """
+    按给定分块返回响应体的stream=True响应
+    """
+
+    def __init__(self, chunks, encoding="utf-8"):
+        self.chunks = chunks
+        self.encoding = encoding
+
+    def iter_content(self, chunk_size=None):
+        yield from self.chunks
+
+
+def _counting_fetcher(max_nodes_per_source):
+    fetcher = SSRFetcher()
+    fetcher.max_body_size = 0
+    fetcher.max_nodes_per_source = max_nodes_per_source
+    scanned = []
+    extract = fetcher._extract_ssr_nodes_from_text
+
+    def counting_extract(text, found):
+        scanned.append(len(text))
+        return extract(text, found)
+    fetcher._extract_ssr_nodes_from_text = counting_extract
+    return fetcher, scanned
+
+
+def test_single_line_body_is_not_rescanned_per_chunk():
+    chunks = [b"A" * 1024 for _ in range(2000)]
+    fetcher, scanned = _counting_fetcher(max_nodes_per_source=10)
+
+    body = fetcher._read_body_streaming(FakeResponse(chunks))
+
+    assert len(body) == 2000 * 1024
+    assert scanned == []
+
+
+def test_nodes_split_across_chunks_stop_reading_early():
+    lines = "".join(f"trojan://pass@node{i}.example.com:443#n{i}\n" for i in range(50)).encode()
+    chunks = [lines[i:i + 7] for i in range(0, len(lines), 7)]
+    fetcher, scanned = _counting_fetcher(max_nodes_per_source=5)
+
+    body = fetcher._read_body_streaming(FakeResponse(chunks))
+
+    assert body.count("\n") >= 5
+    assert len(body) < len(lines)
+    # 每个换行之前的文本只扫描一次
+    assert sum(scanned) <= len(body)
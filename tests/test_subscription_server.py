@@ -0,0 +1,93 @@
+import gzip
+import http.client
+import socket
+
+import pytest
+
+from SubscriptionServer import SubscriptionServer
+
+CONTENT = "proxies:\n" + "".join(f"  - name: node-{i}\n" for i in range(200))
+
+
+@pytest.fixture
+def server():
+    server = SubscriptionServer(host="127.0.0.1", port=0, path="/sub.yaml", subscription_userinfo="upload=0")
+    server.update(CONTENT)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _get(server, headers=None, method="GET", path="/sub.yaml"):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+
+def test_get_returns_content_with_etag(server):
+    response, body = _get(server)
+    assert response.status == 200
+    assert body.decode("utf-8") == CONTENT
+    assert response.getheader("ETag").startswith('"')
+    assert response.getheader("Content-Encoding") is None
+    assert response.getheader("profile-update-interval") == "24"
+    assert response.getheader("subscription-userinfo") == "upload=0"
+
+
+def test_if_none_match_returns_304(server):
+    response, _ = _get(server)
+    etag = response.getheader("ETag")
+
+    not_modified, body = _get(server, {"If-None-Match": etag})
+    assert not_modified.status == 304 and body == b""
+    assert not_modified.getheader("ETag") == etag
+
+    server.update(CONTENT + "  - name: extra\n")
+    changed, body = _get(server, {"If-None-Match": etag})
+    assert changed.status == 200 and changed.getheader("ETag") != etag
+
+
+def test_gzip_variant_is_selected_from_accept_encoding(server):
+    response, body = _get(server, {"Accept-Encoding": "gzip, deflate"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("ETag").endswith('-gzip"')
+    assert gzip.decompress(body).decode("utf-8") == CONTENT
+
+    # q=0表示不接受该编码
+    response, body = _get(server, {"Accept-Encoding": "gzip;q=0"})
+    assert response.getheader("Content-Encoding") is None
+    assert body.decode("utf-8") == CONTENT
+
+    etag = _get(server, {"Accept-Encoding": "gzip"})[0].getheader("ETag")
+    assert _get(server, {"Accept-Encoding": "gzip", "If-None-Match": etag})[0].status == 304
+
+
+def test_brotli_variant_is_preferred(server):
+    brotli = pytest.importorskip("brotli")
+    response, body = _get(server, {"Accept-Encoding": "gzip, br"})
+    assert response.getheader("Content-Encoding") == "br"
+    assert brotli.decompress(body).decode("utf-8") == CONTENT
+
+
+def test_head_wrong_path_and_method(server):
+    response, body = _get(server, method="HEAD")
+    assert response.status == 200 and body == b""
+    assert int(response.getheader("Content-Length")) == len(CONTENT.encode("utf-8"))
+    assert _get(server, path="/other.yaml")[0].status == 404
+    assert _get(server, method="POST")[0].status == 405
+
+
+def test_oversized_request_line_gets_400_and_close(server):
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        sock.sendall(b"GET /" + b"a" * 100000 + b" HTTP/1.1\r\nHost: x\r\n\r\n")
+        data = b""
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    assert data.startswith(b"HTTP/1.1 400 Bad Request")